@@ -0,0 +1,218 @@
+"""
+Benchmarks for the transform layer (src/transform/cleaner.py) over the
+recorded HTML corpus in benchmarks/corpus.
+
+    python -m benchmarks.bench_transform                      # report
+    python -m benchmarks.bench_transform --save baseline.json # record a baseline
+    python -m benchmarks.bench_transform --baseline baseline.json --threshold 0.2
+
+With --baseline the run exits with status 1 when the p50 latency of any
+benchmark is more than `threshold` (a fraction) slower than the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+
+from src.transform.cleaner import (
+    canonical_url,
+    clean_article_url,
+    clean_url,
+    extract_article,
+    extract_figures,
+    extract_paragraphs,
+    get_article_content,
+    get_article_content_archive,
+    get_article_content_lxml,
+)
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+ARTICLE_ARGS = dict(article_id="https://www.ft.com/content/example", scraped_at=None, paywall=False, section="World", category="world")
+HREF = re.compile(r'href="(/content/[^"]+)"')
+
+
+# -----------------------------
+# Corpus
+# -----------------------------
+
+def load_corpus(corpus_dir=CORPUS_DIR):
+    """
+    {"ft": [...], "archive": [...], "listing": [...]} of (name, html),
+    grouped by file name prefix (bypass pages use the ft format).
+    """
+    corpus = {"ft": [], "archive": [], "listing": []}
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.endswith(".html"):
+            continue
+        with open(os.path.join(corpus_dir, name), "r", encoding="utf-8") as f:
+            raw_html = f.read()
+        kind = name.split("_", 1)[0]
+        corpus["ft" if kind == "bypass" else kind].append((name, raw_html))
+    return corpus
+
+def listing_urls(corpus):
+    """
+    Teaser URLs of the listing fixtures, as the listing stage sees them
+    (relative links made absolute, some with doubled protocols).
+    """
+    urls = []
+    for _, raw_html in corpus["listing"]:
+        for i, href in enumerate(HREF.findall(raw_html)):
+            url = "https://www.ft.com" + href
+            urls.append("https://www.ft.com/" + url if i % 7 == 0 else url + ":")
+    return urls
+
+
+# -----------------------------
+# Cases
+# -----------------------------
+
+def build_cases(corpus):
+    """
+    name → (callable taking one input, inputs). Soups are parsed up front
+    for the helpers that receive a soup in production.
+    """
+    ft = [raw_html for _, raw_html in corpus["ft"]]
+    archive = [raw_html for _, raw_html in corpus["archive"]]
+    ft_soups = [BeautifulSoup(raw_html, "html.parser") for raw_html in ft]
+    urls = listing_urls(corpus)
+
+    return {
+        "extract_article[ft]": (lambda h: extract_article(h, "ft", **ARTICLE_ARGS), ft),
+        "extract_article[archive]": (lambda h: extract_article(h, "archive", **ARTICLE_ARGS), archive),
+        "get_article_content (bs4 parse + extract)": (
+            lambda h: get_article_content(soup=BeautifulSoup(h, "html.parser"), **ARTICLE_ARGS), ft
+        ),
+        "get_article_content_lxml": (lambda h: get_article_content_lxml(raw_html=h, **ARTICLE_ARGS), ft),
+        "get_article_content_archive": (lambda h: get_article_content_archive(raw_html=h, **ARTICLE_ARGS), archive),
+        "extract_figures": (extract_figures, ft_soups),
+        "extract_paragraphs": (lambda soup: extract_paragraphs(soup.find("article", id="article-body")), ft_soups),
+        "clean_url": (lambda u: clean_url(url=u), urls),
+        "clean_article_url": (clean_article_url, urls),
+        "canonical_url": (canonical_url, urls),
+    }
+
+
+# -----------------------------
+# Measurement
+# -----------------------------
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def measure(fn, inputs, min_seconds=1.0, min_rounds=5, warmup=1):
+    """
+    Call fn on every input, round after round, for at least min_seconds
+    and min_rounds. Returns latency percentiles (ms per call),
+    throughput (calls/s) and peak traced memory (KiB) of one round.
+    """
+    for _ in range(warmup):
+        for item in inputs:
+            fn(item)
+
+    latencies = []
+    rounds, started = 0, time.perf_counter()
+    while rounds < min_rounds or time.perf_counter() - started < min_seconds:
+        for item in inputs:
+            t0 = time.perf_counter()
+            fn(item)
+            latencies.append(time.perf_counter() - t0)
+        rounds += 1
+    elapsed = sum(latencies)
+
+    # memory in a separate round: tracing slows every allocation down
+    tracemalloc.start()
+    for item in inputs:
+        fn(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "per_s": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "peak_kib": round(peak / 1024, 1)
+    }
+
+def run(corpus_dir=CORPUS_DIR, only=None, min_seconds=1.0):
+    cases = build_cases(load_corpus(corpus_dir))
+    results = {}
+    for name, (fn, inputs) in cases.items():
+        if only and not any(pattern in name for pattern in only):
+            continue
+        if not inputs:
+            print(f"skip {name}: no fixtures")
+            continue
+        results[name] = measure(fn, inputs, min_seconds=min_seconds)
+    return results
+
+
+# -----------------------------
+# Reporting / regression check
+# -----------------------------
+
+def print_report(results, baseline=None):
+    header = f"{'benchmark':<44}{'calls/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'peak KiB':>10}"
+    if baseline:
+        header += f"{'p50 vs base':>13}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        line = f"{name:<44}{r['per_s']:>11}{r['p50_ms']:>10}{r['p99_ms']:>10}{r['peak_kib']:>10}"
+        base = (baseline or {}).get(name)
+        if base and base["p50_ms"]:
+            line += f"{(r['p50_ms'] / base['p50_ms'] - 1) * 100:>+12.1f}%"
+        print(line)
+
+def regressions(results, baseline, threshold):
+    """
+    Benchmarks whose p50 is more than `threshold` slower than the baseline.
+    """
+    slower = {}
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base and base["p50_ms"] and r["p50_ms"] > base["p50_ms"] * (1 + threshold):
+            slower[name] = round(r["p50_ms"] / base["p50_ms"] - 1, 3)
+    return slower
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark the transform layer on the recorded HTML corpus")
+    parser.add_argument("--corpus", default=CORPUS_DIR)
+    parser.add_argument("--only", nargs="*", help="run only benchmarks whose name contains one of these")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="minimum timing per benchmark")
+    parser.add_argument("--save", help="write the results to this JSON file (a new baseline)")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = run(args.corpus, only=args.only, min_seconds=args.min_seconds)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print_report(results, baseline)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results}, f, indent=4)
+        print(f"Results saved to {args.save}")
+
+    if baseline:
+        slower = regressions(results, baseline, args.threshold)
+        if slower:
+            for name, change in slower.items():
+                print(f"REGRESSION {name}: p50 {change * 100:+.1f}% (threshold {args.threshold * 100:.0f}%)")
+            raise SystemExit(1)
+        print(f"No regression above {args.threshold * 100:.0f}%")
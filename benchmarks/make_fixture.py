@@ -0,0 +1,66 @@
+"""
+Turn a raw archive record (or a saved page) into an anonymized corpus
+fixture: text is replaced by filler of the same shape, scripts are
+dropped and article / image URLs are replaced, while the markup the
+extractors depend on is kept.
+
+    python -m benchmarks.make_fixture data/archive/raw/ab/<record>.json.gz ft_article_new.html
+"""
+import argparse
+import os
+import random
+import re
+from lxml import etree, html
+
+from src.load.archive import RawHtmlArchive
+from benchmarks.bench_transform import CORPUS_DIR
+
+WORD = re.compile(r"[^\W\d_]+")
+UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+FILLER = "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor".split()
+
+
+def _filler(match):
+    word = match.group(0)
+    replacement = random.choice(FILLER)
+    replacement = (replacement * (len(word) // len(replacement) + 1))[:len(word)]
+    return replacement.capitalize() if word[0].isupper() else replacement
+
+def _random_uuid(_):
+    return "%08x-%04x-%04x-%04x-%012x" % tuple(random.getrandbits(b) for b in (32, 16, 16, 16, 48))
+
+def anonymize(raw_html, seed=0):
+    random.seed(seed)
+    tree = html.fromstring(raw_html.encode("utf-8"), parser=html.HTMLParser(encoding="utf-8"))
+    etree.strip_elements(tree, "script", "noscript", "iframe", with_tail=False)
+
+    for el in tree.iter():
+        if not isinstance(el.tag, str):
+            continue
+        if el.text and el.tag != "style":
+            el.text = WORD.sub(_filler, el.text)
+        if el.tail:
+            el.tail = WORD.sub(_filler, el.tail)
+        for attr in ("href", "src", "currentsourceurl", "srcset", "alt", "title"):
+            if attr in el.attrib:
+                el.set(attr, UUID.sub(_random_uuid, el.get(attr)) if attr != "alt" else "")
+
+    return html.tostring(tree, encoding="unicode", doctype="<!DOCTYPE html>")
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Anonymize a page into a benchmark fixture")
+    parser.add_argument("source", help="raw archive record (.json.gz) or .html file")
+    parser.add_argument("name", help="fixture file name; prefix with ft_, bypass_, archive_ or listing_")
+    args = parser.parse_args()
+
+    if args.source.endswith(".json.gz"):
+        raw_html = RawHtmlArchive.load(args.source)["html"]
+    else:
+        with open(args.source, "r", encoding="utf-8") as f:
+            raw_html = f.read()
+
+    path = os.path.join(CORPUS_DIR, args.name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(anonymize(raw_html))
+    print(f"Fixture written to {path}")
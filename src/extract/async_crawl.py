@@ -0,0 +1,248 @@
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from src.extract.browser import USER_AGENT, LAUNCH_ARGS, VIEWPORT
+from src.extract.http_client import get_http_fetcher
+from src.extract.fetch import FetchResult, BYPASS_OPTIONS, ARCHIVE_XPATH, ARTICLE_OR_PAYWALL, SOURCE_BY_OPTION
+from src.extract.search import parse_stream_teasers, teasers_after
+from src.transform.cleaner import canonical_url
+from src.load.db import get_existing_article_ids
+from src.utils.ratelimit import get_host_limiter, backoff_delay, parse_retry_after, THROTTLE_STATUSES
+
+
+class AsyncBrowserPool:
+    """
+    A few Chromium browsers shared by many concurrent page loads.
+
+    Every lease opens a fresh page in one of the browsers' contexts
+    (round-robin) and closes it afterwards; a semaphore caps the number
+    of pages in flight across the whole pool. The BlockingProfile, if
+    any, is installed on every context.
+    """
+
+    def __init__(self, num_browsers=2, max_concurrency=100, headless=True, profile=None):
+        self.num_browsers = num_browsers
+        self.max_concurrency = max_concurrency
+        self.headless = headless
+        self.profile = profile
+
+        self._playwright = None
+        self._browsers = []
+        self._contexts = []
+        self._next_context = None
+        self._semaphore = None
+
+    async def start(self):
+        self._playwright = await async_playwright().start()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        for _ in range(self.num_browsers):
+            browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=LAUNCH_ARGS
+            )
+            context = await browser.new_context(
+                user_agent=USER_AGENT,
+                viewport=VIEWPORT
+            )
+            if self.profile is not None:
+                await self.profile.attach_async(context)
+            self._browsers.append(browser)
+            self._contexts.append(context)
+
+        self._next_context = itertools.cycle(self._contexts)
+        return self
+
+    async def close(self):
+        for browser in self._browsers:
+            try:
+                await browser.close()
+            except Exception:
+                pass
+        self._browsers, self._contexts = [], []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @property
+    def wait_until(self):
+        return self.profile.wait_until if self.profile is not None else "networkidle"
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    @asynccontextmanager
+    async def lease(self):
+        """
+        Lease a new page, waiting while the pool is at max_concurrency.
+        """
+        async with self._semaphore:
+            page = await next(self._next_context).new_page()
+            try:
+                yield page
+            finally:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+
+
+# -----------------------------
+# Fetch
+# -----------------------------
+
+async def navigate_async(page, url, retries=2, **kwargs):
+    """
+    Async equivalent of browser.navigate: page.goto through the shared
+    per-host limiter with jittered retries on 429/503 and timeouts.
+    """
+    limiter = get_host_limiter()
+
+    for attempt in range(retries + 1):
+        response = None
+        async with limiter.acquire_async(url) as ticket:
+            try:
+                response = await page.goto(url, **kwargs)
+            except PlaywrightTimeoutError:
+                ticket.timeout = True
+                if attempt == retries:
+                    raise
+            else:
+                ticket.status = response.status if response else None
+                if ticket.status in THROTTLE_STATUSES:
+                    ticket.retry_after = parse_retry_after(response.headers.get("retry-after"))
+
+        throttled = ticket.timeout or ticket.status in THROTTLE_STATUSES
+        if not throttled or attempt == retries:
+            return response
+        await asyncio.sleep(backoff_delay(attempt))
+
+async def fetch_paywall_html(page, article_url):
+    """
+    Async equivalent of fetch.fetch_paywall_html.
+    Returns (html, option) or None on failure.
+    """
+    try:
+        url = BYPASS_OPTIONS[0] + article_url
+        print("Trying primary bypass:", url)
+
+        await navigate_async(page, url, timeout=60000)
+        await page.wait_for_selector("div.article-content", timeout=10000)
+
+        return await page.locator("div.article-content").evaluate("el => el.outerHTML"), 1
+
+    except Exception:
+        print("Primary failed, trying archive...")
+
+    try:
+        url = BYPASS_OPTIONS[1] + article_url
+        print("Trying archive:", url)
+
+        await navigate_async(page, url, timeout=60000)
+        await page.wait_for_selector(ARCHIVE_XPATH, timeout=30000)
+
+        return await page.locator(ARCHIVE_XPATH).evaluate("el => el.outerHTML"), 2
+
+    except Exception as ex:
+        print("Archive failed:", ex)
+        return None
+
+async def fetch_article(page, article_url, wait_until="load"):
+    """
+    Async equivalent of fetch.fetch_article: one navigation, classified
+    from the loaded DOM. Returns a FetchResult.
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    try:
+        print("Visiting:", article_url)
+        await navigate_async(page, article_url, timeout=60000, wait_until=wait_until)
+        timings["navigate"] = time.perf_counter() - start
+        try:
+            await page.wait_for_selector(ARTICLE_OR_PAYWALL, timeout=10000)
+        except Exception:
+            pass
+        paywall = await page.locator("p.o3-type-detail").count() > 0
+    except Exception as ex:
+        timings["total"] = time.perf_counter() - start
+        return FetchResult(status="failed", timings=timings, error=str(ex))
+
+    if not paywall:
+        step = time.perf_counter()
+        try:
+            await page.wait_for_selector("div.article-content", timeout=10000)
+            html = await page.locator("div.article-content").evaluate("el => el.outerHTML")
+            timings["extract"] = time.perf_counter() - step
+            timings["total"] = time.perf_counter() - start
+            return FetchResult(status="free", html=html, source="ft", timings=timings)
+        except Exception as ex:
+            print("Error fetching free article:", ex)
+            timings["total"] = time.perf_counter() - start
+            return FetchResult(status="failed", timings=timings, error=str(ex))
+
+    step = time.perf_counter()
+    fetched = await fetch_paywall_html(page, article_url)
+    timings["bypass"] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - start
+
+    if not fetched:
+        return FetchResult(status="failed", timings=timings, error="paywall bypass failed")
+
+    html, opt = fetched
+    return FetchResult(status="paywall", html=html, source=SOURCE_BY_OPTION[opt], timings=timings)
+
+
+# -----------------------------
+# Search
+# -----------------------------
+
+async def get_new_articles(pool, collection, leaf_url, known=None, watermark=None):
+    """
+    Async equivalent of search.get_new_articles: HTTP first, browser
+    only when the #stream is missing.
+    Returns None when the page could not be listed or the stored ids
+    could not be checked, so the caller can retry the leaf.
+    """
+    fetcher = get_http_fetcher()
+    html = await asyncio.to_thread(fetcher.get, leaf_url, True)
+    teasers = parse_stream_teasers(html) if html else None
+    fetcher.record("listing", used_fallback=teasers is None)
+
+    if teasers is None:
+        async with pool.lease() as page:
+            try:
+                await navigate_async(page, leaf_url, timeout=60000, wait_until=pool.wait_until)
+                await page.wait_for_selector("#stream", timeout=30000)
+                html = await page.content()
+            except Exception:
+                return None
+        teasers = parse_stream_teasers(html)
+        if teasers is None:
+            return None
+
+    if not teasers:
+        return []
+
+    links = teasers_after(teasers, watermark)
+    if not links:
+        return []
+
+    links = list(dict.fromkeys(canonical_url(href) for href in links))
+
+    try:
+        # skip already stored articles
+        if known is not None:
+            return known.filter_new(links)
+        # Mongo lookups are blocking, keep them off the event loop
+        existing = await asyncio.to_thread(get_existing_article_ids, collection, links)
+        return [href for href in links if href not in existing]
+    except Exception as e:
+        print(f"Error checking stored articles for {leaf_url}: {e}")
+        return None
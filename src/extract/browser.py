@@ -0,0 +1,312 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+
+from src.extract.interception import default_profile
+from src.utils.ratelimit import get_host_limiter, backoff_delay, parse_retry_after, THROTTLE_STATUSES
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+VIEWPORT = {"width": 1280, "height": 800}
+
+
+class _WorkerSlot:
+    """
+    Playwright driver, browser, context and page owned by a single thread.
+    The sync Playwright API is bound to the thread that started it, so
+    every worker thread gets its own slot and keeps it between leases.
+    """
+
+    def __init__(self):
+        self.thread_id = threading.get_ident()
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.uses = 0
+        self.in_use = False
+
+
+class BrowserPool:
+    """
+    Long-lived Chromium browsers shared by all extract calls.
+
+    Each worker thread launches its browser once and keeps one context
+    and one page that are handed out with `lease()`. A page is recycled
+    after `max_uses_per_page` leases or as soon as it fails a health check.
+    When a BlockingProfile is given it is installed on every context.
+    """
+
+    def __init__(
+        self,
+        headless=True,
+        max_uses_per_page=25,
+        launch_args=None,
+        user_agent=USER_AGENT,
+        viewport=None,
+        profile=None
+    ):
+        self.headless = headless
+        self.max_uses_per_page = max_uses_per_page
+        self.launch_args = launch_args or LAUNCH_ARGS
+        self.user_agent = user_agent
+        self.viewport = viewport or VIEWPORT
+        self.profile = profile
+
+        self._local = threading.local()
+        self._slots = []
+        self._lock = threading.Lock()
+        self.stats = {
+            "browsers_launched": 0,
+            "pages_created": 0,
+            "pages_recycled": 0,
+            "unhealthy_pages": 0,
+            "leases": 0
+        }
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _slot(self):
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            slot = _WorkerSlot()
+            self._local.slot = slot
+            with self._lock:
+                self._slots.append(slot)
+        return slot
+
+    def _new_context(self, browser):
+        context = browser.new_context(
+            user_agent=self.user_agent,
+            viewport=self.viewport
+        )
+        if self.profile is not None:
+            self.profile.attach(context)
+        return context
+
+    def _ensure_context(self, slot):
+        if slot.playwright is None:
+            slot.playwright = sync_playwright().start()
+
+        if slot.browser is None or not slot.browser.is_connected():
+            slot.browser = slot.playwright.chromium.launch(
+                headless=self.headless,
+                args=self.launch_args
+            )
+            slot.context = None
+            slot.page = None
+            self._count("browsers_launched")
+
+        if slot.context is None:
+            slot.context = self._new_context(slot.browser)
+
+    def _new_page(self, slot):
+        page = slot.context.new_page()
+        self._count("pages_created")
+        return page
+
+    def _is_healthy(self, page):
+        if page.is_closed():
+            return False
+        try:
+            return page.evaluate("1") == 1
+        except Exception:
+            return False
+
+    def _discard_page(self, slot):
+        try:
+            slot.page.close()
+        except Exception:
+            pass
+        slot.page = None
+        slot.uses = 0
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+
+    @property
+    def wait_until(self):
+        """
+        Navigation wait for listing pages, taken from the profile.
+        """
+        return self.profile.wait_until if self.profile is not None else "networkidle"
+
+    @contextmanager
+    def lease(self):
+        """
+        Lease the calling thread's page for one unit of work.
+        Nested leases on the same thread get a throwaway page from the
+        same context so they never navigate the outer page away.
+        """
+        slot = self._slot()
+        self._ensure_context(slot)
+        self._count("leases")
+
+        if slot.in_use:
+            page = self._new_page(slot)
+            try:
+                yield page
+            finally:
+                page.close()
+            return
+
+        if slot.page is not None:
+            if not self._is_healthy(slot.page):
+                self._count("unhealthy_pages")
+                self._discard_page(slot)
+            elif slot.uses >= self.max_uses_per_page:
+                self._count("pages_recycled")
+                self._discard_page(slot)
+
+        if slot.page is None:
+            slot.page = self._new_page(slot)
+
+        slot.uses += 1
+        slot.in_use = True
+        try:
+            yield slot.page
+        finally:
+            slot.in_use = False
+
+    def release_thread(self):
+        """
+        Close the browser owned by the calling thread. Every thread that
+        leased a page must call it before it exits: the sync Playwright
+        objects of a slot can only be closed from the thread that made them.
+        """
+        slot = getattr(self._local, "slot", None)
+        if slot is None:
+            return
+        self._close_slot(slot)
+        self._local.slot = None
+        with self._lock:
+            if slot in self._slots:
+                self._slots.remove(slot)
+
+    def _close_slot(self, slot):
+        for closer in (
+            lambda: slot.browser and slot.browser.close(),
+            lambda: slot.playwright and slot.playwright.stop()
+        ):
+            try:
+                closer()
+            except Exception as e:
+                print(f"Could not close browser slot: {e}")
+        slot.browser = slot.context = slot.page = slot.playwright = None
+
+    def close(self):
+        """
+        Close the calling thread's browser. Slots still held by other
+        threads cannot be closed from here; they are reported (their
+        threads should have called release_thread) and left to Playwright
+        to tear down when the process exits.
+        """
+        self.release_thread()
+        with self._lock:
+            slots, self._slots = self._slots, []
+        if slots:
+            print(f"Browser pool closed with {len(slots)} browsers still held by other threads")
+
+
+class BrowserWorkers(ThreadPoolExecutor):
+    """
+    ThreadPoolExecutor for work that leases browser pages: on shutdown
+    every worker thread closes its own browser slot (release_thread) on
+    its own thread. Keep one for a whole run, so its threads and their
+    browsers are reused instead of relaunched.
+    """
+
+    def shutdown(self, wait=True, **kwargs):
+        threads = list(self._threads)
+        if threads and wait:
+            # one release per thread: each task blocks at the barrier
+            # until every thread holds one, so no thread runs two
+            barrier = threading.Barrier(len(threads))
+
+            def release():
+                release_browser_thread()
+                barrier.wait()
+
+            for future in [self.submit(release) for _ in threads]:
+                future.result()
+        super().shutdown(wait=wait, **kwargs)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_browser_pool(**kwargs):
+    """
+    Return the process-wide BrowserPool, creating it on first use.
+    Keyword arguments are only applied when the pool is created; unless
+    a profile is passed, the default blocking profile is used.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            kwargs.setdefault("profile", default_profile())
+            _default_pool = BrowserPool(**kwargs)
+        return _default_pool
+
+
+def close_browser_pool():
+    """
+    Close and forget the process-wide BrowserPool.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
+
+
+def release_browser_thread():
+    """
+    Close the calling thread's browser in the process-wide pool, if any.
+    """
+    with _default_pool_lock:
+        pool = _default_pool
+    if pool is not None:
+        pool.release_thread()
+
+
+def navigate(page, url, retries=2, **kwargs):
+    """
+    page.goto through the per-host limiter. Throttled (429/503) and
+    timed-out loads are retried with jittered backoff; the last attempt's
+    response is returned and its timeout re-raised.
+    """
+    limiter = get_host_limiter()
+
+    for attempt in range(retries + 1):
+        response = None
+        with limiter.acquire(url) as ticket:
+            try:
+                response = page.goto(url, **kwargs)
+            except PlaywrightTimeoutError:
+                ticket.timeout = True
+                if attempt == retries:
+                    raise
+            else:
+                ticket.status = response.status if response else None
+                if ticket.status in THROTTLE_STATUSES:
+                    ticket.retry_after = parse_retry_after(response.headers.get("retry-after"))
+
+        throttled = ticket.timeout or ticket.status in THROTTLE_STATUSES
+        if not throttled or attempt == retries:
+            return response
+        time.sleep(backoff_delay(attempt))
+
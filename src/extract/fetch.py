@@ -1,124 +1,187 @@
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-from src.transform.cleaner import get_article_content,get_article_content_archive
-
-def check_paywall(page, article_url):
-    """
-    Check if the article page has a paywall by counting
-    <p> elements with class 'o3-type-detail'.
-    Returns True if paywall exists, False otherwise.
-    """
-    #browser = p.chromium.launch(headless=True)
-    #page = browser.new_page()
-    try:
-        page.goto(article_url, timeout=60000)
-        count = page.locator("p.o3-type-detail").count()
-        return count > 0
-    except Exception:
-        return False
-    finally:
-        pass #browser.close()
-
-def fetch_article_free(page, article_url):
-    """
-    Fetch article content directly if it is free.
-    Returns BeautifulSoup object or None on failure.
-    """
-    #browser = p.chromium.launch(headless=True)
-    #page = browser.new_page()
-    try:
-        print("Visiting (free):", article_url)
-        page.goto(article_url, timeout=60000)
-        page.wait_for_selector("div.article-content", timeout=10000)
-
-        html = page.locator("div.article-content").evaluate("el => el.outerHTML")
-        return BeautifulSoup(html, "html.parser")
-
-    except Exception as ex:
-        print("Error fetching free article:", ex)
-        return None
-    finally:
-        pass #browser.close()
-
-def fetch_article_paywall(page, article_url):
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+from lxml import etree, html
+from src.extract.browser import get_browser_pool, close_browser_pool, navigate
+from src.extract.http_client import get_http_fetcher
+from src.transform.cleaner import extract_article
+
+BYPASS_OPTIONS = [
+    "https://accessarticlenow.com/api/c/full?q=",
+    "https://archive.md/20250824050137/"
+]
+ARCHIVE_XPATH = 'xpath=/html/body/center/div[4]/div/div[1]/div/div/div[1]/div[2]/div/div/div[3]'
+
+def fetch_paywall_html(page, article_url):
     """
     Try to bypass paywall using alternative services.
-    Returns BeautifulSoup object or None on failure.
+    Returns (html, option) where option is 1 for the primary bypass and
+    2 for the archive, or None on failure.
     """
-    options = [
-        "https://accessarticlenow.com/api/c/full?q=",
-        "https://archive.md/20250824050137/"
-    ]
-
     # --- Primary attempt ---
-    #browser = p.chromium.launch(headless=True)
-    #page = browser.new_page()
-
     try:
-        url = options[0] + article_url
+        url = BYPASS_OPTIONS[0] + article_url
         print("Trying primary bypass:", url)
 
-        page.goto(url, timeout=60000)
+        navigate(page, url, timeout=60000)
         page.wait_for_selector("div.article-content", timeout=10000)
 
-        html = page.locator("div.article-content").evaluate("el => el.outerHTML")
-        return BeautifulSoup(html, "html.parser"),1
+        return page.locator("div.article-content").evaluate("el => el.outerHTML"), 1
 
     except Exception:
         print("Primary failed, trying archive...")
 
-    finally:
-        pass #browser.close()
-
     # --- Secondary attempt (archive) ---
-    #browser = p.chromium.launch(headless=False)  # not headless for archive
-    #page = browser.new_page()
     try:
-        url = options[1] + article_url
+        url = BYPASS_OPTIONS[1] + article_url
         print("Trying archive:", url)
 
-        page.goto(url, timeout=60000)
-        page.wait_for_selector(
-            'xpath=/html/body/center/div[4]/div/div[1]/div/div/div[1]/div[2]/div/div/div[3]',
-            timeout=30000
-        )
-
-        html = page.locator(
-            'xpath=/html/body/center/div[4]/div/div[1]/div/div/div[1]/div[2]/div/div/div[3]'
-        ).evaluate("el => el.outerHTML")
+        navigate(page, url, timeout=60000)
+        page.wait_for_selector(ARCHIVE_XPATH, timeout=30000)
 
-        return BeautifulSoup(html, "html.parser"),2
+        return page.locator(ARCHIVE_XPATH).evaluate("el => el.outerHTML"), 2
 
     except Exception as ex:
         print("Archive failed:", ex)
         return None
 
-    finally:
-        pass #browser.close()
+# -----------------------------
+# Single-navigation fetch
+# -----------------------------
+
+SOURCE_BY_OPTION = {1: "bypass", 2: "archive"}
+ARTICLE_OR_PAYWALL = "div.article-content, p.o3-type-detail"
+
+@dataclass
+class FetchResult:
+    """
+    Outcome of fetch_article.
+
+    status: "free", "paywall" or "failed"
+    html:   outerHTML of the article container, None when failed
+    source: "ft" (direct load), "bypass" or "archive"
+    timings: seconds spent per step ("navigate", "extract", "bypass", "total")
+    """
+    status: str
+    html: Optional[str] = None
+    source: Optional[str] = None
+    timings: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def paywall(self):
+        return self.status == "paywall"
+
+    @property
+    def ok(self):
+        return self.html is not None
+
+def fetch_article(page, article_url, wait_until="load"):
+    """
+    Load the article once, classify it from the loaded DOM
+    (p.o3-type-detail marks a paywall) and return the div.article-content
+    HTML from the same load. Paywalled articles go through the bypass
+    services. wait_until is passed to page.goto ("domcontentloaded" for
+    DOM-ready).
+    """
+    timings = {}
+    start = time.perf_counter()
+
+    try:
+        print("Visiting:", article_url)
+        navigate(page, article_url, timeout=60000, wait_until=wait_until)
+        timings["navigate"] = time.perf_counter() - start
+        try:
+            # With DOM-ready waits the body may still be rendering
+            page.wait_for_selector(ARTICLE_OR_PAYWALL, timeout=10000)
+        except Exception:
+            pass
+        paywall = page.locator("p.o3-type-detail").count() > 0
+    except Exception as ex:
+        timings["total"] = time.perf_counter() - start
+        return FetchResult(status="failed", timings=timings, error=str(ex))
+
+    if not paywall:
+        step = time.perf_counter()
+        try:
+            page.wait_for_selector("div.article-content", timeout=10000)
+            html = page.locator("div.article-content").evaluate("el => el.outerHTML")
+            timings["extract"] = time.perf_counter() - step
+            timings["total"] = time.perf_counter() - start
+            return FetchResult(status="free", html=html, source="ft", timings=timings)
+        except Exception as ex:
+            print("Error fetching free article:", ex)
+            timings["total"] = time.perf_counter() - start
+            return FetchResult(status="failed", timings=timings, error=str(ex))
+
+    step = time.perf_counter()
+    fetched = fetch_paywall_html(page, article_url)
+    timings["bypass"] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - start
+
+    if not fetched:
+        return FetchResult(status="failed", timings=timings, error="paywall bypass failed")
+
+    html, opt = fetched
+    return FetchResult(status="paywall", html=html, source=SOURCE_BY_OPTION[opt], timings=timings)
+
+_ARTICLE_CONTENT = etree.XPath(
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' article-content ')]"
+)
+_PAYWALL_MARKER = etree.XPath(
+    "//p[contains(concat(' ', normalize-space(@class), ' '), ' o3-type-detail ')]"
+)
+
+def fetch_article_http(article_url, revalidate=False):
+    """
+    Try the free-article path without a browser: GET the page and read
+    div.article-content from the server-rendered HTML.
+    With revalidate=True an unchanged page costs a 304 (used when
+    re-checking stored articles).
+    Returns a FetchResult, or None when the page is paywalled, cannot
+    be parsed or the expected markup is missing and the caller should
+    use the browser.
+    """
+    fetcher = get_http_fetcher()
+    start = time.perf_counter()
+
+    body = fetcher.get(article_url, revalidate=revalidate)
+    result = None
+    tree = None
+    if body:
+        try:
+            tree = html.fromstring(body)
+        except (etree.ParserError, ValueError) as e:
+            # e.g. an empty document or an encoding declaration in a str
+            print(f"Could not parse {article_url} over HTTP: {e}")
+    if tree is not None:
+        content = _ARTICLE_CONTENT(tree)
+        if content and not _PAYWALL_MARKER(tree):
+            result = FetchResult(
+                status="free",
+                html=html.tostring(content[0], encoding="unicode"),
+                source="ft",
+                timings={"total": time.perf_counter() - start}
+            )
+
+    fetcher.record("article", used_fallback=result is None)
+    return result
 
 if __name__ == "__main__":
     
-    with sync_playwright() as p:
-        article_url = "https://www.ft.com/content/db7251da-137d-43eb-a9c9-a27221ad2716"
-        
-        browser = p.chromium.launch(
-            headless=True,
-            args=["--disable-blink-features=AutomationControlled"]
-        )
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            viewport={"width": 1280, "height": 800}
-        )
-        page = context.new_page()
-
-        soup = fetch_article_paywall(page=page,article_url=article_url)
-
-        print(get_article_content_archive(
-            article_id=article_url,
-            scraped_at="date",
-            paywall=True,
-            section="Art",
-            category="Art",
-            soup=soup
-        ))
\ No newline at end of file
+    article_url = "https://www.ft.com/content/db7251da-137d-43eb-a9c9-a27221ad2716"
+
+    with get_browser_pool().lease() as page:
+        raw_html, opt = fetch_paywall_html(page=page,article_url=article_url)
+
+    close_browser_pool()
+
+    print(extract_article(
+        raw_html,
+        SOURCE_BY_OPTION[opt],
+        article_id=article_url,
+        scraped_at="date",
+        paywall=True,
+        section="Art",
+        category="Art"
+    ))
\ No newline at end of file
@@ -0,0 +1,194 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+import httpx
+
+from src.extract.browser import USER_AGENT
+from src.utils.ratelimit import get_host_limiter, backoff_delay, parse_retry_after, THROTTLE_STATUSES
+
+CACHE_DIR = "data/cache/http"
+
+
+class HttpFetcher:
+    """
+    Pooled HTTP client used before falling back to a browser.
+
+    One httpx.Client (keep-alive, HTTP/2, gzip/br decoding) is shared by
+    every thread. Listing pages can be revalidated with ETag /
+    Last-Modified against an on-disk cache, so unchanged pages cost a
+    304. Callers report whether the HTTP result was usable with
+    `record()`, which feeds the per-kind fallback rate.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, timeout=20.0, max_connections=32, http2=True, retries=2):
+        self.cache_dir = cache_dir
+        self.retries = retries
+        self.client = httpx.Client(
+            http2=http2,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": "en-GB,en;q=0.9"
+            }
+        )
+
+        self._lock = threading.Lock()
+        self.responses = defaultdict(int)
+        self.outcomes = defaultdict(lambda: {"http": 0, "fallback": 0})
+
+    # -----------------------------
+    # Revalidation cache
+    # -----------------------------
+
+    def _cache_path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _cache_load(self, url):
+        try:
+            with open(self._cache_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _cache_store(self, url, response):
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+
+        path = self._cache_path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": response.text
+            }, f)
+        os.replace(tmp_path, path)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+
+    def get(self, url, revalidate=False):
+        """
+        GET a page and return its HTML, or None on any non-200 answer.
+        With revalidate=True a cached copy is sent as a conditional
+        request and returned on 304 Not Modified.
+        """
+        headers = {}
+        cached = self._cache_load(url) if revalidate else None
+        if cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self._send(url, headers)
+        if response is None:
+            return None
+
+        if response.status_code == 304 and cached:
+            self._count_response("not_modified")
+            return cached["body"]
+
+        self._count_response(response.status_code)
+        if response.status_code != 200:
+            return None
+
+        if revalidate:
+            self._cache_store(url, response)
+        return response.text
+
+    def _send(self, url, headers):
+        """
+        GET through the per-host limiter, retrying 429/503 answers and
+        transport errors with jittered backoff. None if every attempt failed.
+        """
+        limiter = get_host_limiter()
+
+        for attempt in range(self.retries + 1):
+            response = None
+            with limiter.acquire(url) as ticket:
+                try:
+                    response = self.client.get(url, headers=headers)
+                except httpx.TimeoutException:
+                    ticket.timeout = True
+                except httpx.HTTPError:
+                    ticket.error = True
+                else:
+                    ticket.status = response.status_code
+                    if response.status_code in THROTTLE_STATUSES:
+                        ticket.retry_after = parse_retry_after(response.headers.get("retry-after"))
+
+            if response is not None and response.status_code not in THROTTLE_STATUSES:
+                return response
+            self._count_response("error" if response is None else response.status_code)
+            if attempt < self.retries:
+                time.sleep(backoff_delay(attempt))
+
+        return None
+
+    def _count_response(self, key):
+        with self._lock:
+            self.responses[key] += 1
+
+    def record(self, kind, used_fallback):
+        """
+        Count one page of `kind` ("listing", "article", ...) as served by
+        HTTP or by the browser fallback.
+        """
+        with self._lock:
+            self.outcomes[kind]["fallback" if used_fallback else "http"] += 1
+
+    def stats(self):
+        with self._lock:
+            outcomes = {}
+            for kind, counts in self.outcomes.items():
+                total = counts["http"] + counts["fallback"]
+                outcomes[kind] = dict(
+                    counts,
+                    fallback_rate=round(counts["fallback"] / total, 3) if total else 0.0
+                )
+            return {"responses": dict(self.responses), "pages": outcomes}
+
+    def close(self):
+        self.client.close()
+
+
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher(**kwargs):
+    """
+    Return the process-wide HttpFetcher, creating it on first use.
+    """
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = HttpFetcher(**kwargs)
+        return _default_fetcher
+
+
+def close_http_fetcher():
+    """
+    Close and forget the process-wide HttpFetcher.
+    """
+    global _default_fetcher
+    with _default_fetcher_lock:
+        fetcher, _default_fetcher = _default_fetcher, None
+    if fetcher is not None:
+        fetcher.close()
@@ -0,0 +1,207 @@
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+# Resource types we never read: the scrapers only look at DOM text.
+HEAVY_RESOURCE_TYPES = {"image", "media", "font"}
+
+# Ads, analytics and tag managers loaded by ft.com and the bypass services.
+TRACKER_DOMAINS = {
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagservices.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "adnxs.com",
+    "amazon-adsystem.com",
+    "scorecardresearch.com",
+    "chartbeat.com",
+    "chartbeat.net",
+    "permutive.com",
+    "permutive.app",
+    "krxd.net",
+    "moatads.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "hotjar.com",
+    "segment.io",
+}
+
+WAIT_MODES = ("domcontentloaded", "load", "networkidle")
+
+# Typical transfer size (bytes) per resource type, used to estimate what
+# a blocked request would have downloaded until responses of that type
+# have been seen (roughly the HTTP Archive medians for news pages).
+TYPICAL_BYTES = {
+    "image": 40_000,
+    "media": 500_000,
+    "font": 30_000,
+    "script": 25_000,
+    "stylesheet": 15_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "document": 50_000,
+}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+
+def _domain_matches(host, domains):
+    """
+    True if host is one of domains or a subdomain of one of them.
+    """
+    if not host:
+        return False
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class BlockingProfile:
+    """
+    page.route blocking rules for a browser context, with counters.
+
+    Domain rules win over resource-type rules, and allow lists win over
+    deny lists, so e.g. allow_domains={"ft.com"} with
+    deny_types={"image"} still blocks FT images but keeps FT scripts
+    while third-party trackers in deny_domains are dropped.
+
+    wait_until is the navigation wait used by listing pages:
+    "domcontentloaded" (DOM-ready), "load" or "networkidle".
+    """
+
+    def __init__(
+        self,
+        deny_types=None,
+        allow_types=None,
+        deny_domains=None,
+        allow_domains=None,
+        wait_until="domcontentloaded"
+    ):
+        if wait_until not in WAIT_MODES:
+            raise ValueError(f"wait_until must be one of {WAIT_MODES}, got {wait_until!r}")
+
+        self.deny_types = set(HEAVY_RESOURCE_TYPES if deny_types is None else deny_types)
+        self.allow_types = set(allow_types or ())
+        self.deny_domains = set(TRACKER_DOMAINS if deny_domains is None else deny_domains)
+        self.allow_domains = set(allow_domains or ())
+        self.wait_until = wait_until
+
+        self._lock = threading.Lock()
+        self.blocked_by_type = Counter()
+        self.blocked_by_domain = Counter()
+        self.requests_allowed = 0
+        self.bytes_received = 0
+        self.bytes_blocked_estimate = 0
+        self._received_by_type = Counter()
+        self._responses_by_type = Counter()
+
+    # -----------------------------
+    # Rules
+    # -----------------------------
+
+    def should_block(self, url, resource_type):
+        host = urlparse(url).hostname
+        if _domain_matches(host, self.allow_domains):
+            return resource_type in self.deny_types and resource_type not in self.allow_types
+        if _domain_matches(host, self.deny_domains):
+            return True
+        if resource_type in self.allow_types:
+            return False
+        return resource_type in self.deny_types
+
+    def _estimate(self, resource_type):
+        """
+        Expected size of a request of this type: the mean content-length
+        of the responses of that type received so far, else TYPICAL_BYTES.
+        Called with the lock held.
+        """
+        seen = self._responses_by_type[resource_type]
+        if seen:
+            return self._received_by_type[resource_type] // seen
+        return TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES)
+
+    def _record(self, request, blocked):
+        with self._lock:
+            if blocked:
+                self.blocked_by_type[request.resource_type] += 1
+                self.blocked_by_domain[urlparse(request.url).hostname or ""] += 1
+                self.bytes_blocked_estimate += self._estimate(request.resource_type)
+            else:
+                self.requests_allowed += 1
+
+    def _on_response(self, response):
+        try:
+            size = int(response.headers.get("content-length"))
+        except (TypeError, ValueError):
+            size = None
+        with self._lock:
+            if size is None:
+                return
+            self.bytes_received += size
+            resource_type = response.request.resource_type
+            self._received_by_type[resource_type] += size
+            self._responses_by_type[resource_type] += 1
+
+    # -----------------------------
+    # Route handlers
+    # -----------------------------
+
+    def _handle(self, route):
+        request = route.request
+        blocked = self.should_block(request.url, request.resource_type)
+        self._record(request, blocked)
+        if blocked:
+            route.abort()
+        else:
+            route.continue_()
+
+    async def _handle_async(self, route):
+        request = route.request
+        blocked = self.should_block(request.url, request.resource_type)
+        self._record(request, blocked)
+        if blocked:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def attach(self, context):
+        """
+        Install the profile on a sync Playwright browser context.
+        """
+        context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    async def attach_async(self, context):
+        """
+        Install the profile on an async Playwright browser context.
+        """
+        await context.route("**/*", self._handle_async)
+        context.on("response", self._on_response)
+
+    # -----------------------------
+    # Reporting
+    # -----------------------------
+
+    def stats(self):
+        """
+        Counters for the run: blocked requests per type and per domain,
+        requests let through and bytes received for them (from
+        content-length). Aborted requests never download, so the bytes
+        they saved are an estimate (see _estimate).
+        """
+        with self._lock:
+            return {
+                "requests_blocked": sum(self.blocked_by_type.values()),
+                "requests_allowed": self.requests_allowed,
+                "bytes_received": self.bytes_received,
+                "bytes_blocked_estimate": self.bytes_blocked_estimate,
+                "blocked_by_type": dict(self.blocked_by_type),
+                "blocked_by_domain": dict(self.blocked_by_domain.most_common(10)),
+            }
+
+
+def default_profile():
+    """
+    Profile used by the scrapers: drop images, media, fonts and tracker
+    domains, and treat DOM-ready as loaded.
+    """
+    return BlockingProfile()
@@ -1,10 +1,10 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
-import json
 
-from src.load.db import is_article_in_db, get_db_connection,get_latest_published_at_by_category
+from src.extract.browser import get_browser_pool, navigate
+from src.extract.http_client import get_http_fetcher
+from src.transform.cleaner import canonical_url
+from src.utils.helpers import parse_timestamp
+from src.load.db import get_existing_article_ids
 
 BASE_URL = "https://www.ft.com"
 
@@ -13,189 +13,134 @@ BASE_URL = "https://www.ft.com"
 # Article / Section Utilities
 # -----------------------------
 
-def get_leaf_articles(p, leaf_url):
-    
+def parse_leaf_links(html):
     """
-    Given a leaf section URL, return a list of unique article links.
+    Extract unique /content/ links from the #stream of a leaf page.
+    Returns None when the page has no stream.
     """
-    links = set()
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-
-    try:
-        page.goto(leaf_url, timeout=60000, wait_until="networkidle")
-        page.wait_for_selector("#stream", timeout=30000)
-
-        soup = BeautifulSoup(page.content(), "html.parser")
-        site_content = soup.find("div", id="stream")
-
-        for a_tag in site_content.find_all("li", href=True):
-            href = a_tag['href']
-            if href.startswith("/content/"):
-                links.add(BASE_URL + href)
-        
-        return list(links)
-    except:
-        pass
-
-    finally:
-        browser.close()
-
-def get_new_articles(p, collection, leaf_url):
-    articles = []
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-
-    try:
-        page.goto(leaf_url, timeout=60000, wait_until="networkidle")
-        page.wait_for_selector("#stream", timeout=30000)
-
-        soup = BeautifulSoup(page.content(), "html.parser")
-        site_content = soup.find("div", id="stream")
-        if not site_content:
-            return []
-
-        for li in site_content.find_all("li", class_="o-teaser-collection__item"):
-            a_tag = li.find("a", class_="js-teaser-heading-link")
-            if not a_tag or not a_tag.has_attr("href"):
-                continue  # skip if no <a> or no href
+    soup = BeautifulSoup(html, "html.parser")
+    site_content = soup.find("div", id="stream")
+    if not site_content:
+        return None
 
-            href = a_tag["href"]
-            if not href.startswith("http"):
-                href = BASE_URL.rstrip("/") + href
-
-            if is_article_in_db(collection, href):
-                continue  # skip already stored articles
-            articles.append(href)
-
-        return articles
-
-    except Exception as e:
-        # print(f"Error fetching articles: {e}")
-        return []
-
-    finally:
-        browser.close()
+    links = set()
+    for a_tag in site_content.find_all("li", href=True):
+        href = a_tag['href']
+        if href.startswith("/content/"):
+            links.add(BASE_URL + href)
+    return list(links)
 
-def has_subsections(p, url):
+def load_listing(leaf_url, parse):
     """
-    Check if a section has child subsections.
-    Returns (True/False, list of <li> items if found).
+    Fetch a listing page over HTTP (revalidated against the local cache)
+    and parse it; fall back to the browser when the #stream is missing.
+    Returns the parsed result or None.
     """
-    browser = p.chromium.launch(headless=True)
-    page = browser.new_page()
-
-    try:
-        page.goto(url, timeout=60000)
-        subnav_html = page.locator(
-            "ul.o-header__subnav-list--children"
-        ).evaluate("el => el.outerHTML")
+    fetcher = get_http_fetcher()
+    html = fetcher.get(leaf_url, revalidate=True)
+    parsed = parse(html) if html else None
+    fetcher.record("listing", used_fallback=parsed is None)
+    if parsed is not None:
+        return parsed
+
+    pool = get_browser_pool()
+    with pool.lease() as page:
+        try:
+            navigate(page, leaf_url, timeout=60000, wait_until=pool.wait_until)
+            page.wait_for_selector("#stream", timeout=30000)
+            return parse(page.content())
+        except Exception:
+            return None
+
+def get_leaf_articles(leaf_url):
 
-        soup = BeautifulSoup(subnav_html, "html.parser")
-        items = soup.find_all("li", class_="o-header__subnav-item")
-        return bool(items), items
-
-    except Exception:
-        return False, []
-
-    finally:
-        browser.close()
+    """
+    Given a leaf section URL, return a list of unique article links.
+    """
+    return load_listing(leaf_url, parse_leaf_links)
 
-def collect_leaf_sections(p, items, base_url=BASE_URL):
+def parse_stream_teasers(html):
     """
-    Recursively collect all leaf section URLs starting from given items.
+    Extract (absolute link, published datetime or None) for every teaser
+    in the #stream of a section page, in page order.
+    Returns None when the page has no stream.
     """
-    leaf_urls = set()
+    soup = BeautifulSoup(html, "html.parser")
+    site_content = soup.find("div", id="stream")
+    if not site_content:
+        return None
 
-    for item in items:
-        url = base_url + item.a["href"]
-        print("🔎 Searching:", url)
+    teasers = []
+    for li in site_content.find_all("li", class_="o-teaser-collection__item"):
+        a_tag = li.find("a", class_="js-teaser-heading-link")
+        if not a_tag or not a_tag.has_attr("href"):
+            continue  # skip if no <a> or no href
 
-        found, subitems = has_subsections(p, url)
+        href = a_tag["href"]
+        if not href.startswith("http"):
+            href = BASE_URL.rstrip("/") + href
 
-        if not found:
-            leaf_urls.add(url)
-        else:
-            leaf_urls.update(collect_leaf_sections(p, subitems, base_url))
+        time_tag = li.find("time", attrs={"datetime": True})
+        teasers.append((href, parse_timestamp(time_tag["datetime"]) if time_tag else None))
 
-    return list(leaf_urls)
+    return teasers
 
-def find_leaf_sections(p, section_url):
+def parse_stream_links(html):
     """
-    Entry point: given a top-level section, find its leaf subsections.
+    Extract absolute teaser links from the #stream of a section page.
+    Returns None when the page has no stream.
     """
-    found, items = has_subsections(p, section_url)
-    return section_url if not found else collect_leaf_sections(p, items, BASE_URL)
+    teasers = parse_stream_teasers(html)
+    return None if teasers is None else [href for href, _ in teasers]
 
-# -----------------------------
-# Parallel Section Processor
-# -----------------------------
-def process_section(main_url, href):  
+def teasers_after(teasers, watermark):
     """
-    Worker function to process one top-level section.
-    Returns (section_name, leafSections).
+    Cut a newest-first teaser list at the first teaser published at or
+    before the watermark. Teasers without a timestamp are kept. Returns
+    [] straight away when even the newest teaser is not newer.
     """
-    with sync_playwright() as p:
-        full_url = main_url + href
-        section_name = full_url.strip("/").split("/")[-1]
+    if watermark is None:
+        return [href for href, _ in teasers]
+
+    dated = [published for _, published in teasers if published is not None]
+    if dated and max(dated) <= watermark:
+        return []
 
-        leaf_sections = find_leaf_sections(p, full_url)
-        return section_name, leaf_sections
+    links = []
+    for href, published in teasers:
+        if published is not None and published <= watermark:
+            break  # already-seen content from here on
+        links.append(href)
+    return links
 
-def update_sections():
+def get_new_articles(collection, leaf_url, known=None, watermark=None):
     """
-    Crawl FT main nav → resolve to leaf sections → save to JSON.
+    List a leaf section and return the canonical URLs of articles not
+    stored yet. With a warmed KnownArticleIds set no database call is
+    made; otherwise all links are checked in one bulk query.
+    With a watermark (aware datetime) only teasers newer than it are
+    considered, and a leaf with nothing newer is skipped.
+    Returns None when the page could not be listed or the stored ids
+    could not be checked, so the caller can retry the leaf.
     """
-    results = {
-        "last_update": datetime.now().isoformat(),
-        "sections": {}
-    }
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-        page.goto(BASE_URL, timeout=60000)
-
-        # Extract nav items
-        nav_html = page.locator("nav#o-header-nav-desktop").evaluate("el => el.outerHTML")
-        soup = BeautifulSoup(nav_html, "html.parser")
-        items = soup.find_all("li", class_="o-header__nav-item")
-        browser.close()
-
-    # Collect all hrefs except "/"
-    hrefs = [item.a["href"] for item in items if item.a and item.a["href"] != "/"]
-
-    # For demo → limit to 1 section
-    hrefs = hrefs[:5]
-
-    # Parallel processing
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = [executor.submit(process_section, BASE_URL, href) for href in hrefs]
-
-        for future in as_completed(futures):
-            section_name, leaf_sections = future.result()
-            results["sections"][section_name] = leaf_sections
-            print(f"Leaf Sections of {section_name}: {leaf_sections}")
-
-    # Save JSON
-    with open("data/metadata/ft_structure.json", "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=4, ensure_ascii=False)
-
-    print("FT structure saved to data/metadata/ft_structure.json")
-
-# -----------------------------
-# Demo
-# -----------------------------
-
-'''
-if __name__ == "__main__":
-
-    with sync_playwright() as p:
-
-        collection=get_db_connection()
+    teasers = load_listing(leaf_url, parse_stream_teasers)
+    if teasers is None:
+        return None
+    if not teasers:
+        return []
 
-        new_articles = get_new_articles(p=p, collection=collection, leaf_url="https://www.ft.com/middle-east-war")
+    links = teasers_after(teasers, watermark)
+    if not links:
+        return []
 
-        print(new_articles)
+    links = list(dict.fromkeys(canonical_url(href) for href in links))
 
-'''
\ No newline at end of file
+    try:
+        # skip already stored articles
+        if known is not None:
+            return known.filter_new(links)
+        existing = get_existing_article_ids(collection, links)
+        return [href for href in links if href not in existing]
+    except Exception as e:
+        print(f"Error checking stored articles for {leaf_url}: {e}")
+        return None
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from bs4 import BeautifulSoup
+
+from src.extract.browser import get_browser_pool, navigate, BrowserWorkers
+from src.extract.http_client import get_http_fetcher
+
+BASE_URL = "https://www.ft.com"
+STRUCTURE_PATH = "data/metadata/ft_structure.json"
+NAV_CACHE_PATH = "data/metadata/ft_nav_cache.json"
+DIFF_PATH = "data/metadata/ft_structure_diff.json"
+# Cached nodes probed longer ago than this are probed again even when
+# their parent's subnav did not change
+NODE_MAX_AGE = timedelta(days=30)
+
+
+# -----------------------------
+# Probing
+# -----------------------------
+
+def _load_page(url, selector):
+    """
+    Return the page HTML, over HTTP when the header markup is there,
+    otherwise from a leased browser page. None on failure.
+    """
+    fetcher = get_http_fetcher()
+    html = fetcher.get(url)
+    usable = bool(html) and "o-header" in html
+    fetcher.record("section", used_fallback=not usable)
+    if usable:
+        return html
+
+    pool = get_browser_pool()
+    with pool.lease() as page:
+        try:
+            navigate(page, url, timeout=60000, wait_until=pool.wait_until)
+            page.wait_for_selector(selector, timeout=10000, state="attached")
+            return page.content()
+        except Exception:
+            return None
+
+def parse_nav_hrefs(html):
+    """
+    Top-level section hrefs from the desktop main nav, except "/".
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    nav = soup.find("nav", id="o-header-nav-desktop")
+    if not nav:
+        return []
+    items = nav.find_all("li", class_="o-header__nav-item")
+    return [item.a["href"] for item in items if item.a and item.a.get("href") and item.a["href"] != "/"]
+
+def parse_subnav_children(html, base_url=BASE_URL):
+    """
+    Absolute URLs of a section's child subsections (empty for a leaf).
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    subnav = soup.find("ul", class_="o-header__subnav-list--children")
+    if not subnav:
+        return []
+
+    children = []
+    for item in subnav.find_all("li", class_="o-header__subnav-item"):
+        if item.a and item.a.get("href"):
+            href = item.a["href"]
+            children.append(href if href.startswith("http") else base_url + href)
+    return children
+
+def probe_section(url):
+    """
+    Fetch one section page and return (children, digest), where digest
+    fingerprints the subnav so unchanged nodes can be detected.
+    Returns None when the page could not be loaded.
+    """
+    html = _load_page(url, "header")
+    if html is None:
+        return None
+    children = parse_subnav_children(html)
+    digest = hashlib.sha1("\n".join(sorted(children)).encode("utf-8")).hexdigest()
+    return children, digest
+
+
+# -----------------------------
+# Incremental BFS
+# -----------------------------
+
+def _is_fresh(entry, max_age):
+    try:
+        return datetime.now() - datetime.fromisoformat(entry["probed_at"]) <= max_age
+    except (KeyError, TypeError, ValueError):
+        return False
+
+def crawl_section_tree(root_urls, cache=None, max_workers=8, max_age=NODE_MAX_AGE):
+    """
+    Breadth-first crawl of the section tree below root_urls.
+
+    All roots share one visited set, and each level is probed
+    concurrently. When a node's subnav digest matches the cached one,
+    its cached subtree is reused without probing its descendants, except
+    for cached nodes probed more than max_age ago, which are probed again
+    (so changes deep in the tree are picked up within max_age).
+
+    Returns (nodes, probed): the node table {url: {"digest", "children",
+    "probed_at"}} and the number of pages actually fetched.
+    """
+    cache = cache or {}
+    nodes = {}
+    visited = set(root_urls)
+    frontier = list(root_urls)
+    probed = 0
+
+    def reuse_cached(url, to_probe):
+        # nodes that have to be probed (unknown or stale) go to to_probe
+        stack = [url]
+        while stack:
+            node_url = stack.pop()
+            entry = cache.get(node_url)
+            if entry is None or not _is_fresh(entry, max_age):
+                to_probe.append(node_url)
+                continue
+            nodes[node_url] = entry
+            for child in entry["children"]:
+                if child not in visited:
+                    visited.add(child)
+                    stack.append(child)
+
+    with BrowserWorkers(max_workers=max_workers) as executor:
+        while frontier:
+            next_frontier = []
+            results = executor.map(probe_section, frontier)
+            probed += len(frontier)
+
+            for url, result in zip(frontier, results):
+                cached = cache.get(url)
+
+                if result is None:
+                    # keep what we knew; an unreachable unknown node is a leaf
+                    nodes[url] = cached or {"digest": None, "children": [], "probed_at": None}
+                    children, unchanged = nodes[url]["children"], cached is not None
+                else:
+                    children, digest = result
+                    nodes[url] = {
+                        "digest": digest,
+                        "children": children,
+                        "probed_at": datetime.now().isoformat()
+                    }
+                    unchanged = cached is not None and cached["digest"] == digest
+
+                for child in children:
+                    if child in visited:
+                        continue
+                    visited.add(child)
+                    if unchanged:
+                        reuse_cached(child, next_frontier)
+                    else:
+                        next_frontier.append(child)
+
+            frontier = next_frontier
+
+    return nodes, probed
+
+def leaf_sections(nodes, root_url):
+    """
+    All leaf URLs below root_url (the root itself if it has no children).
+    """
+    leaves, seen, stack = [], {root_url}, [root_url]
+    while stack:
+        url = stack.pop()
+        children = nodes.get(url, {}).get("children", [])
+        if not children:
+            leaves.append(url)
+        for child in children:
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+    return sorted(leaves)
+
+def diff_structures(old_sections, new_sections):
+    """
+    Per-section added / removed leaves between two structures.
+    """
+    diff = {}
+    for name in sorted(set(old_sections) | set(new_sections)):
+        old = set(old_sections.get(name, []))
+        new = set(new_sections.get(name, []))
+        if old != new:
+            diff[name] = {"added": sorted(new - old), "removed": sorted(old - new)}
+    return diff
+
+
+# -----------------------------
+# Entry point
+# -----------------------------
+
+def _read_json(path, default):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+def update_sections(full=False, max_workers=8, max_age=NODE_MAX_AGE):
+    """
+    Crawl FT main nav → resolve to leaf sections → save to JSON.
+
+    Only subtrees whose subnav changed since the last crawl, and nodes
+    probed more than max_age ago, are re-probed (full=True ignores the
+    cache). The added/removed leaves are written to
+    data/metadata/ft_structure_diff.json.
+    """
+    html = _load_page(BASE_URL, "nav#o-header-nav-desktop")
+    hrefs = parse_nav_hrefs(html) if html else []
+    if not hrefs:
+        print("Could not read the FT main nav; keeping the current structure.")
+        return None
+
+    roots = {href.strip("/").split("/")[-1]: BASE_URL + href for href in hrefs}
+
+    cache = {} if full else _read_json(NAV_CACHE_PATH, {}).get("nodes", {})
+    nodes, probed = crawl_section_tree(list(roots.values()), cache=cache, max_workers=max_workers, max_age=max_age)
+
+    sections = {name: leaf_sections(nodes, url) for name, url in roots.items()}
+    for name, leaves in sections.items():
+        print(f"Leaf Sections of {name}: {len(leaves)}")
+
+    previous = _read_json(STRUCTURE_PATH, {}).get("sections", {})
+    now = datetime.now().isoformat()
+    diff = diff_structures(previous, sections)
+
+    _write_json(STRUCTURE_PATH, {"last_update": now, "sections": sections})
+    _write_json(NAV_CACHE_PATH, {"last_update": now, "nodes": nodes})
+    _write_json(DIFF_PATH, {"last_update": now, "probed": probed, "nodes": len(nodes), "sections": diff})
+
+    print(f"Probed {probed} of {len(nodes)} section pages; {len(diff)} sections changed.")
+    print(f"FT structure saved to {STRUCTURE_PATH}")
+    return diff
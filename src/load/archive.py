@@ -0,0 +1,182 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+ARCHIVE_DIR = "data/archive/raw"
+MAX_ARCHIVE_BYTES = 2 * 1024 ** 3
+
+
+def url_key(article_url):
+    return hashlib.sha1(article_url.encode("utf-8")).hexdigest()
+
+def content_hash(raw_html):
+    return hashlib.sha256(raw_html.encode("utf-8")).hexdigest()[:16]
+
+
+class RawHtmlArchive:
+    """
+    Content-addressed, gzip-compressed store of fetched article HTML.
+
+    Each record lives at <root>/<key[:2]>/<key>-<content hash>.json.gz,
+    where key is the SHA-1 of the article URL, so a changed page gets a
+    new record next to the old one and an unchanged page is stored once.
+    Records carry the metadata needed to re-run the transform stage.
+    When the archive grows past max_bytes the least recently written
+    records are evicted.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, max_bytes=MAX_ARCHIVE_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size = None
+
+    # -----------------------------
+    # Paths
+    # -----------------------------
+
+    def _dir(self, key):
+        return os.path.join(self.root, key[:2])
+
+    def _path(self, key, digest):
+        return os.path.join(self._dir(key), f"{key}-{digest}.json.gz")
+
+    def _iter_files(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in os.scandir(self.root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json.gz"):
+                    yield entry
+
+    def _total_size(self):
+        if self._size is None:
+            self._size = sum(entry.stat().st_size for entry in self._iter_files())
+        return self._size
+
+    # -----------------------------
+    # Write
+    # -----------------------------
+
+    def put(self, article_url, raw_html, meta=None):
+        """
+        Store the HTML of an article with its metadata (section,
+        category, source, paywall, scraped_at, ...).
+        Returns the record path.
+        """
+        key = url_key(article_url)
+        digest = content_hash(raw_html)
+        path = self._path(key, digest)
+
+        with self._lock:
+            self._total_size()
+
+        if os.path.exists(path):
+            os.utime(path)  # refresh for eviction order
+            return path
+
+        record = {
+            "article_url": article_url,
+            "content_hash": digest,
+            "archived_at": datetime.now().isoformat(),
+            "meta": meta or {},
+            "html": raw_html
+        }
+
+        os.makedirs(self._dir(key), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._size += os.path.getsize(path)
+            over_budget = self._size > self.max_bytes
+        if over_budget:
+            self.evict()
+        return path
+
+    def evict(self):
+        """
+        Delete the oldest records until the archive fits in max_bytes
+        (with 10% headroom so eviction does not run on every write).
+        """
+        with self._lock:
+            entries = sorted(self._iter_files(), key=lambda e: e.stat().st_mtime)
+            total = sum(e.stat().st_size for e in entries)
+            target = int(self.max_bytes * 0.9)
+            evicted = 0
+            for entry in entries:
+                if total <= target:
+                    break
+                size = entry.stat().st_size
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+                total -= size
+                evicted += 1
+            self._size = total
+        if evicted:
+            print(f"Raw archive: evicted {evicted} records")
+        return evicted
+
+    # -----------------------------
+    # Read
+    # -----------------------------
+
+    @staticmethod
+    def load(path):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def get(self, article_url):
+        """
+        Latest record for an article URL, or None.
+        """
+        key = url_key(article_url)
+        directory = self._dir(key)
+        if not os.path.isdir(directory):
+            return None
+        candidates = [
+            e for e in os.scandir(directory)
+            if e.name.startswith(key + "-") and e.name.endswith(".json.gz")
+        ]
+        if not candidates:
+            return None
+        return self.load(max(candidates, key=lambda e: e.stat().st_mtime).path)
+
+    def latest_paths(self, since=None):
+        """
+        Path of the most recent record of every archived URL, optionally
+        only those written after `since` (datetime).
+        """
+        latest = {}
+        for entry in self._iter_files():
+            mtime = entry.stat().st_mtime
+            if since is not None and mtime < since.timestamp():
+                continue
+            key = entry.name.split("-", 1)[0]
+            if key not in latest or mtime > latest[key][0]:
+                latest[key] = (mtime, entry.path)
+        return [path for _, path in latest.values()]
+
+
+_default_archive = None
+_default_archive_lock = threading.Lock()
+
+
+def get_raw_archive(**kwargs):
+    """
+    Return the process-wide RawHtmlArchive, creating it on first use.
+    """
+    global _default_archive
+    with _default_archive_lock:
+        if _default_archive is None:
+            _default_archive = RawHtmlArchive(**kwargs)
+        return _default_archive
@@ -1,43 +1,180 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, DuplicateKeyError
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError
 from pymongo.collection import Collection
 from typing import Optional
 from datetime import datetime, timedelta, timezone
+import atexit
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
+from src.transform.near_dup import fingerprint_fields, closest, group_near_duplicates
+from src.transform.revisions import paragraph_hashes
+from src.utils.helpers import parse_timestamp
+
 load_dotenv(dotenv_path=".env")
 
+DB_NAME = "news_scraper"
+COLLECTION_NAME = "articles"
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client_options(**overrides):
+    """
+    MongoClient pool, timeout, compression and read preference settings,
+    read from the environment (DB_MAX_POOL_SIZE, DB_COMPRESSORS, ...)
+    when not given.
+    """
+    options = {
+        "maxPoolSize": int(os.getenv("DB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.getenv("DB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.getenv("DB_MAX_IDLE_MS", "300000")),
+        "serverSelectionTimeoutMS": int(os.getenv("DB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+        "connectTimeoutMS": int(os.getenv("DB_CONNECT_TIMEOUT_MS", "10000")),
+        "socketTimeoutMS": int(os.getenv("DB_SOCKET_TIMEOUT_MS", "60000")),
+        # unavailable compressors are skipped by the driver with a warning
+        "compressors": os.getenv("DB_COMPRESSORS", "zstd,snappy,zlib"),
+        "readPreference": os.getenv("DB_READ_PREFERENCE", "primaryPreferred"),
+        "retryWrites": True,
+        "tz_aware": True,
+        "appname": "ft_scraper"
+    }
+    options.update({key: value for key, value in overrides.items() if value is not None})
+    return options
+
+def get_client(uri=None, **overrides):
+    """
+    Process-wide MongoClient for a URI (and options), created and
+    checked once, then shared by every thread and caller.
+
+    Returns:
+        MongoClient or None if the server cannot be reached
+    """
+    uri = uri or os.getenv("DB_URL")
+    options = client_options(**overrides)
+    key = (uri, tuple(sorted(options.items())))
+
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is not None:
+            return client
+
+        try:
+            client = MongoClient(uri, **options)
+            client.admin.command("ping")  # forces connection check
+        except ConnectionFailure as e:
+            print(f"Could not connect to MongoDB Atlas: {e}")
+            return None
+
+        _clients[key] = client
+        print("Connected to MongoDB Atlas!")
+        return client
+
+def close_clients():
+    """
+    Close every shared MongoClient.
+    """
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
 def get_db_connection(
-    uri=os.getenv("DB_URL"),
-    db_name="news_scraper",
-    collection_name="articles"
+    uri=None,
+    db_name=DB_NAME,
+    collection_name=COLLECTION_NAME,
+    **client_overrides
 ):
     """
-    Connect to MongoDB Atlas and return the collection object.
+    Return the articles collection on the shared client. Indexes are not
+    created here: run the migration step (python -m src.load.migrations).
 
     Args:
-        uri (str): MongoDB Atlas connection URI
+        uri (str): MongoDB Atlas connection URI (default: DB_URL from the environment)
         db_name (str): Database name
         collection_name (str): Collection name
+        client_overrides: MongoClient options (see client_options)
 
     Returns:
         collection (pymongo.collection.Collection) or None if connection fails
     """
+    client = get_client(uri, **client_overrides)
+    if client is None:
+        return None
+    return client[db_name][collection_name]
+
+def normalize_article(article: dict):
+    """
+    Typed fields stored with every article: published_at / updated_at
+    as datetimes (BSON dates) instead of the page's ISO strings, and
+    has_content / content_length so range queries need no predicate on
+    the content array.
+
+    Returns:
+        dict: the article, updated in place
+    """
+    for field in ("published_at", "updated_at"):
+        if isinstance(article.get(field), str):
+            article[field] = parse_timestamp(article[field]) or article[field]
+    content = article.get("content") or []
+    article["has_content"] = bool(content)
+    article["content_length"] = sum(len(p) for p in content)
+    return article
+
+def mark_near_duplicates(collection, articles):
+    """
+    Normalize each article (normalize_article), store its content
+    fingerprint and paragraph hashes and, when a stored article (or an
+    earlier one of the batch) is within a few bits of it, point
+    duplicate_of at the root of that article's duplicate group. Candidates for the whole batch come from
+    one indexed query on the LSH bands.
+
+    Args:
+        collection: MongoDB collection object
+        articles (list of dict): Article data (updated in place)
+    """
+    bands = set()
+    for article in articles:
+        normalize_article(article)
+        article["paragraph_hashes"] = paragraph_hashes(article.get("content"))
+        article.update(fingerprint_fields(article.get("content")))
+        article["duplicate_of"] = None
+        bands.update(article.get("simhash_bands", []))
+    if not bands or collection is None:
+        return
+
     try:
-        client = MongoClient(uri, serverSelectionTimeoutMS=5000)
-        client.server_info()  # forces connection check
-        db = client[db_name]
-        collection = db[collection_name]
+        candidates = list(collection.find(
+            {
+                "simhash_bands": {"$in": list(bands)},
+                "article_id": {"$nin": [a["article_id"] for a in articles]}
+            },
+            {"article_id": 1, "simhash": 1, "duplicate_of": 1, "_id": 0}
+        ).limit(50 * len(articles)))
+    except Exception as e:
+        print(f"Near-duplicate lookup failed: {e}")
+        return
 
-        # Ensure article_id is unique
-        collection.create_index("article_id", unique=True)
-        print("Connected to MongoDB Atlas!")
-        return collection
+    for article in articles:
+        if article.get("simhash"):
+            match = closest(int(article["simhash"], 16), candidates)
+            if match:
+                article["duplicate_of"] = match.get("duplicate_of") or match["article_id"]
+            candidates.append(article)
 
-    except ConnectionFailure as e:
-        print(f"Could not connect to MongoDB Atlas: {e}")
-        return None
+def mark_near_duplicate(collection, article: dict):
+    """
+    mark_near_duplicates for a single article.
+
+    Returns:
+        str or None: article_id of the group root
+    """
+    mark_near_duplicates(collection, [article])
+    return article["duplicate_of"]
 
 def insert_article(collection, article: dict):
     """
@@ -55,6 +192,7 @@ def insert_article(collection, article: dict):
         return None
 
     try:
+        mark_near_duplicate(collection, article)
         result = collection.insert_one(article)
         print(f"Article inserted with _id: {result.inserted_id}")
         return result.inserted_id
@@ -67,6 +205,141 @@ def insert_article(collection, article: dict):
         print(f"Failed to insert article: {e}")
         return None
 
+# Fields written by the refresh job (apply_article_changes) that a
+# re-extracted article must not overwrite
+REFRESH_FIELDS = ("revisions", "checked_at")
+# Fields kept from the first load of an article
+INSERT_ONLY_FIELDS = ("scraped_at",)
+
+def article_upsert(article: dict):
+    """
+    UpdateOne that stores an extracted article without replacing the
+    stored document: extracted fields are $set, insert-only fields are
+    $setOnInsert and refresh-owned fields are left untouched.
+    """
+    fields = {
+        k: v for k, v in article.items()
+        if k not in ("_id", "article_id") + REFRESH_FIELDS + INSERT_ONLY_FIELDS
+    }
+    update = {"$set": fields}
+    on_insert = {k: article[k] for k in INSERT_ONLY_FIELDS if k in article}
+    if on_insert:
+        update["$setOnInsert"] = on_insert
+    return UpdateOne({"article_id": article["article_id"]}, update, upsert=True)
+
+def get_newer_article_ids(collection, articles):
+    """
+    The article_ids of `articles` whose stored copy has a later
+    updated_at (e.g. updated by the refresh job after the page was
+    archived), which an upsert would roll back.
+    """
+    given = {
+        a["article_id"]: parse_timestamp(a.get("updated_at"))
+        for a in articles if a.get("article_id")
+    }
+    cursor = collection.find(
+        {"article_id": {"$in": list(given)}, "updated_at": {"$ne": None}},
+        {"article_id": 1, "updated_at": 1, "_id": 0}
+    )
+    newer = set()
+    for doc in cursor:
+        stored, fresh = parse_timestamp(doc.get("updated_at")), given.get(doc["article_id"])
+        if stored and fresh and stored > fresh:
+            newer.add(doc["article_id"])
+    return newer
+
+def get_articles_to_refresh(collection, window=timedelta(days=2), cadence=timedelta(hours=6), limit=500):
+    """
+    Articles published within `window` that were not checked for
+    changes in the last `cadence`, oldest check first. Only the fields
+    needed to diff them are returned (paragraph hashes, not content;
+    content only for articles stored before paragraph hashes existed).
+
+    Returns:
+        list of dict, or [] on error
+    """
+    if collection is None:
+        print("No database connection.")
+        return []
+
+    now = datetime.now(timezone.utc)
+    try:
+        due = list(collection.find(
+            {
+                "published_at": {"$gte": now - window},
+                "$or": [
+                    {"checked_at": {"$exists": False}},
+                    {"checked_at": {"$lt": now - cadence}}
+                ]
+            },
+            {
+                "_id": 0, "article_id": 1, "section": 1, "category": 1, "paywall": 1,
+                "paragraph_hashes": 1, "checked_at": 1,
+                "topper__primary_theme": 1, "topper__headline": 1, "standfirst": 1,
+                "byline": 1, "updated_at": 1, "media": 1
+            }
+        ).sort("checked_at", 1).limit(limit))
+
+        # stored before paragraph hashes existed: diff against the content
+        legacy = [a["article_id"] for a in due if a.get("paragraph_hashes") is None]
+        if legacy:
+            content = {
+                doc["article_id"]: doc.get("content") or []
+                for doc in collection.find({"article_id": {"$in": legacy}}, {"_id": 0, "article_id": 1, "content": 1})
+            }
+            for article in due:
+                if article["article_id"] in content:
+                    article["content"] = content[article["article_id"]]
+        return due
+
+    except Exception as e:
+        print(f"Error fetching articles to refresh: {e}")
+        return []
+
+def apply_article_changes(collection, article_id, changes=None, revision=None, max_revisions=10):
+    """
+    Record a change check of a stored article: $set the changed fields
+    (if any) and push a revision, keeping the last max_revisions.
+    checked_at is always updated.
+
+    Returns:
+        bool: True if the update matched the article
+    """
+    if collection is None:
+        print("No database connection.")
+        return False
+
+    now = datetime.now(timezone.utc)
+    update = {"$set": dict(changes or {}, checked_at=now)}
+    if revision:
+        update["$push"] = {"revisions": {"$each": [dict(revision, at=now)], "$slice": -max_revisions}}
+
+    try:
+        return collection.update_one({"article_id": article_id}, update).matched_count > 0
+
+    except Exception as e:
+        print(f"Failed to update article {article_id}: {e}")
+        return False
+
+def set_article_appearances(collection, article_id, appearances):
+    """
+    Replace the section/category appearances of a stored article
+    (when it was listed under another section after being loaded).
+
+    Returns:
+        bool: True if a stored article was updated
+    """
+    if collection is None:
+        return False
+
+    try:
+        result = collection.update_one({"article_id": article_id}, {"$set": {"appearances": appearances}})
+        return result.modified_count > 0
+
+    except Exception as e:
+        print(f"Failed to update appearances of {article_id}: {e}")
+        return False
+
 def get_latest_published_at_by_category(
     collection: Collection, category: str
 ) -> Optional[datetime]:
@@ -103,27 +376,132 @@ def get_latest_published_at_by_category(
         print(f"Error fetching latest published_at: {e}")
         return None
     
-def load_articles(collection):
+def get_latest_published_at_by_categories(collection: Collection, categories=None) -> dict:
+    """
+    Fetch the most recent published_at of every category in one
+    aggregation (the watermarks used by incremental crawling).
+
+    Args:
+        collection (pymongo.collection.Collection): MongoDB collection object
+        categories (iterable, optional): Restrict to these categories
+
+    Returns:
+        dict: {category: latest published_at}
+    """
+    if collection is None:
+        print("No database connection.")
+        return {}
+
+    pipeline = []
+    if categories is not None:
+        pipeline.append({"$match": {"category": {"$in": list(categories)}}})
+    pipeline.append({"$group": {"_id": "$category", "latest": {"$max": "$published_at"}}})
+
     try:
-        # Load articles
-        articles = list(collection.find({}, {
-            "article_id": 1,
-            "topper__headline": 1,
-            "standfirst": 1,
-            "content": 1,
-            "byline": 1,
-            "published_at": 1,
-            "media": 1,
-            "section": 1,
-            "category": 1
-        }))
-        return articles
+        return {
+            doc["_id"]: doc["latest"]
+            for doc in collection.aggregate(pipeline)
+            if doc["_id"] is not None and doc["latest"] is not None
+        }
 
     except Exception as e:
-        print(f"Error fetching articles : {e}")
-        return None
+        print(f"Error fetching category watermarks: {e}")
+        return {}
+
+ARTICLE_FIELDS = (
+    "article_id",
+    "topper__headline",
+    "standfirst",
+    "content",
+    "byline",
+    "published_at",
+    "media",
+    "section",
+    "category",
+)
+
+def iter_articles(
+    collection,
+    fields=ARTICLE_FIELDS,
+    since=None,
+    until=None,
+    categories=None,
+    has_content=None,
+    after_id=None,
+    page_size=5000,
+    batch_size=500
+):
+    """
+    Yield articles one by one at constant memory, in _id order.
+
+    The collection is read in pages of page_size documents, each page a
+    short cursor starting after the last _id seen (so no cursor stays
+    open for the whole scan), fetched from the server batch_size
+    documents at a time. A scan can be resumed by passing the last
+    yielded _id as after_id.
+
+    Args:
+        collection: MongoDB collection object
+        fields (iterable or None): Fields to return (None: whole documents); _id is always included
+        since / until (datetime): published_at range [since, until)
+        categories (iterable): Restrict to these categories
+        has_content (bool): Only articles with (or without) content
+        after_id: Resume after this _id
+        page_size (int): Documents per cursor
+        batch_size (int): Documents per server round-trip
+
+    Yields:
+        dict: One article document
+    """
+    if collection is None:
+        print("No database connection.")
+        return
+
+    query = {}
+    if since is not None or until is not None:
+        query["published_at"] = {}
+        if since is not None:
+            query["published_at"]["$gte"] = since
+        if until is not None:
+            query["published_at"]["$lt"] = until
+    if categories is not None:
+        query["category"] = {"$in": list(categories)}
+    if has_content is not None:
+        query["has_content"] = has_content
+    projection = {field: 1 for field in fields} if fields is not None else None
 
-def get_recent_articles(collection):
+    last_id = after_id
+    while True:
+        page_query = dict(query, _id={"$gt": last_id}) if last_id is not None else query
+        cursor = (
+            collection.find(page_query, projection)
+            .sort("_id", 1)
+            .limit(page_size)
+            .batch_size(batch_size)
+        )
+        count = 0
+        for doc in cursor:
+            count += 1
+            last_id = doc["_id"]
+            yield doc
+        if count < page_size:
+            return
+
+def load_articles(collection):
+    """
+    Every article (ARTICLE_FIELDS only), streamed by iter_articles at
+    constant memory. Returns a generator: wrap it in list() only if
+    the whole collection is needed at once.
+    """
+    return iter_articles(collection, fields=ARTICLE_FIELDS)
+
+def get_recent_articles(collection, collapse_duplicates=True):
+    """
+    Articles with content published in the last 24 hours. With
+    collapse_duplicates, near-duplicate articles (live-blog updates,
+    rewrites, re-published pieces) are returned once: the representative
+    carries the others under "duplicates".
+    """
     try:
         # Time 24 hours ago (timezone-aware)
         cutoff = datetime.now(timezone.utc) - timedelta(days=1)
@@ -131,12 +509,17 @@ def get_recent_articles(collection):
         # Query recent articles that have non-empty content
         recent_articles = list(collection.find(
             {
-                "published_at": {"$gte": cutoff.isoformat()},
-                "content": { "$not": { "$size": 0 } }
+                "published_at": {"$gte": cutoff},
+                "has_content": True
             },
-            {"article_id": 1, "topper__headline": 1, "content": 1}
+            {"article_id": 1, "topper__headline": 1, "content": 1, "simhash": 1}
         ))
 
+        if collapse_duplicates:
+            grouped = group_near_duplicates(recent_articles)
+            print(f"Recent articles: {len(recent_articles)}, {len(grouped)} after collapsing near-duplicates")
+            return grouped
+
         return recent_articles
 
     except Exception as e:
@@ -157,6 +540,218 @@ def is_article_in_db(collection,article_href):
     result = collection.find_one({"article_id": article_href})
     return result is not None
 
+def get_existing_article_ids(collection, article_ids, chunk_size=1000):
+    """
+    Bulk version of is_article_in_db: one $in query per chunk of ids,
+    projected to article_id only so that, with the unique article_id
+    index (src.load.migrations), it is answered without fetching
+    documents.
+
+    Args:
+        collection: MongoDB collection object
+        article_ids (iterable): Article URLs / IDs to check
+        chunk_size (int): Max ids per $in query
+
+    Returns:
+        set: The ids that are already stored
+    """
+    existing = set()
+    if collection is None:
+        return existing
+
+    ids = list(dict.fromkeys(article_ids))
+    for i in range(0, len(ids), chunk_size):
+        cursor = collection.find(
+            {"article_id": {"$in": ids[i:i + chunk_size]}},
+            {"article_id": 1, "_id": 0}
+        )
+        existing.update(doc["article_id"] for doc in cursor)
+
+    return existing
+
+class KnownArticleIds:
+    """
+    In-process set of stored article_ids, warmed once per run so listing
+    can drop known links without a round-trip per page.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    def warm(self, batch_size=10000):
+        """
+        Load every stored article_id (projected to article_id only).
+        """
+        if self.collection is None:
+            return self
+        cursor = self.collection.find(
+            {}, {"article_id": 1, "_id": 0}
+        ).batch_size(batch_size)
+        ids = {doc["article_id"] for doc in cursor if "article_id" in doc}
+        with self._lock:
+            self._ids = ids
+        print(f"Known articles loaded: {len(ids)}")
+        return self
+
+    def add(self, article_id):
+        with self._lock:
+            self._ids.add(article_id)
+
+    def __contains__(self, article_id):
+        with self._lock:
+            return article_id in self._ids
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids)
+
+    def filter_new(self, article_ids):
+        """
+        Keep the ids that are not known, in order.
+        """
+        with self._lock:
+            return [a for a in article_ids if a not in self._ids]
+
+class BulkArticleWriter:
+    """
+    Thread-safe buffered loader: ETL threads add() articles and they are
+    written in batches, with insert_many(ordered=False) (or unordered
+    article_upsert updates with upsert=True), once `batch_size` documents
+    are buffered or the oldest has waited `flush_interval` seconds.
+
+    A failing document never aborts its batch: every document is
+    reported as "inserted", "duplicate", "skipped" (upsert mode: the
+    stored copy is newer) or "failed" to on_result(article, status,
+    error) and counted in stats(). close() (also registered with
+    atexit) flushes whatever is left.
+    """
+
+    def __init__(self, collection, batch_size=100, flush_interval=5.0, upsert=False, on_result=None):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.upsert = upsert
+        self.on_result = on_result
+
+        self._buffer = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._closed = threading.Event()
+        self.counts = {"inserted": 0, "duplicate": 0, "skipped": 0, "failed": 0, "batches": 0}
+        self.failures = []
+
+        self._timer = threading.Thread(target=self._flush_when_due, name="bulk-writer", daemon=True)
+        self._timer.start()
+        atexit.register(self.close)
+
+    def add(self, article: dict):
+        """
+        Buffer one article; flushes in the calling thread when the batch is full.
+        """
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("BulkArticleWriter is closed")
+            self._buffer.append(article)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def _flush_when_due(self):
+        while not self._closed.wait(min(1.0, self.flush_interval)):
+            with self._lock:
+                due = self._oldest is not None and time.monotonic() - self._oldest >= self.flush_interval
+            if due:
+                self.flush()
+
+    def flush(self):
+        """
+        Write everything buffered. Returns the number of documents written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer, self._oldest = self._buffer, [], None
+            if not batch:
+                return 0
+            return self._write(batch)
+
+    def _write(self, batch):
+        statuses = ["inserted"] * len(batch)
+        errors = [None] * len(batch)
+
+        if self.collection is None:
+            statuses, errors = ["failed"] * len(batch), ["No database connection."] * len(batch)
+        else:
+            try:
+                mark_near_duplicates(self.collection, batch)
+                if self.upsert:
+                    newer = get_newer_article_ids(self.collection, batch)
+                    writes = []
+                    for index, article in enumerate(batch):
+                        if article["article_id"] in newer:
+                            statuses[index] = "skipped"
+                        else:
+                            writes.append(index)
+                    if writes:
+                        try:
+                            self.collection.bulk_write([article_upsert(batch[i]) for i in writes], ordered=False)
+                        except BulkWriteError as e:
+                            # error indexes refer to the writes, not the batch
+                            for error in e.details.get("writeErrors", []):
+                                error["index"] = writes[error["index"]]
+                            raise
+                else:
+                    self.collection.insert_many(batch, ordered=False)
+
+            except BulkWriteError as e:
+                for error in e.details.get("writeErrors", []):
+                    index = error["index"]
+                    statuses[index] = "duplicate" if error.get("code") == 11000 else "failed"
+                    errors[index] = error.get("errmsg")
+
+            except Exception as e:
+                statuses, errors = ["failed"] * len(batch), [str(e)] * len(batch)
+
+        with self._lock:
+            self.counts["batches"] += 1
+            for article, status, error in zip(batch, statuses, errors):
+                self.counts[status] += 1
+                if status == "failed":
+                    self.failures.append((article.get("article_id"), error))
+
+        if self.on_result is not None:
+            for article, status, error in zip(batch, statuses, errors):
+                try:
+                    self.on_result(article, status, error)
+                except Exception as e:
+                    print(f"Bulk writer callback failed for {article.get('article_id')}: {e}")
+
+        written = statuses.count("inserted")
+        print(
+            f"Bulk write: {written} inserted, {statuses.count('duplicate')} duplicates, "
+            f"{statuses.count('skipped')} skipped, {statuses.count('failed')} failed"
+        )
+        return written
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, buffered=len(self._buffer))
+
+    def close(self):
+        """
+        Stop the flush timer and write what is left (safe to call twice).
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._timer.join()
+        self.flush()
+        atexit.unregister(self.close)
+
 def get_distinct_themes(collection):
     
     try:
@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+from datetime import datetime, timezone
+import pyarrow as pa
+import pyarrow.dataset as ds
+from bson import ObjectId
+
+from src.load.db import get_db_connection, iter_articles
+from src.utils.helpers import parse_timestamp
+
+EXPORT_DIR = "data/export/articles"
+STATE_FILE = "_export_state.json"
+
+_CATEGORICAL = pa.dictionary(pa.int32(), pa.string())
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+SCHEMA = pa.schema([
+    ("article_id", pa.string()),
+    ("published_at", _TIMESTAMP),
+    ("updated_at", _TIMESTAMP),
+    ("scraped_at", _TIMESTAMP),
+    ("section", pa.string()),
+    ("category", _CATEGORICAL),
+    ("topper__primary_theme", _CATEGORICAL),
+    ("byline", _CATEGORICAL),
+    ("topper__headline", pa.string()),
+    ("standfirst", pa.string()),
+    ("paywall", pa.bool_()),
+    ("has_content", pa.bool_()),
+    ("content_length", pa.int64()),
+    ("paragraph_count", pa.int32()),
+    ("image_count", pa.int32()),
+    ("duplicate_of", pa.string()),
+    ("content", pa.list_(pa.string())),
+    # partition columns
+    ("published_date", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("published_date", pa.string()), ("section", pa.string())]),
+    flavor="hive"
+)
+
+EXPORT_FIELDS = (
+    "article_id", "published_at", "updated_at", "scraped_at", "section", "category",
+    "topper__primary_theme", "byline", "topper__headline", "standfirst", "paywall",
+    "content", "media", "duplicate_of",
+)
+
+
+def to_row(doc):
+    """
+    Flatten one article document into a row of SCHEMA.
+    """
+    content = doc.get("content") or []
+    published = parse_timestamp(doc.get("published_at"))
+    images = ((doc.get("media") or {}).get("images")) or []
+    return {
+        "article_id": doc.get("article_id"),
+        "published_at": published,
+        "updated_at": parse_timestamp(doc.get("updated_at")),
+        "scraped_at": parse_timestamp(doc.get("scraped_at")),
+        "section": doc.get("section") or "unknown",
+        "category": doc.get("category"),
+        "topper__primary_theme": doc.get("topper__primary_theme"),
+        "byline": doc.get("byline"),
+        "topper__headline": doc.get("topper__headline"),
+        "standfirst": doc.get("standfirst"),
+        "paywall": bool(doc.get("paywall")),
+        "has_content": bool(content),
+        "content_length": sum(len(p) for p in content),
+        "paragraph_count": len(content),
+        "image_count": len(images),
+        "duplicate_of": doc.get("duplicate_of"),
+        "content": content,
+        "published_date": published.strftime("%Y-%m-%d") if published else "unknown",
+    }
+
+def _load_state(out_dir):
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(out_dir, state):
+    path = os.path.join(out_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4)
+    os.replace(path + ".tmp", path)
+
+def _discard_chunk(out_dir, chunk_id):
+    """
+    Remove the files of a chunk whose export was interrupted.
+    """
+    prefix = f"part-{chunk_id}-"
+    for root, _, names in os.walk(out_dir):
+        for name in names:
+            if name.startswith(prefix):
+                os.remove(os.path.join(root, name))
+
+def _write_chunk(rows, out_dir, chunk_id):
+    table = pa.Table.from_pylist(rows, schema=SCHEMA)
+    # write_dataset refuses more than 1024 partitions per call by default;
+    # a full export chunk can span years of dates times sections
+    partitions = len({(row["published_date"], row["section"]) for row in rows})
+    ds.write_dataset(
+        table,
+        out_dir,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{chunk_id}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        max_partitions=max(partitions, 1),
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd")
+    )
+
+def export_articles(collection, out_dir=EXPORT_DIR, full=False, chunk_rows=20000):
+    """
+    Append articles stored since the last export to a Parquet dataset
+    partitioned by published_date and section (hive layout, e.g.
+    published_date=2025-09-18/section=World/part-....parquet).
+
+    Documents are streamed with iter_articles in _id order and written
+    chunk_rows at a time. Each chunk's files are named after its first
+    _id and the state file is updated after every chunk: it records the
+    chunk being written ("pending") before the write and the last
+    exported _id after it. An interrupted export resumes after the last
+    complete chunk, and the files of the chunk it was writing are
+    removed first, so no article is exported twice.
+    Categorical columns (category, theme, byline) are dictionary-encoded;
+    section is a partition key. full=True exports everything again into an
+    empty directory.
+
+    Returns the number of articles exported.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state = {} if full else _load_state(out_dir)
+    if full and any(name != STATE_FILE for name in os.listdir(out_dir)):
+        print(f"{out_dir} is not empty; remove it before a full export.")
+        return 0
+
+    if state.get("pending"):
+        print(f"Discarding the interrupted chunk {state['pending']}")
+        _discard_chunk(out_dir, state["pending"])
+        state["pending"] = None
+        _save_state(out_dir, state)
+
+    after_id = ObjectId(state["last_id"]) if state.get("last_id") else None
+    exported = 0
+
+    def flush(rows, first_id, last_id):
+        chunk_id = str(first_id)
+        _save_state(out_dir, dict(state, pending=chunk_id))
+        _write_chunk(rows, out_dir, chunk_id)
+        state.update(
+            last_id=str(last_id),
+            pending=None,
+            exported_at=datetime.now(timezone.utc).isoformat(),
+            total=state.get("total", 0) + len(rows)
+        )
+        _save_state(out_dir, state)
+
+    rows, first_id, last_id = [], None, None
+    for doc in iter_articles(collection, fields=EXPORT_FIELDS, after_id=after_id):
+        if not rows:
+            first_id = doc["_id"]
+        rows.append(to_row(doc))
+        last_id = doc["_id"]
+        if len(rows) >= chunk_rows:
+            flush(rows, first_id, last_id)
+            exported, rows = exported + len(rows), []
+
+    if rows:
+        flush(rows, first_id, last_id)
+        exported += len(rows)
+
+    print(f"Exported {exported} articles to {out_dir}")
+    return exported
+
+def read_articles(columns=None, filter=None, out_dir=EXPORT_DIR):
+    """
+    Read the exported dataset as a pyarrow Table, loading only the given
+    columns; filter is a pyarrow.dataset expression, e.g.
+    ds.field("published_date") >= "2025-09-01" (partitions that do not
+    match are not read).
+    """
+    dataset = ds.dataset(out_dir, format="parquet", partitioning=PARTITIONING)
+    return dataset.to_table(columns=columns, filter=filter)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Export the articles collection to partitioned Parquet")
+    parser.add_argument("--out", default=EXPORT_DIR)
+    parser.add_argument("--full", action="store_true", help="export everything (into an empty directory)")
+    parser.add_argument("--chunk-rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    collection = get_db_connection()
+    if collection is None:
+        raise SystemExit(1)
+    export_articles(collection, out_dir=args.out, full=args.full, chunk_rows=args.chunk_rows)
@@ -0,0 +1,245 @@
+import argparse
+import re
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, urlunsplit
+
+from pymongo import UpdateOne
+
+from src.load.db import get_db_connection
+from src.transform.cleaner import canonical_url
+from src.transform.near_dup import BANDS, bands
+
+# Indexes shaped after the queries of src/load/db.py
+INDEXES = [
+    # Ensure article_id is unique
+    ([("article_id", 1)], {"unique": True}),
+    # Near-duplicate candidate lookup
+    ([("simhash_bands", 1)], {}),
+    # Category watermarks (get_latest_published_at_by_category(ies))
+    ([("category", 1), ("published_at", -1)], {}),
+    # Recent articles with content (get_recent_articles, refresh candidates)
+    ([("published_at", -1), ("has_content", 1)], {}),
+]
+
+
+def ensure_indexes(collection):
+    """
+    Create the indexes of the articles collection (idempotent).
+    """
+    for keys, options in INDEXES:
+        collection.create_index(keys, **options)
+    print(f"Indexes of {collection.full_name}: {sorted(collection.index_information())}")
+
+def missing_indexes(collection):
+    """
+    The INDEXES (keys) that are not on the collection yet.
+    """
+    existing = {
+        (tuple((field, int(direction)) for field, direction in info["key"]), bool(info.get("unique")))
+        for info in collection.index_information().values()
+    }
+    return [
+        keys for keys, options in INDEXES
+        if (tuple(keys), bool(options.get("unique"))) not in existing
+    ]
+
+def indexes_ready(collection):
+    """
+    True when every index of INDEXES exists; otherwise prints which ones
+    are missing and how to create them. Jobs call it before starting.
+    """
+    try:
+        missing = missing_indexes(collection)
+    except Exception as e:
+        print(f"Could not list the indexes of {collection.full_name}: {e}")
+        return False
+    if missing:
+        print(f"Missing indexes on {collection.full_name}: {missing}")
+        print("Run the migrations first: python -m src.load.migrations")
+        return False
+    return True
+
+def backfill_typed_fields(collection):
+    """
+    Convert string published_at / updated_at to dates and add
+    has_content / content_length to documents stored before they
+    existed. Runs server-side as one pipeline update; strings that do
+    not parse are left as they are.
+    """
+    def to_date(field):
+        return {"$cond": [
+            {"$eq": [{"$type": field}, "string"]},
+            {"$convert": {"input": field, "to": "date", "onError": field, "onNull": None}},
+            field
+        ]}
+
+    result = collection.update_many(
+        {"$or": [
+            {"published_at": {"$type": "string"}},
+            {"updated_at": {"$type": "string"}},
+            {"has_content": {"$exists": False}},
+            {"content_length": {"$exists": False}}
+        ]},
+        [{"$set": {
+            "published_at": to_date("$published_at"),
+            "updated_at": to_date("$updated_at"),
+            "has_content": {"$gt": [{"$size": {"$ifNull": ["$content", []]}}, 0]},
+            "content_length": {"$reduce": {
+                "input": {"$ifNull": ["$content", []]},
+                "initialValue": 0,
+                "in": {"$add": ["$$value", {"$strLenCP": "$$this"}]}
+            }}
+        }}]
+    )
+    print(f"Backfilled typed fields on {result.modified_count} articles")
+    return result.modified_count
+
+def rebuild_simhash_bands(collection, count=BANDS, batch_size=1000):
+    """
+    Recompute the LSH bands of articles stored with a different band
+    count (after NEAR_DUP_BANDS changed) from their stored simhash.
+    """
+    cursor = collection.find(
+        {
+            "simhash": {"$type": "string"},
+            "$or": [
+                {f"simhash_bands.{count - 1}": {"$exists": False}},
+                {f"simhash_bands.{count}": {"$exists": True}}
+            ]
+        },
+        {"simhash": 1}
+    )
+    updated, writes = 0, []
+    for doc in cursor:
+        writes.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"simhash_bands": bands(int(doc["simhash"], 16), count)}}
+        ))
+        if len(writes) >= batch_size:
+            updated += collection.bulk_write(writes, ordered=False).modified_count
+            writes = []
+    if writes:
+        updated += collection.bulk_write(writes, ordered=False).modified_count
+    print(f"Rebuilt simhash bands on {updated} articles")
+    return updated
+
+# FT article path: /content/<uuid>. Ids stored before canonical_url
+# had the query string merged into the uuid segment by clean_article_url.
+CONTENT_ID = re.compile(r"^(/content/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})[0-9A-Za-z-]+$")
+
+def repaired_article_id(article_id):
+    """
+    The canonical form of a stored article_id: canonical_url, with
+    whatever an old query string left after the article uuid cut off.
+    """
+    parts = urlsplit(canonical_url(article_id))
+    match = CONTENT_ID.match(parts.path)
+    if match:
+        parts = parts._replace(path=match.group(1))
+    return urlunsplit(parts)
+
+def repair_article_ids(collection):
+    """
+    Rewrite article_ids stored in a legacy form (query string merged
+    into the id, http, trailing slash ...) to their canonical form, so
+    the known-id filter and dedupe see them. When the canonical id is
+    already stored (the article was loaded again under it), the legacy
+    document is kept and points at it with duplicate_of.
+    Returns (rewritten, marked as duplicates).
+    """
+    rewritten = duplicates = 0
+    for doc in collection.find({}, {"article_id": 1, "duplicate_of": 1}):
+        old = doc.get("article_id")
+        if not old:
+            continue
+        new = repaired_article_id(old)
+        if new == old or doc.get("duplicate_of") == new:
+            continue
+
+        if collection.find_one({"article_id": new}, {"_id": 1}) is None:
+            collection.update_one({"_id": doc["_id"]}, {"$set": {"article_id": new}})
+            rewritten += 1
+        else:
+            collection.update_one({"_id": doc["_id"]}, {"$set": {"duplicate_of": new}})
+            duplicates += 1
+        collection.update_many({"duplicate_of": old}, {"$set": {"duplicate_of": new}})
+
+    print(f"Repaired article ids: {rewritten} rewritten, {duplicates} marked as duplicates")
+    return rewritten, duplicates
+
+def plan_stages(explain):
+    """
+    Every stage name in an explain() output's winning plan.
+    """
+    planner = explain.get("queryPlanner", explain)
+    stages, stack = [], [planner.get("winningPlan", {})]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if "stage" in node:
+                stages.append(node["stage"])
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return stages
+
+def query_plans(collection):
+    """
+    explain() the range queries of src/load/db.py.
+    Returns {query name: stages of the winning plan}.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=1)
+    queries = {
+        "recent_articles": collection.find(
+            {"published_at": {"$gte": cutoff}, "has_content": True},
+            {"article_id": 1, "topper__headline": 1, "content": 1, "simhash": 1}
+        ),
+        "category_watermark": collection.find(
+            {"category": "global-economy"}, {"published_at": 1, "_id": 0}
+        ).sort("published_at", -1).limit(1),
+        "known_ids": collection.find(
+            {"article_id": {"$in": ["https://www.ft.com/content/example"]}}, {"article_id": 1, "_id": 0}
+        ),
+    }
+    return {name: plan_stages(cursor.explain()) for name, cursor in queries.items()}
+
+def is_index_scan(stages):
+    return "COLLSCAN" not in stages and any(s in ("IXSCAN", "EXPRESS_IXSCAN") for s in stages)
+
+def check_query_plans(collection):
+    """
+    Check that each query of query_plans is answered by an index scan,
+    not a collection scan. Prints every plan.
+    Returns {query name: stages} of the queries that are not (empty when
+    all of them are).
+    """
+    failures = {}
+    for name, stages in query_plans(collection).items():
+        print(f"{name}: {' <- '.join(stages)}")
+        if not is_index_scan(stages):
+            print(f"{name} is not an index scan: {stages}")
+            failures[name] = stages
+    return failures
+
+def migrate(collection):
+    """
+    Run every migration step. Safe to run before each job.
+    """
+    ensure_indexes(collection)
+    backfill_typed_fields(collection)
+    rebuild_simhash_bands(collection)
+    repair_article_ids(collection)
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Create indexes and run data migrations")
+    parser.add_argument("--check", action="store_true", help="explain() the main queries and fail on a collection scan")
+    args = parser.parse_args()
+
+    collection = get_db_connection()
+    if collection is None:
+        raise SystemExit(1)
+    migrate(collection)
+
+    if args.check and check_query_plans(collection):
+        raise SystemExit(1)
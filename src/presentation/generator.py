@@ -408,7 +408,8 @@ def presentation_pipeline():
             themes[label].append({
                 "article_id": article_ids[i],
                 "headline": recent_articles[i]["topper__headline"],
-                "content": article_texts[i]
+                "content": article_texts[i],
+                "duplicates": recent_articles[i].get("duplicates", [])
             })
 
         # Step 6: Summarize Each Theme
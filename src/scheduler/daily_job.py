@@ -1,139 +1,599 @@
+import argparse
+import asyncio
 import json
+import time
 from datetime import datetime, timedelta
-from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
-from src.extract.fetch import fetch_article_free, fetch_article_paywall, check_paywall
-from src.extract.search import update_sections, get_leaf_articles,get_new_articles
-from src.transform.cleaner import get_article_content,get_article_content_archive,clean_url,clean_article_url
-from src.load.db import insert_article, get_db_connection,get_latest_published_at_by_category
+from src.extract.browser import get_browser_pool, close_browser_pool, release_browser_thread, BrowserWorkers
+from src.extract import async_crawl
+from src.extract.fetch import fetch_article, fetch_article_http
+from src.extract.http_client import get_http_fetcher, close_http_fetcher
+from src.extract.interception import default_profile
+from src.extract.search import get_leaf_articles,get_new_articles
+from src.extract.sections import update_sections
+from src.transform.cleaner import clean_url,clean_article_url,canonical_url
+from src.transform.workers import get_transform_pool, close_transform_pool
+from src.load.db import insert_article, get_db_connection,get_latest_published_at_by_categories, KnownArticleIds, set_article_appearances, BulkArticleWriter
+from src.load.archive import get_raw_archive
+from src.load.migrations import indexes_ready
+from src.utils.helpers import parse_timestamp
+from src.utils.ratelimit import get_host_limiter
 from src.presentation.generator import presentation_pipeline
+from src.scheduler.dedupe import TaskDeduper, group_leaf_sections, leaf_category
+from src.scheduler.task_queue import TaskQueue, new_run_id
+from src.scheduler.pipeline import Pipeline
 
-def etl_pipeline(section, category, article_url, scraped_at, collection):
+WATERMARK_OVERLAP = timedelta(hours=6)
+RESUME_MAX_AGE = timedelta(hours=12)
+
+def submit_transform(section, category, article_url, scraped_at, result):
+    """
+    Send the fetched HTML to the transform process pool.
+    Returns a Future of the article document.
+    """
+    return get_transform_pool().submit(
+        result.html, result.source, article_url, scraped_at, result.paywall, section, category
+    )
+
+def archive_fetch(article_url, result, section, category, scraped_at, appearances):
     """
-    Each ETL pipeline call opens its own Playwright context,
-    so it is thread-safe.
+    Keep the fetched HTML so the transform and load stages can be
+    replayed offline (python -m src.scheduler.replay).
     """
     try:
-        with sync_playwright() as p:  # each thread gets its own Playwright
-            
-            browser = p.chromium.launch(
-            headless=True,
-            args=["--disable-blink-features=AutomationControlled"]
-            )
-            
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={"width": 1280, "height": 800}
-            )
-            
-            page = context.new_page()
-            
-            # --- Extract ---
-            paywall_status = check_paywall(page, article_url)
-            soup,opt = fetch_article_paywall(page, article_url) if paywall_status else fetch_article_free(page, article_url)
-
-            if not soup:
-                print(f"Failed to fetch article: {article_url}")
-                browser.close()
-                return False
-
-            print(f"Article fetched: {article_url}")
-
-            # --- Transform ---
-            
-            if opt == 1 :
-                article = get_article_content(
-                    article_id=article_url,
-                    scraped_at=scraped_at,
-                    paywall=paywall_status,
-                    section=section,
-                    category=category,
-                    soup=soup
-                )
-            else :
-                article = get_article_content_archive(
-                    article_id=article_url,
-                    scraped_at=scraped_at,
-                    paywall=paywall_status,
-                    section=section,
-                    category=category,
-                    soup=soup
-                )
-
-            # --- Load ---
-            if article:
-                insert_article(collection, article)
-                browser.close()
-                return True
-
-            browser.close()
+        get_raw_archive().put(article_url, result.html, {
+            "section": section,
+            "category": category,
+            "appearances": appearances,
+            "source": result.source,
+            "paywall": result.paywall,
+            "scraped_at": scraped_at.isoformat()
+        })
+    except OSError as e:
+        print(f"Could not archive {article_url}: {e}")
+
+def etl_pipeline(section, category, article_url, scraped_at, collection, appearances=None):
+    """
+    Each ETL pipeline call first tries the article over plain HTTP and
+    only leases the calling thread's page from the shared browser pool
+    when that fails, so it is thread-safe and never launches Chromium
+    per article. appearances lists every section/category the article
+    was listed under and is stored on the document.
+    """
+    try:
+        # --- Extract ---
+        result = fetch_article_http(article_url)
+        if result is None:
+            pool = get_browser_pool()
+            with pool.lease() as page:
+                result = fetch_article(page, article_url, wait_until=pool.wait_until)
+
+        if not result.ok:
+            print(f"Failed to fetch article: {article_url} ({result.error})")
             return False
 
+        print(f"Article fetched: {article_url} [{result.source}, {result.timings['total']:.1f}s]")
+        archive_fetch(article_url, result, section, category, scraped_at, appearances)
+
+        # --- Transform (in a worker process) ---
+        article = submit_transform(section, category, article_url, scraped_at, result).result()
+
+        # --- Load ---
+        if article:
+            article["appearances"] = appearances or [{"section": section, "category": category}]
+            insert_article(collection, article)
+            return True
+
+        return False
+
     except Exception as e:
         print(f"Exception for article {article_url}: {e}")
         return False
 
-def process_section(section_name, urls, collection):
-        local_tasks = []
-        
-        with sync_playwright() as p:
-            for raw_url in tqdm(urls, desc=f"Processing {section_name}", leave=False):
-                
-                url = clean_url(url=raw_url)
-                
-                category = urlparse(url).path.strip("/").split("/")[-1]
-                
-                articles = get_new_articles(p=p, collection=collection, leaf_url=url)
-                articles = [clean_article_url(a) for a in articles]
-                
-                if articles:
-                    for article_url in articles:
-                        local_tasks.append((section_name, category, article_url))
-        
-        return local_tasks
-
-def run_swarm(collection, json_data, max_workers=4):
+def load_watermarks(collection, leaves, overlap=WATERMARK_OVERLAP):
+    """
+    Per-category watermarks for incremental crawling: the latest stored
+    published_at of every leaf category, from one aggregation, moved
+    back by `overlap` so late or failed articles are picked up again
+    (the known-id filter drops the ones already stored).
+    """
+    categories = {leaf_category(url) for url in leaves}
+    watermarks = {}
+    for category, latest in get_latest_published_at_by_categories(collection, categories).items():
+        published = parse_timestamp(latest)
+        if published is not None:
+            watermarks[category] = published - overlap
+    print(f"Loaded watermarks for {len(watermarks)} of {len(categories)} categories")
+    return watermarks
+
+def list_leaf(leaf_url, collection, known=None, watermark=None):
+    """
+    List the new articles of one leaf section.
+    Returns (category, article_urls); raises when the leaf could not be
+    listed, so its queue task is failed and retried.
+    """
+    url = clean_url(url=leaf_url)
+    articles = get_new_articles(collection=collection, leaf_url=url, known=known, watermark=watermark)
+    if articles is None:
+        raise RuntimeError(f"listing failed: {url}")
+    return leaf_category(url), [clean_article_url(a) for a in articles]
+
+def drain_queue(queue, run_id, kind, handler, workers, desc):
+    """
+    Run handler(payload) → (ok, result_or_error) over every task of
+    `kind` with `workers` threads, completing or failing each task in
+    the queue. Tasks that fail are retried once their backoff expires,
+    until each one is done or dead-lettered.
+    """
+    progress = tqdm(total=sum(queue.counts(run_id, kind).get(s, 0) for s in ("pending", "leased")), desc=desc)
+
+    def worker():
+        while True:
+            leased = queue.lease(run_id, kind)
+            if leased is None:
+                return
+            task_id, payload, attempts = leased
+            try:
+                ok, result = handler(payload)
+            except Exception as e:
+                ok, result = False, str(e)
+
+            if ok:
+                queue.complete(run_id, kind, task_id, result)
+                progress.update(1)
+            elif queue.fail(run_id, kind, task_id, error=str(result)):
+                progress.update(1)
+
+    # one executor for every retry round: its threads keep their
+    # browsers, and close them themselves when it shuts down
+    with BrowserWorkers(max_workers=workers) as executor:
+        while True:
+            for future in [executor.submit(worker) for _ in range(workers)]:
+                future.result()
+
+            next_retry = queue.next_retry_at(run_id, kind)
+            if next_retry is None:
+                break
+            time.sleep(max(0.0, next_retry - time.time()))
+
+    progress.close()
+
+def open_run(queue, resume=True, max_age=RESUME_MAX_AGE):
+    """
+    Resume the queue's unfinished run, or start a new one. Runs started
+    more than max_age ago are not resumed: their listings are stale, and
+    a new run lists every leaf again.
+    Returns the run id.
+    """
+    run_id = queue.unfinished_run(max_age=max_age.total_seconds()) if resume else None
+    if run_id:
+        released = queue.release_leases(run_id)
+        print(f"Resuming run {run_id}: {queue.counts(run_id)} ({released} leases released)")
+    else:
+        run_id = new_run_id()
+        queue.start_run(run_id)
+    return run_id
+
+def plan_run(queue, run_id, collection, json_data, incremental=False, listing_workers=16, known=None, watermarks=None):
+    """
+    List every leaf section through the queue, dedupe the listed
+    articles and enqueue one article task per article.
+    Returns the number of article tasks added.
+    """
+    leaves = group_leaf_sections(json_data["sections"])
+    if known is None:
+        known = KnownArticleIds(collection).warm()
+    if watermarks is None:
+        watermarks = load_watermarks(collection, leaves) if incremental else {}
+
+    # --- Listing ---
+    queue.put_many(run_id, "listing", [
+        (leaf_url, {"leaf_url": leaf_url, "sections": sections})
+        for leaf_url, sections in leaves.items()
+    ])
+
+    def list_task(payload):
+        leaf_url = payload["leaf_url"]
+        category, articles = list_leaf(leaf_url, collection, known, watermarks.get(leaf_category(leaf_url)))
+        return True, {"category": category, "articles": articles}
+
+    drain_queue(queue, run_id, "listing", list_task, listing_workers, "Listing sections")
+
+    listed = sum(len(urls) for urls in json_data["sections"].values())
+    print(f"Listed {len(leaves)} leaf sections ({listed - len(leaves)} duplicate listings skipped)")
+
+    # --- Dedupe (over every completed listing, including earlier attempts of this run) ---
+    deduper = TaskDeduper()
+    for _, payload, result in queue.results(run_id, "listing"):
+        for section_name in payload["sections"]:
+            for article_url in result["articles"]:
+                deduper.add(section_name, result["category"], article_url)
+    print("Task dedupe:", deduper.stats())
+
+    added = queue.put_many(run_id, "article", [
+        (article_url, {"section": section, "category": category, "article_url": article_url, "appearances": appearances})
+        for section, category, article_url, appearances in deduper.tasks()
+    ])
+    print(f"Total articles to process: {queue.counts(run_id, 'article')} ({added} new)")
+    return added
+
+def article_task(collection):
+    """
+    Queue handler running etl_pipeline on an article task payload.
+    """
+    def handler(payload):
+        ok = etl_pipeline(
+            payload["section"], payload["category"], payload["article_url"],
+            datetime.now(), collection, payload["appearances"]
+        )
+        return ok, None if ok else "fetch, transform or load failed"
+    return handler
+
+def finish_run(queue, run_id):
+    """
+    Mark the run finished and report its dead-lettered tasks.
+    """
+    queue.finish_run(run_id)
+    dead = queue.dead_letters(run_id)
+    print(f"Run {run_id} finished: {queue.counts(run_id)}; {len(dead)} dead-lettered")
+    for letter in dead:
+        print(f"  dead-letter [{letter['kind']}] {letter['task_id']}: {letter['last_error']}")
+
+def print_fetch_stats():
+    pool = get_browser_pool()
+    print("Browser pool:", pool.stats)
+    print("Request blocking:", pool.profile.stats())
+    print("HTTP tier:", get_http_fetcher().stats())
+    print("Host limits:", get_host_limiter().stats())
+    print("Transform pool:", get_transform_pool().stats())
+    close_browser_pool()
+    close_http_fetcher()
+    close_transform_pool()
+
+def stream_run(queue, run_id, collection, json_data, known, watermarks, listing_workers=16, max_workers=8):
+    """
+    Run listing → dedupe → fetch → transform → load as a streaming
+    Pipeline: an article is fetched as soon as its leaf is listed, so
+    fast sections never wait for the slowest one. Every step still
+    goes through the TaskQueue, so the run stays resumable.
+    Returns the per-stage stats.
+    """
+    leaves = group_leaf_sections(json_data["sections"])
+    queue.put_many(run_id, "listing", [
+        (leaf_url, {"leaf_url": leaf_url, "sections": sections})
+        for leaf_url, sections in leaves.items()
+    ])
+
+    # articles listed by an earlier attempt of this run
+    deduper = TaskDeduper()
+    for _, payload, result in queue.results(run_id, "listing"):
+        for section_name in payload["sections"]:
+            for article_url in result["articles"]:
+                deduper.add(section_name, result["category"], article_url)
+    late = set()
+
+    def listings():
+        while True:
+            leased = queue.lease(run_id, "listing")
+            if leased is None:
+                return
+            yield leased
+
+    def list_stage(leased):
+        task_id, payload, _ = leased
+        leaf_url = payload["leaf_url"]
+        try:
+            category, articles = list_leaf(leaf_url, collection, known, watermarks.get(leaf_category(leaf_url)))
+        except Exception as e:
+            queue.fail(run_id, "listing", task_id, error=str(e))
+            return None
+        queue.complete(run_id, "listing", task_id, {"category": category, "articles": articles})
+        return [(section_name, category, a) for section_name in payload["sections"] for a in articles]
+
+    def dedupe_stage(sighting):
+        section, category, article_url = sighting
+        url = canonical_url(article_url)
+        if not deduper.add(section, category, url):
+            # already on its way: only the appearances grow
+            late.add(url)
+            return None
+        payload = {"section": section, "category": category, "article_url": url, "appearances": deduper.appearances(url)}
+        if not queue.put(run_id, "article", url, payload):
+            return None
+        return [(url, payload)]
+
+    def article_stage(fn):
+        # a failing article task is retried later instead of being lost
+        def run(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                queue.fail(run_id, "article", item[0], error=str(e))
+                return None
+        return run
+
+    def fetch_stage(task):
+        url, payload = task
+        if queue.claim(run_id, "article", url) is None:
+            return None
+        scraped_at = datetime.now()
+        result = fetch_article_http(url)
+        if result is None:
+            pool = get_browser_pool()
+            with pool.lease() as page:
+                result = fetch_article(page, url, wait_until=pool.wait_until)
+        if not result.ok:
+            print(f"Failed to fetch article: {url} ({result.error})")
+            queue.fail(run_id, "article", url, error=f"fetch failed: {result.error}")
+            return None
+        print(f"Article fetched: {url} [{result.source}, {result.timings['total']:.1f}s]")
+        archive_fetch(url, result, payload["section"], payload["category"], scraped_at, deduper.appearances(url))
+        return [(url, payload, scraped_at, result)]
+
+    def transform_stage(item):
+        url, payload, scraped_at, result = item
+        article = submit_transform(payload["section"], payload["category"], url, scraped_at, result).result()
+        if not article:
+            queue.fail(run_id, "article", url, error="transform returned nothing")
+            return None
+        return [(url, article)]
+
+    def loaded(article, status, error):
+        # called per document when its batch is written
+        if status == "failed":
+            queue.fail(run_id, "article", article["article_id"], error=f"load failed: {error}")
+        else:
+            queue.complete(run_id, "article", article["article_id"])
+
+    writer = BulkArticleWriter(collection, on_result=loaded)
+
+    def load_stage(item):
+        url, article = item
+        article["appearances"] = deduper.appearances(url)
+        writer.add(article)
+        return None
+
+    transform_pool = get_transform_pool()
+    pipeline = (
+        Pipeline()
+        .add("listing", list_stage, workers=listing_workers, maxsize=listing_workers, on_exit=release_browser_thread)
+        .add("dedupe", dedupe_stage, workers=1, maxsize=1000)
+        .add("fetch", article_stage(fetch_stage), workers=max_workers, maxsize=max_workers * 4, on_exit=release_browser_thread)
+        .add("transform", article_stage(transform_stage), workers=transform_pool.workers, maxsize=transform_pool.max_pending)
+        .add("load", article_stage(load_stage), workers=2, maxsize=100)
+    )
+    try:
+        stats = pipeline.run({
+            "listing": listings(),
+            # pending articles left by an interrupted attempt of this run
+            "fetch": queue.pending(run_id, "article")
+        })
+    finally:
+        writer.close()
+    print("Bulk writer:", writer.stats())
+
+    print("Task dedupe:", deduper.stats())
+    for url in late:
+        set_article_appearances(collection, url, deduper.appearances(url))
+    for name, stage in stats.items():
+        print(f"Pipeline stage {name}: {stage}")
+    return stats
+
+def run_swarm(
+    collection, json_data, max_workers=8, incremental=False, listing_workers=16,
+    queue=None, resume=True, resume_max_age=RESUME_MAX_AGE
+):
     
     """
     Flatten all sections → categories → articles into tasks
-    and run the ETL pipeline in parallel, showing progress.
+    and run the ETL pipeline in parallel.
+    Worker counts are upper bounds: the per-host limiter decides how
+    many requests actually hit each host at once.
+    Leaves and articles shared by several sections are listed and
+    fetched once; every section/category they appeared under is kept.
+    In incremental mode listing stops at each category's watermark.
+
+    Listing and article tasks go through a persistent TaskQueue, so an
+    interrupted run is resumed where it stopped on the next start
+    (if it started less than resume_max_age ago).
     """
 
-    tasks = []
-    
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {
-            executor.submit(process_section, section_name, urls, collection): section_name
-            for section_name, urls in json_data["sections"].items()
-        }
-
-        for future in as_completed(futures):
-            tasks.extend(future.result())
-    total_tasks = len(tasks)
-    print(f"Total articles to process: {total_tasks}")
-    
-    # Worker wrapper
-    def worker(task):
-        section, category, article_url = task
-        return etl_pipeline(section, category, article_url, datetime.now(), collection)
+    queue = queue or TaskQueue()
+    run_id = open_run(queue, resume=resume, max_age=resume_max_age)
+
+    leaves = group_leaf_sections(json_data["sections"])
+    known = KnownArticleIds(collection).warm()
+    watermarks = load_watermarks(collection, leaves) if incremental else {}
+
+    stream_run(
+        queue, run_id, collection, json_data, known, watermarks,
+        listing_workers=listing_workers, max_workers=max_workers
+    )
 
-    # Run in parallel with progress bar
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(worker, t) for t in tasks]
+    # --- Retries (tasks still backing off when the stream ended) ---
+    plan_run(
+        queue, run_id, collection, json_data,
+        listing_workers=listing_workers, known=known, watermarks=watermarks
+    )
+    drain_queue(queue, run_id, "article", article_task(collection), max_workers, "Retrying articles")
 
-        # Use tqdm to show progress
-        for f in tqdm(as_completed(futures), total=total_tasks, desc="Processing articles"):
-            result = f.result()  # will also raise exceptions if any
+    finish_run(queue, run_id)
+    print_fetch_stats()
+
+    print("All ETL tasks completed. Running presentation pipeline...")
+    presentation_pipeline()
+
+async def etl_pipeline_async(pool, section, category, article_url, scraped_at, collection, appearances=None):
+    """
+    Async counterpart of etl_pipeline: the page load runs on the shared
+    event loop, parsing and the Mongo insert run in worker threads.
+    """
+    try:
+        # --- Extract ---
+        result = await asyncio.to_thread(fetch_article_http, article_url)
+        if result is None:
+            async with pool.lease() as page:
+                result = await async_crawl.fetch_article(page, article_url, wait_until=pool.wait_until)
+
+        if not result.ok:
+            print(f"Failed to fetch article: {article_url} ({result.error})")
+            return False
+
+        print(f"Article fetched: {article_url} [{result.source}, {result.timings['total']:.1f}s]")
+        await asyncio.to_thread(archive_fetch, article_url, result, section, category, scraped_at, appearances)
+
+        # --- Transform (in a worker process) ---
+        # (submitted from a thread: submit blocks while the stage is full)
+        future = await asyncio.to_thread(submit_transform, section, category, article_url, scraped_at, result)
+        article = await asyncio.wrap_future(future)
+
+        # --- Load ---
+        if article:
+            article["appearances"] = appearances or [{"section": section, "category": category}]
+            await asyncio.to_thread(insert_article, collection, article)
+            return True
+
+        return False
+
+    except Exception as e:
+        print(f"Exception for article {article_url}: {e}")
+        return False
+
+async def drain_queue_async(queue, run_id, kind, handler, concurrency, desc):
+    """
+    Async counterpart of drain_queue: `concurrency` coroutines lease
+    tasks of `kind` and await handler(payload) → (ok, result_or_error),
+    completing or failing each task in the queue. Queue calls run in
+    worker threads; failed tasks are retried once their backoff expires.
+    """
+    progress = tqdm(total=sum(queue.counts(run_id, kind).get(s, 0) for s in ("pending", "leased")), desc=desc)
+
+    async def worker():
+        while True:
+            leased = await asyncio.to_thread(queue.lease, run_id, kind)
+            if leased is None:
+                return
+            task_id, payload, attempts = leased
+            try:
+                ok, result = await handler(payload)
+            except Exception as e:
+                ok, result = False, str(e)
+
+            if ok:
+                await asyncio.to_thread(queue.complete, run_id, kind, task_id, result)
+                progress.update(1)
+            elif await asyncio.to_thread(queue.fail, run_id, kind, task_id, str(result)):
+                progress.update(1)
+
+    while True:
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+
+        next_retry = queue.next_retry_at(run_id, kind)
+        if next_retry is None:
+            break
+        await asyncio.sleep(max(0.0, next_retry - time.time()))
+
+    progress.close()
+
+async def run_swarm_async(
+    collection, json_data, max_concurrency=100, num_browsers=2, incremental=False,
+    queue=None, resume=True, resume_max_age=RESUME_MAX_AGE
+):
+    """
+    asyncio version of run_swarm: every listing and article load is a
+    coroutine multiplexed over a few browsers, with at most
+    max_concurrency pages in flight.
+
+    Listing and article tasks go through the same persistent TaskQueue
+    as run_swarm (leases, retries with backoff, dead letters), so an
+    interrupted async run is resumed like a threaded one.
+    """
+    queue = queue or TaskQueue()
+    run_id = open_run(queue, resume=resume, max_age=resume_max_age)
+
+    async with async_crawl.AsyncBrowserPool(
+        num_browsers=num_browsers,
+        max_concurrency=max_concurrency,
+        profile=default_profile()
+    ) as pool:
+
+        leaves = group_leaf_sections(json_data["sections"])
+        known = await asyncio.to_thread(KnownArticleIds(collection).warm)
+        watermarks = await asyncio.to_thread(load_watermarks, collection, leaves) if incremental else {}
+
+        # --- Listing ---
+        queue.put_many(run_id, "listing", [
+            (leaf_url, {"leaf_url": leaf_url, "sections": sections})
+            for leaf_url, sections in leaves.items()
+        ])
+
+        async def list_task(payload):
+            url = clean_url(url=payload["leaf_url"])
+            articles = await async_crawl.get_new_articles(
+                pool, collection, url, known, watermarks.get(leaf_category(url))
+            )
+            if articles is None:
+                return False, f"listing failed: {url}"
+            return True, {"category": leaf_category(url), "articles": [clean_article_url(a) for a in articles]}
+
+        await drain_queue_async(queue, run_id, "listing", list_task, max_concurrency, "Listing sections")
+
+        # --- Dedupe (over every completed listing, including earlier attempts of this run) ---
+        deduper = TaskDeduper()
+        for _, payload, result in queue.results(run_id, "listing"):
+            for section_name in payload["sections"]:
+                for article_url in result["articles"]:
+                    deduper.add(section_name, result["category"], article_url)
+        print("Task dedupe:", deduper.stats())
+
+        added = queue.put_many(run_id, "article", [
+            (article_url, {"section": section, "category": category, "article_url": article_url, "appearances": appearances})
+            for section, category, article_url, appearances in deduper.tasks()
+        ])
+        print(f"Total articles to process: {queue.counts(run_id, 'article')} ({added} new)")
+
+        # --- Articles ---
+        async def article_task(payload):
+            ok = await etl_pipeline_async(
+                pool, payload["section"], payload["category"], payload["article_url"],
+                datetime.now(), collection, payload["appearances"]
+            )
+            return ok, None if ok else "fetch, transform or load failed"
+
+        await drain_queue_async(queue, run_id, "article", article_task, max_concurrency, "Processing articles")
+
+        finish_run(queue, run_id)
+        print("Request blocking:", pool.profile.stats())
+        print("HTTP tier:", get_http_fetcher().stats())
+        print("Host limits:", get_host_limiter().stats())
+        print("Transform pool:", get_transform_pool().stats())
+        close_transform_pool()
 
     print("All ETL tasks completed. Running presentation pipeline...")
     presentation_pipeline()
 
 if __name__ == "__main__":
-    
+
+    parser = argparse.ArgumentParser(description="FT daily scraping job")
+    parser.add_argument("--engine", choices=["threads", "async"], default="threads")
+    parser.add_argument("--concurrency", type=int, default=100, help="max in-flight pages (async engine)")
+    parser.add_argument(
+        "--host-concurrency", type=int, default=None,
+        help="ceiling of the per-host concurrency window (default: 64, or --concurrency for the async engine if higher)"
+    )
+    parser.add_argument("--incremental", action="store_true", help="stop listing at each category's latest stored article")
+    parser.add_argument("--fresh", action="store_true", help="start a new run instead of resuming an interrupted one")
+    parser.add_argument("--resume-max-age", type=float, default=12, help="hours after which an interrupted run is not resumed")
+    args = parser.parse_args()
+
+    # the host limiter caps in-flight requests per host: it must not
+    # undercut the async engine's --concurrency
+    host_concurrency = args.host_concurrency
+    if host_concurrency is None:
+        host_concurrency = max(64, args.concurrency) if args.engine == "async" else 64
+    get_host_limiter(max_concurrency=host_concurrency)
+
     file_path = "data/metadata/ft_structure.json"
 
     # Load JSON structure
@@ -154,6 +614,17 @@ if __name__ == "__main__":
 
     # Connect to MongoDB
     collection = get_db_connection()
+    if collection is None or not indexes_ready(collection):
+        raise SystemExit(1)
 
     # Run the parallel swarm
-    run_swarm(collection, json_data, max_workers=4)
\ No newline at end of file
+    if args.engine == "async":
+        asyncio.run(run_swarm_async(
+            collection, json_data, max_concurrency=args.concurrency, incremental=args.incremental,
+            resume=not args.fresh, resume_max_age=timedelta(hours=args.resume_max_age)
+        ))
+    else:
+        run_swarm(
+            collection, json_data, max_workers=8, incremental=args.incremental,
+            resume=not args.fresh, resume_max_age=timedelta(hours=args.resume_max_age)
+        )
\ No newline at end of file
@@ -0,0 +1,77 @@
+import threading
+from urllib.parse import urlsplit
+
+from src.transform.cleaner import canonical_url
+
+
+def leaf_category(leaf_url):
+    """
+    Category name of a leaf section, e.g. https://www.ft.com/us-economy → us-economy.
+    """
+    return urlsplit(leaf_url).path.strip("/").split("/")[-1]
+
+def group_leaf_sections(sections):
+    """
+    Invert {section: [leaf_url, ...]} into {canonical leaf_url: [section, ...]}
+    so a leaf listed under several sections is only loaded once.
+    """
+    leaves = {}
+    for section_name, urls in sections.items():
+        for url in urls:
+            owners = leaves.setdefault(canonical_url(url), [])
+            if section_name not in owners:
+                owners.append(section_name)
+    return leaves
+
+
+class TaskDeduper:
+    """
+    Collects (section, category, article_url) sightings from the listing
+    stage and keeps one ETL task per canonical article URL, together with
+    every section/category pair it appeared under.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._appearances = {}
+        self.sightings = 0
+
+    def add(self, section, category, article_url):
+        """
+        Record a sighting. Returns True the first time an article is seen.
+        """
+        url = canonical_url(article_url)
+        appearance = {"section": section, "category": category}
+        with self._lock:
+            self.sightings += 1
+            appearances = self._appearances.get(url)
+            if appearances is None:
+                self._appearances[url] = [appearance]
+                return True
+            if appearance not in appearances:
+                appearances.append(appearance)
+            return False
+
+    def appearances(self, article_url):
+        with self._lock:
+            return list(self._appearances.get(canonical_url(article_url), []))
+
+    def tasks(self):
+        """
+        One (section, category, article_url, appearances) task per article;
+        section/category are those of the first sighting.
+        """
+        with self._lock:
+            return [
+                (appearances[0]["section"], appearances[0]["category"], url, list(appearances))
+                for url, appearances in self._appearances.items()
+            ]
+
+    def stats(self):
+        with self._lock:
+            unique = len(self._appearances)
+            return {
+                "sightings": self.sightings,
+                "unique_articles": unique,
+                "fetches_saved": self.sightings - unique
+            }
@@ -0,0 +1,459 @@
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+
+from src.load.db import get_db_connection
+from src.load.migrations import indexes_ready
+from src.utils.ratelimit import backoff_delay
+from src.presentation.generator import presentation_pipeline
+from src.scheduler.daily_job import (
+    open_run, plan_run, drain_queue, article_task, finish_run, print_fetch_stats, RESUME_MAX_AGE
+)
+
+TASKS_COLLECTION = "etl_tasks"
+RUNS_COLLECTION = "etl_runs"
+
+
+def new_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class MongoTaskQueue:
+    """
+    Task queue shared by several machines, stored in MongoDB next to the
+    articles collection. Same interface as the local TaskQueue, so
+    drain_queue and plan_run work with either.
+
+    Workers claim tasks with an atomic find_one_and_update that sets a
+    lease owned by worker_id. A heartbeat thread renews the leases of
+    the tasks this worker holds; the lease of a dead worker expires and
+    its task is claimed again by the next worker. complete/fail only
+    apply while this worker still owns the lease.
+
+    `tasks` is any pymongo-compatible collection, so a local mongod or an
+    in-memory stand-in (mongomock, see tests/test_distributed.py) can be
+    used in place of Atlas.
+    Times are stored as epoch seconds.
+    """
+
+    def __init__(self, tasks, runs=None, worker_id=None, lease_seconds=120, max_attempts=3, retry_base=30.0):
+        self.tasks = tasks
+        self.runs = runs if runs is not None else tasks.database[RUNS_COLLECTION]
+        self.worker_id = worker_id or new_worker_id()
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+
+        self._heartbeat = None
+        self._stop = threading.Event()
+
+    def ensure_indexes(self):
+        self.tasks.create_index([("run_id", 1), ("kind", 1), ("state", 1), ("retry_after", 1)])
+        self.tasks.create_index([("worker", 1), ("state", 1)])
+        return self
+
+    @staticmethod
+    def _id(run_id, kind, task_id):
+        return f"{run_id}|{kind}|{task_id}"
+
+    def _owned(self, run_id, kind, task_id):
+        return {"_id": self._id(run_id, kind, task_id), "state": "leased", "worker": self.worker_id}
+
+    # -----------------------------
+    # Runs
+    # -----------------------------
+
+    def start_run(self, run_id):
+        self.runs.update_one(
+            {"_id": run_id},
+            {"$setOnInsert": {"started_at": time.time(), "finished_at": None, "published": False}},
+            upsert=True
+        )
+
+    def mark_published(self, run_id):
+        """
+        Record that every task of the run has been enqueued, so idle
+        workers know they can stop once the queue is empty.
+        """
+        self.runs.update_one({"_id": run_id}, {"$set": {"published": True}})
+
+    def finish_run(self, run_id):
+        self.runs.update_one({"_id": run_id}, {"$set": {"finished_at": time.time()}})
+
+    def unfinished_run(self, max_age=None):
+        query = {"finished_at": None}
+        if max_age is not None:
+            query["started_at"] = {"$gte": time.time() - max_age}
+        doc = self.runs.find_one(query, sort=[("started_at", -1)])
+        return doc["_id"] if doc else None
+
+    def run_info(self, run_id):
+        return self.runs.find_one({"_id": run_id})
+
+    # -----------------------------
+    # Producers
+    # -----------------------------
+
+    def put(self, run_id, kind, task_id, payload):
+        return self.put_many(run_id, kind, [(task_id, payload)]) == 1
+
+    def put_many(self, run_id, kind, tasks, chunk_size=1000):
+        """
+        Add [(task_id, payload), ...] with unordered inserts, skipping
+        tasks that already exist (duplicate _id). Returns the number added.
+        """
+        now = time.time()
+        docs = [
+            {
+                "_id": self._id(run_id, kind, task_id),
+                "run_id": run_id,
+                "kind": kind,
+                "task_id": task_id,
+                "payload": json.loads(json.dumps(payload, default=str)),
+                "state": "pending",
+                "attempts": 0,
+                "retry_after": 0,
+                "lease_until": None,
+                "worker": None,
+                "created_at": now,
+                "updated_at": now
+            }
+            for task_id, payload in tasks
+        ]
+        added = 0
+        for i in range(0, len(docs), chunk_size):
+            try:
+                added += len(self.tasks.insert_many(docs[i:i + chunk_size], ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                    raise
+                added += e.details.get("nInserted", 0)
+        return added
+
+    # -----------------------------
+    # Consumers
+    # -----------------------------
+
+    def lease(self, run_id, kind):
+        """
+        Atomically claim the next runnable task: pending and past its
+        retry_after, or leased by a worker whose lease has expired.
+        Returns (task_id, payload, attempts) or None.
+        """
+        now = time.time()
+        doc = self.tasks.find_one_and_update(
+            {
+                "run_id": run_id,
+                "kind": kind,
+                "$or": [
+                    {"state": "pending", "retry_after": {"$lte": now}},
+                    {"state": "leased", "lease_until": {"$lt": now}}
+                ]
+            },
+            {
+                "$set": {
+                    "state": "leased",
+                    "worker": self.worker_id,
+                    "lease_until": now + self.lease_seconds,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("retry_after", 1), ("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if doc is None:
+            return None
+        return doc["task_id"], doc["payload"], doc["attempts"]
+
+    def claim(self, run_id, kind, task_id):
+        """
+        Lease one specific pending task. Returns its attempt number, or
+        None if it is not pending.
+        """
+        now = time.time()
+        doc = self.tasks.find_one_and_update(
+            {"_id": self._id(run_id, kind, task_id), "state": "pending"},
+            {
+                "$set": {"state": "leased", "worker": self.worker_id, "lease_until": now + self.lease_seconds, "updated_at": now},
+                "$inc": {"attempts": 1}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        return doc["attempts"] if doc else None
+
+    def pending(self, run_id, kind):
+        cursor = self.tasks.find(
+            {"run_id": run_id, "kind": kind, "state": "pending"}, {"task_id": 1, "payload": 1}
+        ).sort("created_at", 1)
+        return [(doc["task_id"], doc["payload"]) for doc in cursor]
+
+    def renew(self):
+        """
+        Extend every lease held by this worker. Returns the number renewed.
+        """
+        now = time.time()
+        return self.tasks.update_many(
+            {"worker": self.worker_id, "state": "leased"},
+            {"$set": {"lease_until": now + self.lease_seconds, "updated_at": now}}
+        ).modified_count
+
+    def start_heartbeat(self, interval=None):
+        """
+        Renew this worker's leases every `interval` seconds (a third of
+        the lease by default) from a daemon thread.
+        """
+        interval = interval or self.lease_seconds / 3
+
+        def beat():
+            while not self._stop.wait(interval):
+                try:
+                    self.renew()
+                except Exception as e:
+                    print(f"Heartbeat failed for {self.worker_id}: {e}")
+
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=beat, name=f"heartbeat-{self.worker_id}", daemon=True)
+        self._heartbeat.start()
+        return self
+
+    def stop_heartbeat(self):
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+
+    def complete(self, run_id, kind, task_id, result=None):
+        updated = self.tasks.update_one(
+            self._owned(run_id, kind, task_id),
+            {"$set": {
+                "state": "done",
+                "lease_until": None,
+                "result": json.loads(json.dumps(result, default=str)) if result is not None else None,
+                "updated_at": time.time()
+            }}
+        )
+        if not updated.modified_count:
+            print(f"Lease lost before completing [{kind}] {task_id}")
+        return bool(updated.modified_count)
+
+    def fail(self, run_id, kind, task_id, error=None):
+        """
+        Record a failed attempt: retry later with jittered backoff, or
+        mark the task failed (dead-lettered) once it has used max_attempts.
+        Returns True if the task was dead-lettered.
+        """
+        now = time.time()
+        doc = self.tasks.find_one(self._owned(run_id, kind, task_id), {"attempts": 1})
+        if doc is None:
+            print(f"Lease lost before failing [{kind}] {task_id}")
+            return False
+
+        if doc["attempts"] >= self.max_attempts:
+            update = {"state": "failed", "failed_at": now}
+        else:
+            update = {"state": "pending", "retry_after": now + backoff_delay(doc["attempts"], base=self.retry_base, cap=600.0)}
+        update.update({"lease_until": None, "worker": None, "last_error": error, "updated_at": now})
+
+        updated = self.tasks.update_one(self._owned(run_id, kind, task_id), {"$set": update})
+        return bool(updated.modified_count) and update["state"] == "failed"
+
+    def release_leases(self, run_id):
+        """
+        Put the tasks this worker holds back to pending. Leases of other
+        workers are left to expire.
+        """
+        return self.tasks.update_many(
+            {"run_id": run_id, "state": "leased", "worker": self.worker_id},
+            {"$set": {"state": "pending", "lease_until": None, "worker": None, "updated_at": time.time()}}
+        ).modified_count
+
+    # -----------------------------
+    # Inspection
+    # -----------------------------
+
+    def counts(self, run_id, kind=None):
+        match = {"run_id": run_id}
+        if kind is not None:
+            match["kind"] = kind
+        return {
+            doc["_id"]: doc["count"]
+            for doc in self.tasks.aggregate([
+                {"$match": match},
+                {"$group": {"_id": "$state", "count": {"$sum": 1}}}
+            ])
+        }
+
+    def live_leases(self, run_id, kind):
+        """
+        Number of tasks currently leased by a worker whose lease has not expired.
+        """
+        return self.tasks.count_documents(
+            {"run_id": run_id, "kind": kind, "state": "leased", "lease_until": {"$gte": time.time()}}
+        )
+
+    def next_retry_at(self, run_id, kind):
+        times = []
+        pending = self.tasks.find_one(
+            {"run_id": run_id, "kind": kind, "state": "pending"}, sort=[("retry_after", 1)]
+        )
+        if pending:
+            times.append(pending["retry_after"])
+        leased = self.tasks.find_one(
+            {"run_id": run_id, "kind": kind, "state": "leased"}, sort=[("lease_until", 1)]
+        )
+        if leased:
+            times.append(leased["lease_until"])
+        return min(times) if times else None
+
+    def results(self, run_id, kind):
+        cursor = self.tasks.find(
+            {"run_id": run_id, "kind": kind, "state": "done"},
+            {"task_id": 1, "payload": 1, "result": 1}
+        )
+        return [(doc["task_id"], doc["payload"], doc.get("result")) for doc in cursor]
+
+    def dead_letters(self, run_id):
+        cursor = self.tasks.find(
+            {"run_id": run_id, "state": "failed"},
+            {"kind": 1, "task_id": 1, "attempts": 1, "last_error": 1}
+        )
+        return [{k: doc.get(k) for k in ("kind", "task_id", "attempts", "last_error")} for doc in cursor]
+
+    def close(self):
+        self.stop_heartbeat()
+
+
+def get_task_queue(collection, **kwargs):
+    """
+    MongoTaskQueue stored in the same database as the articles collection.
+    """
+    return MongoTaskQueue(collection.database[TASKS_COLLECTION], **kwargs).ensure_indexes()
+
+
+# -----------------------------
+# Roles
+# -----------------------------
+
+def coordinate(
+    collection, json_data, queue, incremental=False, listing_workers=16,
+    resume=True, resume_max_age=RESUME_MAX_AGE, poll=30, max_idle=600
+):
+    """
+    List and dedupe locally, publish the article tasks to the shared
+    queue, then wait until the workers have done or dead-lettered all
+    of them and run the presentation pipeline.
+
+    If tasks are left but no worker has held a live lease for max_idle
+    seconds (every worker died), the run is left open for a later
+    coordinator or worker to resume and False is returned.
+    """
+    run_id = open_run(queue, resume=resume, max_age=resume_max_age)
+    queue.start_heartbeat()
+    try:
+        plan_run(queue, run_id, collection, json_data, incremental=incremental, listing_workers=listing_workers)
+    finally:
+        queue.stop_heartbeat()
+    queue.mark_published(run_id)
+    print(f"Run {run_id} published; waiting for workers")
+
+    if not wait_for_workers(queue, run_id, poll=poll, max_idle=max_idle):
+        return False
+
+    finish_run(queue, run_id)
+    print_fetch_stats()
+
+    print("All ETL tasks completed. Running presentation pipeline...")
+    presentation_pipeline()
+    return True
+
+def wait_for_workers(queue, run_id, poll=30, max_idle=600):
+    """
+    Wait until no article task of the run is pending or leased.
+    Returns False when tasks are left and no worker has held a live
+    lease for max_idle seconds.
+    """
+    idle_since = None
+    while True:
+        counts = queue.counts(run_id, "article")
+        if not counts.get("pending") and not counts.get("leased"):
+            return True
+
+        if queue.live_leases(run_id, "article"):
+            idle_since = None
+        elif idle_since is None:
+            idle_since = time.monotonic()
+        elif time.monotonic() - idle_since >= max_idle:
+            print(f"No live worker for {max_idle:.0f}s; leaving run {run_id} open: {counts}")
+            return False
+
+        print(f"[{datetime.now():%H:%M:%S}] articles: {counts}")
+        time.sleep(poll)
+
+def work(collection, queue, max_workers=8, run_id=None, max_age=RESUME_MAX_AGE, poll=30):
+    """
+    Claim article tasks of the current run and run etl_pipeline on them
+    until the run is published and nothing is left to claim.
+    """
+    current = None
+    queue.start_heartbeat()
+    try:
+        while True:
+            current = run_id or queue.unfinished_run(max_age=max_age.total_seconds())
+            if current is None:
+                print(f"No open run; waiting {poll}s")
+                time.sleep(poll)
+                continue
+
+            print(f"Worker {queue.worker_id} joining run {current}")
+            drain_queue(queue, current, "article", article_task(collection), max_workers, "Processing articles")
+
+            info = queue.run_info(current) or {}
+            counts = queue.counts(current, "article")
+            if info.get("published") and not counts.get("pending") and not counts.get("leased"):
+                print(f"Run {current} drained: {counts}")
+                break
+            time.sleep(poll)
+    finally:
+        queue.stop_heartbeat()
+        if current:
+            queue.release_leases(current)
+
+    print_fetch_stats()
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Distributed FT scraping job (MongoDB task queue)")
+    parser.add_argument("role", choices=["coordinator", "worker"])
+    parser.add_argument("--workers", type=int, default=8, help="article threads per worker")
+    parser.add_argument("--run-id", default=None, help="worker: join this run instead of the latest open one")
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--fresh", action="store_true", help="coordinator: start a new run")
+    parser.add_argument("--lease", type=int, default=120, help="lease length in seconds")
+    parser.add_argument("--resume-max-age", type=float, default=12, help="hours after which an open run is abandoned")
+    parser.add_argument("--max-idle", type=float, default=600, help="coordinator: seconds without a live worker before giving up")
+    args = parser.parse_args()
+    max_age = timedelta(hours=args.resume_max_age)
+
+    collection = get_db_connection()
+    if collection is None or not indexes_ready(collection):
+        raise SystemExit(1)
+    queue = get_task_queue(collection, lease_seconds=args.lease)
+
+    if args.role == "coordinator":
+        with open("data/metadata/ft_structure.json", "r") as f:
+            json_data = json.load(f)
+        if not coordinate(
+            collection, json_data, queue, incremental=args.incremental,
+            resume=not args.fresh, resume_max_age=max_age, max_idle=args.max_idle
+        ):
+            raise SystemExit(1)
+    else:
+        work(collection, queue, max_workers=args.workers, run_id=args.run_id, max_age=max_age)
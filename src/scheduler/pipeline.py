@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline: `workers` threads take items from a bounded
+    inbox, call fn(item) and pass every item of the returned iterable
+    (or nothing, for None) to the next stage. on_exit() is called by
+    each worker thread before it ends (e.g. to close its browser).
+    """
+
+    def __init__(self, name, fn, workers=1, maxsize=100, on_exit=None):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.on_exit = on_exit
+        self.inbox = queue.Queue(maxsize=maxsize)
+        self.next = None
+
+        self._lock = threading.Lock()
+        self._producers = 0
+        self.received = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.max_depth = 0
+        self.first_at = None
+        self.last_at = None
+
+    def put(self, item):
+        # blocks while the inbox is full: backpressure on the producer
+        self.inbox.put(item)
+        depth = self.inbox.qsize()
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+
+    def _run(self):
+        try:
+            self._work()
+        finally:
+            if self.on_exit is not None:
+                try:
+                    self.on_exit()
+                except Exception as e:
+                    print(f"[{self.name}] {e}")
+
+    def _work(self):
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                # let the other workers of this stage see it too
+                self.inbox.put(_DONE)
+                return
+
+            started = time.perf_counter()
+            with self._lock:
+                self.received += 1
+                if self.first_at is None:
+                    self.first_at = time.time()
+            try:
+                outputs = self.fn(item) or ()
+                for output in outputs:
+                    with self._lock:
+                        self.emitted += 1
+                    if self.next is not None:
+                        self.next.put(output)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"[{self.name}] {e}")
+            finally:
+                with self._lock:
+                    self.busy += time.perf_counter() - started
+                    self.last_at = time.time()
+
+    def stats(self):
+        with self._lock:
+            elapsed = (self.last_at - self.first_at) if self.first_at and self.last_at else 0.0
+            return {
+                "workers": self.workers,
+                "depth": self.inbox.qsize(),
+                "max_depth": self.max_depth,
+                "in": self.received,
+                "out": self.emitted,
+                "errors": self.errors,
+                "busy_s": round(self.busy, 1),
+                "per_s": round(self.received / elapsed, 2) if elapsed else None
+            }
+
+
+class Pipeline:
+    """
+    Chain of stages connected by bounded queues.
+
+    Every stage starts as soon as its first item arrives, and a full
+    inbox blocks the stage feeding it, so a slow stage throttles the
+    ones upstream instead of letting work pile up in memory. Items can
+    be fed into any stage (e.g. work left over from an interrupted run);
+    a stage is closed once everything feeding it is done.
+    """
+
+    def __init__(self):
+        self.stages = []
+        self._by_name = {}
+
+    def add(self, name, fn, workers=1, maxsize=100, on_exit=None):
+        stage = Stage(name, fn, workers=workers, maxsize=maxsize, on_exit=on_exit)
+        if self.stages:
+            self.stages[-1].next = stage
+        self.stages.append(stage)
+        self._by_name[name] = stage
+        return self
+
+    def run(self, sources, report_every=60):
+        """
+        Run until every source and stage is exhausted.
+        `sources` maps a stage name to an iterable of items fed into it.
+        """
+        for index, stage in enumerate(self.stages):
+            stage._producers = (1 if index else 0) + (1 if stage.name in sources else 0)
+            if not stage._producers:
+                stage.inbox.put(_DONE)
+
+        stage_threads = {
+            stage.name: [
+                threading.Thread(target=stage._run, name=f"{stage.name}-{i}", daemon=True)
+                for i in range(stage.workers)
+            ]
+            for stage in self.stages
+        }
+        for threads in stage_threads.values():
+            for thread in threads:
+                thread.start()
+
+        def feed(stage, items):
+            try:
+                for item in items:
+                    stage.put(item)
+            finally:
+                self._producer_done(stage)
+
+        feeders = [
+            threading.Thread(target=feed, args=(self._by_name[name], items), name=f"feed-{name}", daemon=True)
+            for name, items in sources.items()
+        ]
+        for feeder in feeders:
+            feeder.start()
+
+        stop = threading.Event()
+        reporter = threading.Thread(target=self._report, args=(stop, report_every), daemon=True)
+        reporter.start()
+
+        for feeder in feeders:
+            feeder.join()
+        for stage in self.stages:
+            for thread in stage_threads[stage.name]:
+                thread.join()
+            if stage.next is not None:
+                self._producer_done(stage.next)
+
+        stop.set()
+        reporter.join()
+        return self.stats()
+
+    def _producer_done(self, stage):
+        with stage._lock:
+            stage._producers -= 1
+            closed = stage._producers == 0
+        if closed:
+            stage.inbox.put(_DONE)
+
+    def _report(self, stop, every):
+        while not stop.wait(every):
+            print("Pipeline:", " | ".join(
+                f"{s.name} {s.inbox.qsize()} queued, {s.received} in" for s in self.stages
+            ))
+
+    def stats(self):
+        return {stage.name: stage.stats() for stage in self.stages}
@@ -0,0 +1,95 @@
+import argparse
+from datetime import datetime, timedelta
+from tqdm import tqdm
+
+from src.extract.browser import get_browser_pool, close_browser_pool, BrowserWorkers
+from src.extract.fetch import fetch_article, fetch_article_http
+from src.extract.http_client import get_http_fetcher, close_http_fetcher
+from src.load.db import get_db_connection, get_articles_to_refresh, apply_article_changes, normalize_article
+from src.load.migrations import indexes_ready
+from src.transform.cleaner import extract_article
+from src.transform.near_dup import fingerprint_fields
+from src.transform.revisions import diff_article
+
+
+def refresh_article(collection, stored):
+    """
+    Re-fetch one stored article and write what changed.
+    Returns "changed", "unchanged" or "failed".
+    """
+    article_url = stored["article_id"]
+    try:
+        # conditional GET: an unchanged page costs a 304
+        result = fetch_article_http(article_url, revalidate=True)
+        if result is None:
+            pool = get_browser_pool()
+            with pool.lease() as page:
+                result = fetch_article(page, article_url, wait_until=pool.wait_until)
+
+        if not result.ok:
+            print(f"Failed to re-fetch article: {article_url} ({result.error})")
+            return "failed"
+
+        fresh = extract_article(
+            result.html, result.source, article_url, datetime.now(), result.paywall,
+            stored.get("section"), stored.get("category")
+        )
+        if not fresh:
+            return "failed"
+
+        changes, revision = diff_article(stored, normalize_article(fresh))
+        if revision and "content" in revision["fields"]:
+            changes.update(fingerprint_fields(fresh.get("content")))
+            changes.update(has_content=fresh["has_content"], content_length=fresh["content_length"])
+        apply_article_changes(collection, article_url, changes, revision)
+        if revision:
+            print(f"Article updated: {article_url} ({', '.join(revision['fields'])})")
+            return "changed"
+        return "unchanged"
+
+    except Exception as e:
+        print(f"Exception refreshing article {article_url}: {e}")
+        return "failed"
+
+def refresh(collection, window=timedelta(days=2), cadence=timedelta(hours=6), limit=500, max_workers=8):
+    """
+    Re-check recently published articles that are due (not checked in
+    the last `cadence`) and store paragraph-level changes.
+    Returns the count of each outcome.
+    """
+    due = get_articles_to_refresh(collection, window=window, cadence=cadence, limit=limit)
+    print(f"Articles due for a change check: {len(due)}")
+
+    outcomes = {"changed": 0, "unchanged": 0, "failed": 0}
+    with BrowserWorkers(max_workers=max_workers) as executor:
+        for outcome in tqdm(
+            executor.map(lambda stored: refresh_article(collection, stored), due),
+            total=len(due), desc="Checking articles"
+        ):
+            outcomes[outcome] += 1
+
+    print("Refresh:", outcomes)
+    print("HTTP tier:", get_http_fetcher().stats())
+    close_browser_pool()
+    close_http_fetcher()
+    return outcomes
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Re-check recently published articles for updates")
+    parser.add_argument("--window", type=float, default=48, help="hours since publication to keep checking")
+    parser.add_argument("--cadence", type=float, default=6, help="hours between checks of the same article")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    collection = get_db_connection()
+    if collection is None or not indexes_ready(collection):
+        raise SystemExit(1)
+    refresh(
+        collection,
+        window=timedelta(hours=args.window),
+        cadence=timedelta(hours=args.cadence),
+        limit=args.limit,
+        max_workers=args.workers
+    )
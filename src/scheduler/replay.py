@@ -0,0 +1,93 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from tqdm import tqdm
+
+from src.load.archive import RawHtmlArchive, ARCHIVE_DIR
+from src.load.db import get_db_connection, BulkArticleWriter
+from src.load.migrations import indexes_ready
+from src.transform.cleaner import extract_article
+
+
+def replay_record(path):
+    """
+    Re-run the transform stage on one archived record.
+    Runs in a worker process; returns the article dict or None.
+    """
+    try:
+        record = RawHtmlArchive.load(path)
+        meta = record["meta"]
+        article = extract_article(
+            record["html"],
+            meta.get("source"),
+            record["article_url"],
+            datetime.fromisoformat(meta["scraped_at"]) if meta.get("scraped_at") else None,
+            meta.get("paywall", False),
+            meta.get("section"),
+            meta.get("category")
+        )
+        if article and meta.get("appearances"):
+            article["appearances"] = meta["appearances"]
+        return article
+    except Exception as e:
+        print(f"Could not replay {path}: {e}")
+        return None
+
+def replay(collection, archive=None, since=None, workers=None, dry_run=False):
+    """
+    Re-run transform + load for every archived article (latest record per
+    URL, optionally only those archived after `since`) without opening a
+    browser. Parsing is spread over a process pool. Stored articles are
+    updated, not replaced (refresh revisions are kept), and those whose
+    stored updated_at is later than the archived page's are left alone.
+
+    Returns (replayed, failed).
+    """
+    archive = archive or RawHtmlArchive()
+    paths = archive.latest_paths(since=since)
+    print(f"Replaying {len(paths)} archived articles")
+
+    replayed, failed, skipped = 0, 0, 0
+    writer = None if dry_run else BulkArticleWriter(collection, batch_size=500, upsert=True)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            results = executor.map(replay_record, paths, chunksize=16)
+            for article in tqdm(results, total=len(paths), desc="Replaying articles"):
+                if not article:
+                    failed += 1
+                elif writer is not None:
+                    writer.add(article)
+                else:
+                    replayed += 1
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is not None:
+        counts = writer.stats()
+        replayed, failed, skipped = counts["inserted"], failed + counts["failed"], counts["skipped"]
+
+    print(f"Replayed {replayed} articles, {skipped} kept (stored copy is newer), {failed} failed")
+    return replayed, failed
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Re-run transform and load from the raw HTML archive")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--since", type=datetime.fromisoformat, help="only records archived after this ISO date")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--dry-run", action="store_true", help="transform only, do not write to MongoDB")
+    args = parser.parse_args()
+
+    collection = None if args.dry_run else get_db_connection()
+    if not args.dry_run and (collection is None or not indexes_ready(collection)):
+        raise SystemExit(1)
+
+    replay(
+        collection,
+        archive=RawHtmlArchive(root=args.archive_dir),
+        since=args.since,
+        workers=args.workers,
+        dry_run=args.dry_run
+    )
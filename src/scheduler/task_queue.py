@@ -0,0 +1,321 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from src.utils.ratelimit import backoff_delay
+
+QUEUE_PATH = "data/queue/tasks.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id      TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    task_id     TEXT NOT NULL,
+    payload     TEXT NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    retry_after REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result      TEXT,
+    last_error  TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (run_id, kind, task_id)
+);
+CREATE INDEX IF NOT EXISTS tasks_lease ON tasks (run_id, kind, state, retry_after);
+
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    started_at  REAL NOT NULL,
+    finished_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS dead_letter (
+    run_id     TEXT NOT NULL,
+    kind       TEXT NOT NULL,
+    task_id    TEXT NOT NULL,
+    payload    TEXT NOT NULL,
+    attempts   INTEGER NOT NULL,
+    last_error TEXT,
+    failed_at  REAL NOT NULL,
+    PRIMARY KEY (run_id, kind, task_id)
+);
+"""
+
+
+class TaskQueue:
+    """
+    Persistent local task queue for the ETL swarm, backed by SQLite.
+
+    Tasks are identified by (run_id, kind, task_id) and move through
+    pending → leased → done, or back to pending with a retry_after time
+    when they fail. After max_attempts they are marked failed and copied
+    to the dead_letter table. Leases expire after lease_seconds, so a
+    task held by a crashed process is handed out again.
+    """
+
+    def __init__(self, path=QUEUE_PATH, lease_seconds=600, max_attempts=3, retry_base=30.0):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _write(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    # -----------------------------
+    # Runs
+    # -----------------------------
+
+    def start_run(self, run_id):
+        self._write(
+            "INSERT OR IGNORE INTO runs (run_id, started_at) VALUES (?, ?)",
+            (run_id, time.time())
+        )
+
+    def finish_run(self, run_id):
+        self._write("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), run_id))
+
+    def unfinished_run(self, max_age=None):
+        """
+        Most recent run that was started but never finished, or None.
+        With max_age (seconds), older runs are not returned.
+        """
+        since = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NULL AND started_at >= ? "
+                "ORDER BY started_at DESC LIMIT 1",
+                (since,)
+            ).fetchone()
+        return row[0] if row else None
+
+    # -----------------------------
+    # Producers
+    # -----------------------------
+
+    def put(self, run_id, kind, task_id, payload):
+        """
+        Add a task unless it already exists. Returns True if added.
+        """
+        return self.put_many(run_id, kind, [(task_id, payload)]) == 1
+
+    def put_many(self, run_id, kind, tasks):
+        """
+        Add [(task_id, payload), ...] in one transaction, skipping tasks
+        that already exist. Returns the number added.
+        """
+        now = time.time()
+        rows = [(run_id, kind, task_id, json.dumps(payload, default=str), now, now) for task_id, payload in tasks]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (run_id, kind, task_id, payload, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+
+    # -----------------------------
+    # Consumers
+    # -----------------------------
+
+    def lease(self, run_id, kind):
+        """
+        Lease the next runnable task: pending and past its retry_after,
+        or leased with an expired lease.
+        Returns (task_id, payload, attempts) or None.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT task_id, payload, attempts FROM tasks "
+                    "WHERE run_id = ? AND kind = ? AND ("
+                    "  (state = 'pending' AND retry_after <= ?) OR (state = 'leased' AND lease_until < ?)"
+                    ") ORDER BY retry_after, created_at LIMIT 1",
+                    (run_id, kind, now, now)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE tasks SET state = 'leased', attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                    "WHERE run_id = ? AND kind = ? AND task_id = ?",
+                    (now + self.lease_seconds, now, run_id, kind, row[0])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0], json.loads(row[1]), row[2] + 1
+
+    def claim(self, run_id, kind, task_id):
+        """
+        Lease one specific pending task (used when the task was handed
+        over in memory rather than through lease()).
+        Returns its attempt number, or None if it is not pending.
+        """
+        now = time.time()
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE tasks SET state = 'leased', attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                "WHERE run_id = ? AND kind = ? AND task_id = ? AND state = 'pending'",
+                (now + self.lease_seconds, now, run_id, kind, task_id)
+            ).rowcount
+            if not updated:
+                return None
+            return self._conn.execute(
+                "SELECT attempts FROM tasks WHERE run_id = ? AND kind = ? AND task_id = ?",
+                (run_id, kind, task_id)
+            ).fetchone()[0]
+
+    def pending(self, run_id, kind):
+        """
+        (task_id, payload) of every pending task of a kind.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, payload FROM tasks WHERE run_id = ? AND kind = ? AND state = 'pending' "
+                "ORDER BY created_at",
+                (run_id, kind)
+            ).fetchall()
+        return [(task_id, json.loads(payload)) for task_id, payload in rows]
+
+    def complete(self, run_id, kind, task_id, result=None):
+        self._write(
+            "UPDATE tasks SET state = 'done', lease_until = NULL, result = ?, updated_at = ? "
+            "WHERE run_id = ? AND kind = ? AND task_id = ?",
+            (json.dumps(result, default=str) if result is not None else None, time.time(), run_id, kind, task_id)
+        )
+
+    def fail(self, run_id, kind, task_id, error=None):
+        """
+        Record a failed attempt: retry later with jittered backoff, or
+        dead-letter the task once it has used max_attempts.
+        Returns True if the task was dead-lettered.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT payload, attempts FROM tasks WHERE run_id = ? AND kind = ? AND task_id = ?",
+                    (run_id, kind, task_id)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return False
+                payload, attempts = row
+
+                if attempts >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE tasks SET state = 'failed', lease_until = NULL, last_error = ?, updated_at = ? "
+                        "WHERE run_id = ? AND kind = ? AND task_id = ?",
+                        (error, now, run_id, kind, task_id)
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO dead_letter (run_id, kind, task_id, payload, attempts, last_error, failed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (run_id, kind, task_id, payload, attempts, error, now)
+                    )
+                    dead = True
+                else:
+                    self._conn.execute(
+                        "UPDATE tasks SET state = 'pending', lease_until = NULL, last_error = ?, retry_after = ?, updated_at = ? "
+                        "WHERE run_id = ? AND kind = ? AND task_id = ?",
+                        (error, now + backoff_delay(attempts, base=self.retry_base, cap=600.0), now, run_id, kind, task_id)
+                    )
+                    dead = False
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dead
+
+    def release_leases(self, run_id):
+        """
+        Put every leased task of a run back to pending (used on restart by
+        the single process that owned them).
+        """
+        return self._write(
+            "UPDATE tasks SET state = 'pending', lease_until = NULL, updated_at = ? "
+            "WHERE run_id = ? AND state = 'leased'",
+            (time.time(), run_id)
+        ).rowcount
+
+    # -----------------------------
+    # Inspection
+    # -----------------------------
+
+    def counts(self, run_id, kind=None):
+        """
+        {state: number of tasks} for a run (and kind).
+        """
+        sql = "SELECT state, COUNT(*) FROM tasks WHERE run_id = ?"
+        params = [run_id]
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        with self._lock:
+            rows = self._conn.execute(sql + " GROUP BY state", params).fetchall()
+        return dict(rows)
+
+    def next_retry_at(self, run_id, kind):
+        """
+        Earliest time a task of this kind becomes runnable, or None when
+        nothing is left to run.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(CASE WHEN state = 'pending' THEN retry_after ELSE lease_until END) FROM tasks "
+                "WHERE run_id = ? AND kind = ? AND state IN ('pending', 'leased')",
+                (run_id, kind)
+            ).fetchone()
+        return row[0]
+
+    def results(self, run_id, kind):
+        """
+        (task_id, payload, result) of every done task of a kind.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT task_id, payload, result FROM tasks WHERE run_id = ? AND kind = ? AND state = 'done'",
+                (run_id, kind)
+            ).fetchall()
+        return [(task_id, json.loads(payload), json.loads(result) if result else None) for task_id, payload, result in rows]
+
+    def dead_letters(self, run_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, task_id, attempts, last_error FROM dead_letter WHERE run_id = ?",
+                (run_id,)
+            ).fetchall()
+        return [dict(zip(("kind", "task_id", "attempts", "last_error"), row)) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def new_run_id():
+    return datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
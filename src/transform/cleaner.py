@@ -1,4 +1,5 @@
-from lxml import html
+from lxml import etree, html
+from urllib.parse import urlsplit, urlunsplit
 import re
 
 def extract_text_or_none(tag, selector=None, attr=None):
@@ -96,21 +97,185 @@ def get_article_content(article_id, scraped_at, paywall, section,category, soup)
 
     return data
 
-def get_article_content_archive(article_id, scraped_at, paywall, section, category, soup):
+# Text of a subtree the way BeautifulSoup's get_text() sees it: no
+# comments, no script/style/template contents.
+_TEXT_NODES = etree.XPath(
+    ".//text()[not(parent::script or parent::style or parent::template)]", smart_strings=False
+)
+_FIRST_SPAN = etree.XPath("(.//span)[1]")
+_FIRST_TIME = etree.XPath("(.//time)[1]")
+_FIRST_IMG = etree.XPath("(.//img)[1]")
+_FIRST_FIGCAPTION = etree.XPath("(.//figcaption)[1]")
+_PARAGRAPHS = etree.XPath(".//p")
+
+# (tag, class) of the single-element fields, in the output's field names
+_FIRST_BY_CLASS = {
+    ("div", "topper__primary-theme"): "topper__primary_theme",
+    ("h1", "o-topper__headline"): "topper__headline",
+    ("div", "o-topper__standfirst"): "standfirst",
+    ("p", "article-info__byline"): "byline",
+    ("time", "article-info__timestamp"): "published_at",
+    ("p", "article-info__updated-timestamp"): "updated_at",
+}
+
+def _text(el, separator=" "):
+    return separator.join(t.strip() for t in _TEXT_NODES(el) if t.strip())
+
+def _first(xpath, el):
+    found = xpath(el)
+    return found[0] if found else None
+
+def _text_or_attr(el, attr=None):
+    # same rules as extract_text_or_none
+    if el is None:
+        return None
+    if attr and attr in el.attrib:
+        return el.get(attr)
+    return _text(el)
+
+# Start tags that implicitly close an open <p> in lxml but not in
+# html.parser, so the two trees (and the extracted text) differ
+_P_BOUNDARIES = re.compile(
+    r"<(/?)(p|address|article|aside|blockquote|dd|details|dialog|div|dl|dt|fieldset|figcaption|figure"
+    r"|footer|form|h[1-6]|header|hgroup|hr|li|main|menu|nav|ol|pre|section|table|ul)(?=[\s/>])",
+    re.IGNORECASE
+)
+
+def paragraphs_well_formed(raw_html):
+    """
+    True when every <p> is closed before the next block element starts,
+    i.e. lxml and html.parser build the same tree around paragraphs.
+    """
+    open_p = False
+    for match in _P_BOUNDARIES.finditer(raw_html):
+        closing, tag = match.group(1), match.group(2).lower()
+        if tag == "p":
+            if open_p == bool(closing):
+                open_p = not closing
+            else:
+                return False  # unclosed <p> or stray </p>
+        elif open_p:
+            return False  # block element inside a <p>
+    return not open_p
+
+def get_article_content_lxml(article_id, scraped_at, paywall, section, category, raw_html):
+    """
+    Faster get_article_content for the div.article-content format: parses
+    the raw HTML with lxml and collects every field in one walk of the
+    tree, instead of one BeautifulSoup scan per field.
+    Returns the same dict as get_article_content (tests/test_parity.py);
+    documents with malformed paragraphs, which lxml would nest
+    differently, go through get_article_content instead.
+    """
+    if isinstance(raw_html, bytes):
+        raw_html = raw_html.decode("utf-8", "replace")
+    if not paragraphs_well_formed(raw_html):
+        from bs4 import BeautifulSoup
+        return get_article_content(
+            article_id, scraped_at, paywall, section, category, soup=BeautifulSoup(raw_html, "html.parser")
+        )
+    tree = html.fromstring(raw_html.encode("utf-8"), parser=html.HTMLParser(encoding="utf-8"))
+
+    found = {}
+    article_tag = None
+    figure_tags = []
+
+    for el in tree.iter():
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue  # comments, processing instructions
+        if tag == "figure":
+            figure_tags.append(el)
+        elif tag == "article" and article_tag is None and el.get("id") == "article-body":
+            article_tag = el
+
+        classes = el.get("class")
+        if classes:
+            for name in classes.split():
+                field = _FIRST_BY_CLASS.get((tag, name))
+                if field and field not in found:
+                    found[field] = el
+
+    # --- Metadata fields ---
+    theme = found.get("topper__primary_theme")
+    updated = found.get("updated_at")
+
+    # --- Content ---
+    paragraphs = []
+    if article_tag is not None:
+        for p in _PARAGRAPHS(article_tag):
+            text = _text(p)
+            if text:
+                paragraphs.append(text)
+
+    figures = []
+    for fig in figure_tags:
+        img = _first(_FIRST_IMG, fig)
+        figcaption = _first(_FIRST_FIGCAPTION, fig)
+        caption_text = _text(figcaption, separator="") if figcaption is not None else None
+
+        caption, credit = None, None
+        if caption_text:
+            if "©" in caption_text:
+                caption, credit = (part.strip() for part in caption_text.split("©", 1))
+            else:
+                caption = caption_text.strip()
+
+        figures.append({
+            "img_src": img.get("src") if img is not None else None,
+            "caption": caption,
+            "credit": credit
+        })
+
+    # --- Final structured data ---
+    return {
+        "article_id": article_id,
+        "scraped_at": scraped_at,
+        "paywall": paywall,
+        "section": section,
+        "category": category,
+        "topper__primary_theme": _text_or_attr(_first(_FIRST_SPAN, theme)) if theme is not None else None,
+        "topper__headline": _text_or_attr(found.get("topper__headline")),
+        "standfirst": _text_or_attr(found.get("standfirst")),
+        "byline": _text_or_attr(found.get("byline")),
+        "published_at": _text_or_attr(found.get("published_at"), attr="datetime"),
+        "updated_at": _text_or_attr(_first(_FIRST_TIME, updated), attr="datetime") if updated is not None else None,
+        "content": paragraphs,
+        "media": {
+            "images": figures,
+            "videos": None
+        }
+    }
+
+# Archive page layout, compiled once
+_ARCHIVE_THEME = etree.XPath("(//div[@id='o-topper']//span/a)[1]")
+_ARCHIVE_HEADLINE = etree.XPath("(//div[@id='o-topper']//h1/span[1])[1]")
+_ARCHIVE_STANDFIRST = etree.XPath("(//div[@id='o-topper']//div[2])[1]")
+_ARCHIVE_BYLINE = etree.XPath("(//article[@id='site-content']//div[3]/div[1]/div[1])[1]")
+_ARCHIVE_PUBLISHED = etree.XPath("(//article[@id='site-content']//div[3]/div[1]/div[2]/div[1]/div[1]/time)[1]")
+_ARCHIVE_UPDATED = etree.XPath("(//article[@id='site-content']//div[3]/div[1]/div[2]/div[1]/div[2]/time)[1]")
+_ARCHIVE_BODY = etree.XPath("(//*[@id='article-body'])[1]")
+_ARCHIVE_DIVS = etree.XPath(".//div")
+_ARCHIVE_FIGURES = etree.XPath(".//figure")
+_ARCHIVE_IMG = etree.XPath("(.//img[@currentsourceurl])[1]")
+_ARCHIVE_FIGCAPTION = etree.XPath("(.//figcaption)[1]")
+_ARCHIVE_CREDIT = etree.XPath("(.//span[contains(text(),'©') or contains(@class,'credit')])[1]")
+
+def get_article_content_archive(article_id, scraped_at, paywall, section, category, raw_html):
     """
     Extract structured article content from 'archive' site using XPath.
+    raw_html (str or bytes) is parsed once with lxml.
     """
 
-    # Convert BeautifulSoup to lxml tree for XPath queries
-    parser = html.HTMLParser(encoding="utf-8")
-    tree = html.fromstring(str(soup), parser=parser)
+    if isinstance(raw_html, str):
+        raw_html = raw_html.encode("utf-8")
+    tree = html.fromstring(raw_html, parser=html.HTMLParser(encoding="utf-8"))
 
-    def text_or_none(xpath_expr, attr=None):
+    def text_or_none(xpath, attr=None):
         try:
-            el = tree.xpath(xpath_expr)
-            if not el:
+            el = _first(xpath, tree)
+            if el is None:
                 return None
-            el = el[0]
             if attr:
                 return el.get(attr)
             return el.text_content().strip()
@@ -118,49 +283,40 @@ def get_article_content_archive(article_id, scraped_at, paywall, section, catego
             return None
 
     # --- Metadata fields ---
-    topper_primary_theme = text_or_none("//div[@id='o-topper']//span/a")
-    topper_headline = text_or_none("//div[@id='o-topper']//h1/span[1]")
-    standfirst = text_or_none("//div[@id='o-topper']//div[2]")
-    byline_text = text_or_none("//article[@id='site-content']//div[3]/div[1]/div[1]")
-    pub_datetime = text_or_none("//article[@id='site-content']//div[3]/div[1]/div[2]/div[1]/div[1]/time", attr="datetime")
-    updated_datetime = text_or_none("//article[@id='site-content']//div[3]/div[1]/div[2]/div[1]/div[2]/time", attr="datetime")
+    topper_primary_theme = text_or_none(_ARCHIVE_THEME)
+    topper_headline = text_or_none(_ARCHIVE_HEADLINE)
+    standfirst = text_or_none(_ARCHIVE_STANDFIRST)
+    byline_text = text_or_none(_ARCHIVE_BYLINE)
+    pub_datetime = text_or_none(_ARCHIVE_PUBLISHED, attr="datetime")
+    updated_datetime = text_or_none(_ARCHIVE_UPDATED, attr="datetime")
 
     # --- Content ---
-    article_nodes = tree.xpath('//*[@id="article-body"]')
+    article = _first(_ARCHIVE_BODY, tree)
     paragraphs = []
     figures_list = []
 
-    if article_nodes:
-        article = article_nodes[0]
-
+    if article is not None:
         # Paragraphs: all <div> children inside article-body
-        paragraphs = [
-            p.text_content().strip()
-            for p in article.xpath(".//div")
-            if p.text_content().strip()
-        ]
+        for div in _ARCHIVE_DIVS(article):
+            text = div.text_content().strip()
+            if text:
+                paragraphs.append(text)
 
         # Figures: list of dicts with img_src, caption, credit
-        figures = article.xpath(".//figure")
-        for fig in figures:
-            # Image src
-            img = fig.xpath(".//img[@currentsourceurl]")
-            img_src = img[0].get("currentsourceurl") if img else None
-
-            # Caption text
-            figcaption = fig.xpath(".//figcaption")
-            caption = figcaption[0].text_content().strip() if figcaption else None
-
-            # Credit (optional)
-            credit_span = fig.xpath(".//span[contains(text(),'©') or contains(@class,'credit')]")
-            credit = credit_span[0].text_content().strip() if credit_span else None
-
-            if img_src:
-                figures_list.append({
-                    "img_src": img_src,
-                    "caption": caption,
-                    "credit": credit
-                })
+        for fig in _ARCHIVE_FIGURES(article):
+            img = _first(_ARCHIVE_IMG, fig)
+            img_src = img.get("currentsourceurl") if img is not None else None
+            if not img_src:
+                continue
+
+            figcaption = _first(_ARCHIVE_FIGCAPTION, fig)
+            credit_span = _first(_ARCHIVE_CREDIT, fig)
+
+            figures_list.append({
+                "img_src": img_src,
+                "caption": figcaption.text_content().strip() if figcaption is not None else None,
+                "credit": credit_span.text_content().strip() if credit_span is not None else None
+            })
 
     # --- Final structured data ---
     data = {
@@ -186,6 +342,31 @@ def get_article_content_archive(article_id, scraped_at, paywall, section, catego
 
     return data
 
+def extract_article(raw_html, source, article_id, scraped_at, paywall, section, category):
+    """
+    Run the extractor matching the page format the HTML came from:
+    FT ("ft") and the primary bypass ("bypass") serve div.article-content,
+    the archive ("archive") serves its own layout.
+    """
+    if source in ("ft", "bypass"):
+        return get_article_content_lxml(
+            article_id=article_id,
+            scraped_at=scraped_at,
+            paywall=paywall,
+            section=section,
+            category=category,
+            raw_html=raw_html
+        )
+
+    return get_article_content_archive(
+        article_id=article_id,
+        scraped_at=scraped_at,
+        paywall=paywall,
+        section=section,
+        category=category,
+        raw_html=raw_html
+    )
+
 def clean_url(url: str) -> str:
     # If multiple protocols exist, keep the last valid one
     if url.count("https://") > 1 or url.count("http://") > 1:
@@ -206,4 +387,16 @@ def clean_article_url(url: str) -> str:
     url_parts = url.split('/')
     if url_parts[-1]:
         url_parts[-1] = re.sub(r'[^a-zA-Z0-9-]', '', url_parts[-1])
-    return '/'.join(url_parts)
\ No newline at end of file
+    return '/'.join(url_parts)
+
+def canonical_url(url: str) -> str:
+    """
+    Canonical form of an FT URL, used as article_id and dedupe key:
+    https, lower-case host, no query string, fragment or trailing slash,
+    last path segment cleaned with clean_article_url.
+    """
+    # split first: the query string and fragment must be dropped, not
+    # merged into the last path segment by clean_article_url
+    parts = urlsplit(clean_url(url))
+    path = clean_article_url(parts.path.rstrip("/:")).rstrip("/") or "/"
+    return urlunsplit(("https", parts.netloc.lower(), path, "", ""))
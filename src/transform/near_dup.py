@@ -0,0 +1,159 @@
+import hashlib
+import os
+import re
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path=".env")
+
+SHINGLE_SIZE = 4
+HASH_BITS = 64
+# LSH bands stored with every article (simhash_bands). Two fingerprints
+# within BANDS - 1 bits always share a band; further apart they only may.
+# Changing it needs the stored bands rebuilt (python -m src.load.migrations).
+BANDS = int(os.getenv("NEAR_DUP_BANDS", "4"))
+# Largest Hamming distance between two near-duplicates: reworded or
+# updated versions of an article are typically 4-8 bits apart, unrelated
+# articles around HASH_BITS / 2.
+MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "8"))
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def shingles(paragraphs, size=SHINGLE_SIZE):
+    """
+    Set of overlapping word n-grams over the article's paragraphs.
+    """
+    words = _WORD.findall(" ".join(paragraphs or []).lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def _hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+def simhash(paragraphs):
+    """
+    64-bit SimHash of the content paragraphs, or None for an empty
+    article. Near-identical texts get fingerprints a few bits apart.
+    """
+    features = shingles(paragraphs)
+    if not features:
+        return None
+
+    weights = [0] * HASH_BITS
+    for shingle in features:
+        h = _hash(shingle)
+        for bit in range(HASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+def bands(fingerprint, count=BANDS):
+    """
+    LSH keys of a fingerprint: one "<band>:<bits>" string per band, so
+    candidates can be found with an indexed $in query.
+    """
+    if not 1 <= count <= HASH_BITS:
+        raise ValueError(f"band count must be between 1 and {HASH_BITS}, got {count}")
+    width = HASH_BITS // count
+    mask = (1 << width) - 1
+    return [f"{i}:{fingerprint >> (i * width) & mask:0{-(-width // 4)}x}" for i in range(count)]
+
+def fingerprint_fields(paragraphs, count=BANDS):
+    """
+    Document fields stored at load time: simhash (hex) and its LSH bands.
+    Empty for an article without content.
+    """
+    fingerprint = simhash(paragraphs)
+    if fingerprint is None:
+        return {}
+    return {"simhash": f"{fingerprint:016x}", "simhash_bands": bands(fingerprint, count)}
+
+def closest(fingerprint, candidates, max_distance=MAX_DISTANCE):
+    """
+    The candidate (dict with a hex "simhash") nearest to fingerprint
+    within max_distance bits, or None.
+    """
+    best, best_distance = None, max_distance + 1
+    for candidate in candidates:
+        if not candidate.get("simhash"):
+            continue
+        distance = hamming(fingerprint, int(candidate["simhash"], 16))
+        if distance < best_distance:
+            best, best_distance = candidate, distance
+    return best
+
+
+class NearDupIndex:
+    """
+    In-memory LSH index grouping near-duplicate articles: every added
+    article joins the group of the first indexed article within
+    max_distance bits that shares one of its bands.
+    By default the index uses max_distance + 1 bands, so no pair within
+    max_distance is missed; fewer bands mean fewer comparisons but only
+    a probable match beyond bands - 1 bits.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, bands=None):
+        self.max_distance = max_distance
+        self.bands = min(max_distance + 1, HASH_BITS) if bands is None else bands
+        self._buckets = {}
+        self._fingerprints = {}
+        self.groups = {}  # root article_id → [article_id, ...]
+
+    def add(self, article_id, fingerprint):
+        """
+        Index one article. Returns the root article_id of its group.
+        """
+        if fingerprint is None:
+            self.groups[article_id] = [article_id]
+            return article_id
+
+        keys = bands(fingerprint, self.bands)
+        root = None
+        for key in keys:
+            for other in self._buckets.get(key, ()):
+                if hamming(fingerprint, self._fingerprints[other]) <= self.max_distance:
+                    root = other
+                    break
+            if root is not None:
+                break
+
+        if root is None:
+            root = article_id
+            self.groups[root] = [article_id]
+            for key in keys:
+                self._buckets.setdefault(key, []).append(article_id)
+            self._fingerprints[article_id] = fingerprint
+        else:
+            self.groups[root].append(article_id)
+        return root
+
+def group_near_duplicates(articles, max_distance=MAX_DISTANCE, bands=None):
+    """
+    Group article dicts (with "article_id" and "content", and a stored
+    "simhash" when available) into near-duplicate groups (see
+    NearDupIndex for max_distance and bands). Returns one
+    representative per group, the article with the most content, with
+    the others attached under "duplicates" (article_id + headline).
+    """
+    index = NearDupIndex(max_distance=max_distance, bands=bands)
+    by_id = {}
+    for article in articles:
+        by_id[article["article_id"]] = article
+        stored = article.get("simhash")
+        index.add(article["article_id"], int(stored, 16) if stored else simhash(article.get("content")))
+
+    representatives = []
+    for members in index.groups.values():
+        group = [by_id[article_id] for article_id in members]
+        representative = max(group, key=lambda a: sum(len(p) for p in a.get("content") or []))
+        representative["duplicates"] = [
+            {"article_id": a["article_id"], "headline": a.get("topper__headline")}
+            for a in group if a is not representative
+        ]
+        representatives.append(representative)
+    return representatives
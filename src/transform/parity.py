@@ -0,0 +1,100 @@
+import argparse
+import os
+import time
+from bs4 import BeautifulSoup
+
+from src.load.archive import RawHtmlArchive, ARCHIVE_DIR
+from src.transform.cleaner import get_article_content, get_article_content_lxml
+
+FIELDS = ("article_id", "scraped_at", "paywall", "section", "category")
+
+
+def iter_documents(archive_dir=ARCHIVE_DIR, paths=None, limit=None):
+    """
+    (name, raw_html) of the given .html files, or of the div.article-content
+    ("ft" / "bypass") records of the raw archive.
+    """
+    if paths:
+        for path in paths[:limit]:
+            with open(path, "r", encoding="utf-8") as f:
+                yield path, f.read()
+        return
+
+    count = 0
+    for path in RawHtmlArchive(root=archive_dir).latest_paths():
+        record = RawHtmlArchive.load(path)
+        if record["meta"].get("source") not in ("ft", "bypass"):
+            continue
+        yield record["article_url"], record["html"]
+        count += 1
+        if limit and count >= limit:
+            return
+
+def compare(raw_html, name="doc"):
+    """
+    Run both extractors on one document.
+    Returns (differences, bs4 seconds, lxml seconds), where differences
+    maps each mismatching field to (bs4 value, lxml value).
+    """
+    args = dict(zip(FIELDS, (name, None, False, None, None)))
+
+    started = time.perf_counter()
+    expected = get_article_content(soup=BeautifulSoup(raw_html, "html.parser"), **args)
+    bs4_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = get_article_content_lxml(raw_html=raw_html, **args)
+    lxml_seconds = time.perf_counter() - started
+
+    differences = {
+        key: (expected.get(key), actual.get(key))
+        for key in expected.keys() | actual.keys()
+        if expected.get(key) != actual.get(key)
+    }
+    return differences, bs4_seconds, lxml_seconds
+
+def check_parity(documents, verbose=False):
+    """
+    Compare both extractors over every document and print the mismatches
+    and the speedup. Returns (documents checked, documents mismatched).
+    """
+    checked, mismatched = 0, 0
+    bs4_total, lxml_total = 0.0, 0.0
+
+    for name, raw_html in documents:
+        differences, bs4_seconds, lxml_seconds = compare(raw_html, name)
+        checked += 1
+        bs4_total += bs4_seconds
+        lxml_total += lxml_seconds
+        if differences:
+            mismatched += 1
+            print(f"MISMATCH {name}: {', '.join(sorted(differences))}")
+            if verbose:
+                for key, (expected, actual) in sorted(differences.items()):
+                    print(f"  {key}:\n    bs4:  {expected!r}\n    lxml: {actual!r}")
+
+    if checked:
+        print(
+            f"{checked} documents, {mismatched} mismatched; "
+            f"bs4 {bs4_total / checked * 1000:.1f} ms/doc, lxml {lxml_total / checked * 1000:.1f} ms/doc "
+            f"({bs4_total / lxml_total if lxml_total else 0:.1f}x)"
+        )
+    else:
+        print("No documents to compare")
+    return checked, mismatched
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Check the lxml article extractor against the BeautifulSoup one")
+    parser.add_argument("paths", nargs="*", help="HTML files (default: the raw archive)")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    checked, mismatched = check_parity(
+        iter_documents(args.archive_dir, [p for p in args.paths if os.path.isfile(p)], args.limit),
+        verbose=args.verbose
+    )
+    # nothing compared is a failure too (e.g. an empty archive)
+    raise SystemExit(1 if mismatched or not checked else 0)
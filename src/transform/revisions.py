@@ -0,0 +1,83 @@
+import hashlib
+import json
+from difflib import SequenceMatcher
+
+# Fields compared when an article is re-scraped (content is compared
+# paragraph by paragraph through its hashes)
+TRACKED_FIELDS = (
+    "topper__primary_theme",
+    "topper__headline",
+    "standfirst",
+    "byline",
+    "updated_at",
+    "media",
+)
+
+
+def paragraph_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+def paragraph_hashes(paragraphs):
+    return [paragraph_hash(p) for p in paragraphs or []]
+
+def _same(a, b):
+    return json.dumps(a, sort_keys=True, default=str) == json.dumps(b, sort_keys=True, default=str)
+
+def diff_article(stored, fresh):
+    """
+    Compare a stored article (tracked fields + paragraph_hashes, or its
+    content when it was stored before paragraph hashes existed) with a
+    freshly extracted one.
+
+    Returns (changes, revision), both None when nothing changed:
+    changes is the $set document (only changed fields; single changed
+    paragraphs as "content.<i>" when the paragraph count is unchanged),
+    revision a compact record of what changed. For an article without
+    stored hashes, changes also backfills paragraph_hashes and revision
+    is None when nothing else differs.
+    """
+    changes = {}
+    fields = []
+
+    for field in TRACKED_FIELDS:
+        if not _same(stored.get(field), fresh.get(field)):
+            changes[field] = fresh.get(field)
+            fields.append(field)
+
+    old_hashes = stored.get("paragraph_hashes")
+    legacy = old_hashes is None
+    if legacy:
+        old_hashes = paragraph_hashes(stored.get("content"))
+    new_hashes = paragraph_hashes(fresh.get("content"))
+    opcodes = []
+
+    if old_hashes != new_hashes:
+        opcodes = [
+            [tag, i1, i2, j1, j2]
+            for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_hashes, new_hashes, autojunk=False).get_opcodes()
+            if tag != "equal"
+        ]
+        if len(old_hashes) == len(new_hashes) and not legacy:
+            for i, (old, new) in enumerate(zip(old_hashes, new_hashes)):
+                if old != new:
+                    changes[f"content.{i}"] = fresh["content"][i]
+                    changes[f"paragraph_hashes.{i}"] = new
+        else:
+            changes["content"] = fresh.get("content", [])
+            changes["paragraph_hashes"] = new_hashes
+        fields.append("content")
+    elif legacy:
+        changes["paragraph_hashes"] = new_hashes
+
+    if not changes:
+        return None, None
+    if not fields:
+        return changes, None
+
+    revision = {
+        "fields": fields,
+        "updated_at": fresh.get("updated_at"),
+        "paragraphs": opcodes,
+        "paragraph_count": len(new_hashes)
+    }
+    return changes, revision
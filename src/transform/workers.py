@@ -0,0 +1,105 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from src.transform.cleaner import extract_article
+
+
+class TransformPool:
+    """
+    Process pool for the transform stage.
+
+    BeautifulSoup / lxml parsing is CPU-bound and holds the GIL, so
+    running it in the fetch threads stalls every other fetch. Raw HTML
+    strings are sent to worker processes, which run extract_article and
+    send back plain dicts.
+
+    At most max_pending documents are queued or being parsed at once:
+    submit() blocks the calling fetch thread when the stage is full,
+    which keeps memory bounded and slows fetching down to parse speed.
+    Workers are spawned (not forked) so they never inherit browser
+    threads from the parent.
+    """
+
+    def __init__(self, workers=None, max_pending=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.failed = 0
+
+    def submit(self, raw_html, source, article_id, scraped_at, paywall, section, category):
+        """
+        Queue one document for extraction; blocks while max_pending
+        documents are in flight. Returns a Future of the article dict.
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(
+                extract_article, raw_html, source, article_id, scraped_at, paywall, section, category
+            )
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.submitted += 1
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        self._slots.release()
+        if future.exception() is not None:
+            with self._lock:
+                self.failed += 1
+
+    def transform(self, *args, **kwargs):
+        """
+        submit() and wait for the article dict.
+        """
+        return self.submit(*args, **kwargs).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "submitted": self.submitted,
+                "failed": self.failed
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_transform_pool(**kwargs):
+    """
+    Return the process-wide TransformPool, creating it on first use.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = TransformPool(**kwargs)
+        return _default_pool
+
+
+def close_transform_pool():
+    """
+    Shut down and forget the process-wide TransformPool.
+    """
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
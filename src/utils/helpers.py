@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+
+
+def parse_timestamp(value):
+    """
+    Parse an FT timestamp into a timezone-aware UTC datetime.
+    Accepts datetimes (naive ones are taken as UTC) and ISO 8601 strings
+    such as "2025-08-30T10:15:00.000Z" or "2025-08-30T10:15:00+0000".
+    Returns None when the value cannot be parsed.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        text = str(value).strip()
+        if not text:
+            return None
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+        # +0000 → +00:00 for Python < 3.11
+        if len(text) > 5 and text[-5] in "+-" and text[-4:].isdigit():
+            text = text[:-2] + ":" + text[-2:]
+        try:
+            dt = datetime.fromisoformat(text)
+        except ValueError:
+            return None
+
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
@@ -0,0 +1,239 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from urllib.parse import urlsplit
+
+THROTTLE_STATUSES = {429, 503}
+
+
+class _HostState:
+    """
+    Token bucket + AIMD concurrency window for one host.
+    """
+
+    def __init__(self, rate, burst, concurrency):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.limit = concurrency
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.counts = {"ok": 0, "slow": 0, "throttled": 0, "timeouts": 0, "errors": 0}
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class HostLimiter:
+    """
+    Per-host politeness for every request the scraper makes.
+
+    Each host gets a token bucket (requests per second) and a concurrency
+    window. Both grow additively while requests come back fast, and are
+    cut multiplicatively on 429/503, timeouts or latency above
+    `target_latency`, so throughput settles near what the host accepts.
+    A throttled host is also paused for `pause` seconds (or its
+    Retry-After).
+    """
+
+    def __init__(
+        self,
+        rate=4.0,
+        burst=8,
+        concurrency=4,
+        min_rate=0.2,
+        max_rate=50.0,
+        min_concurrency=1,
+        max_concurrency=64,
+        target_latency=8.0,
+        increase=1.0,
+        decrease=0.5,
+        pause=10.0
+    ):
+        self.defaults = (rate, burst, concurrency)
+        self.min_rate, self.max_rate = min_rate, max_rate
+        self.min_concurrency, self.max_concurrency = min_concurrency, max_concurrency
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+        self.pause = pause
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._hosts = {}
+
+    # -----------------------------
+    # Internals
+    # -----------------------------
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(*self.defaults)
+        return state
+
+    def _try_acquire(self, host):
+        """
+        Take a slot and a token if both are available.
+        Returns 0 on success, otherwise seconds to wait before retrying.
+        """
+        with self._lock:
+            state = self._state(host)
+            now = time.monotonic()
+            if now < state.paused_until:
+                return state.paused_until - now
+            if state.in_flight >= int(state.limit):
+                return 0.05
+            state.refill(now)
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+            state.in_flight += 1
+            return 0
+
+    def _release(self, host, latency, status=None, timeout=False, error=False, retry_after=None):
+        with self._cond:
+            state = self._state(host)
+            state.in_flight -= 1
+
+            if status in THROTTLE_STATUSES or timeout:
+                state.counts["timeouts" if timeout else "throttled"] += 1
+                self._backoff(state)
+                state.paused_until = time.monotonic() + (retry_after or self.pause)
+            elif error:
+                state.counts["errors"] += 1
+            elif latency > self.target_latency:
+                state.counts["slow"] += 1
+                self._backoff(state)
+            else:
+                state.counts["ok"] += 1
+                # additive increase: about +increase per window of successes
+                state.limit = min(self.max_concurrency, state.limit + self.increase / max(state.limit, 1))
+                state.rate = min(self.max_rate, state.rate + self.increase * 0.1)
+
+            self._cond.notify_all()
+
+    def _backoff(self, state):
+        state.limit = max(self.min_concurrency, state.limit * self.decrease)
+        state.rate = max(self.min_rate, state.rate * self.decrease)
+        state.tokens = min(state.tokens, 1)
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+
+    @contextmanager
+    def acquire(self, url):
+        """
+        Block until the host of `url` has capacity, then yield a Ticket
+        the caller fills with the outcome of its request.
+        """
+        host = urlsplit(url).hostname or ""
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                break
+            with self._cond:
+                self._cond.wait(timeout=min(wait, 1.0))
+
+        ticket = Ticket()
+        start = time.monotonic()
+        try:
+            yield ticket
+        except Exception:
+            ticket.error = True
+            raise
+        finally:
+            self._release(host, time.monotonic() - start, **ticket.outcome())
+
+    @asynccontextmanager
+    async def acquire_async(self, url):
+        """
+        asyncio variant of acquire() sharing the same per-host state.
+        """
+        host = urlsplit(url).hostname or ""
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                break
+            await asyncio.sleep(min(wait, 1.0))
+
+        ticket = Ticket()
+        start = time.monotonic()
+        try:
+            yield ticket
+        except Exception:
+            ticket.error = True
+            raise
+        finally:
+            self._release(host, time.monotonic() - start, **ticket.outcome())
+
+    def stats(self):
+        """
+        Current limits and outcome counters per host.
+        """
+        with self._lock:
+            return {
+                host: {
+                    "concurrency_limit": round(state.limit, 2),
+                    "rate_per_s": round(state.rate, 2),
+                    "in_flight": state.in_flight,
+                    **state.counts
+                }
+                for host, state in self._hosts.items()
+            }
+
+
+class Ticket:
+    """
+    Outcome of one limited request, reported back to the limiter.
+    """
+
+    def __init__(self):
+        self.status = None
+        self.timeout = False
+        self.error = False
+        self.retry_after = None
+
+    def outcome(self):
+        return {
+            "status": self.status,
+            "timeout": self.timeout,
+            "error": self.error,
+            "retry_after": self.retry_after
+        }
+
+
+def backoff_delay(attempt, base=1.0, cap=30.0):
+    """
+    Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)].
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_retry_after(value):
+    """
+    Seconds from a Retry-After header (delta-seconds form only).
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_default_limiter = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_host_limiter(**kwargs):
+    """
+    Return the process-wide HostLimiter, creating it on first use.
+    """
+    global _default_limiter
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = HostLimiter(**kwargs)
+        return _default_limiter
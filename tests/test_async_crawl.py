@@ -0,0 +1,56 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from src.extract import async_crawl
+
+
+class FakeFetcher:
+    def __init__(self, html):
+        self.html = html
+
+    def get(self, url, revalidate=False):
+        return self.html
+
+    def record(self, kind, used_fallback=False):
+        pass
+
+
+class BrokenPage:
+    async def goto(self, url, **kwargs):
+        raise RuntimeError("net::ERR_CONNECTION_RESET")
+
+
+class FakePool:
+    wait_until = "load"
+
+    @asynccontextmanager
+    async def lease(self):
+        yield BrokenPage()
+
+
+STREAM = (
+    '<div id="stream"><ul>'
+    '<li class="o-teaser-collection__item"><a class="js-teaser-heading-link" href="/content/a?x=1">A</a></li>'
+    '<li class="o-teaser-collection__item"><a class="js-teaser-heading-link" href="/content/b">B</a></li>'
+    '</ul></div>'
+)
+
+
+class Known:
+    def filter_new(self, links):
+        return [link for link in links if not link.endswith("/b")]
+
+
+def test_get_new_articles_returns_none_when_listing_fails(monkeypatch):
+    monkeypatch.setattr(async_crawl, "get_http_fetcher", lambda: FakeFetcher(None))
+    assert asyncio.run(async_crawl.get_new_articles(FakePool(), None, "https://www.ft.com/world")) is None
+
+
+def test_get_new_articles_filters_known_ids(monkeypatch):
+    monkeypatch.setattr(async_crawl, "get_http_fetcher", lambda: FakeFetcher(STREAM))
+    articles = asyncio.run(async_crawl.get_new_articles(FakePool(), None, "https://www.ft.com/world", Known()))
+    assert articles == ["https://www.ft.com/content/a"]
@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from src.extract import browser
+from src.scheduler.pipeline import Pipeline
+
+
+def test_browser_workers_release_each_thread_on_its_own_thread(monkeypatch):
+    released = []
+    monkeypatch.setattr(browser, "release_browser_thread", lambda: released.append(threading.get_ident()))
+
+    used = set()
+
+    def work(_):
+        used.add(threading.get_ident())
+        time.sleep(0.01)
+
+    with browser.BrowserWorkers(max_workers=4) as executor:
+        # several rounds on the same executor reuse its threads
+        for _ in range(3):
+            list(executor.map(work, range(8)))
+
+    assert len(used) <= 4
+    assert sorted(released) == sorted(used)
+
+
+def test_pipeline_stage_threads_call_on_exit():
+    exited = []
+    lock = threading.Lock()
+
+    def on_exit():
+        with lock:
+            exited.append(threading.current_thread().name)
+
+    Pipeline().add("fetch", lambda item: [item], workers=3, on_exit=on_exit).add("sink", lambda item: None).run(
+        {"fetch": range(10)}, report_every=60
+    )
+    assert sorted(exited) == ["fetch-0", "fetch-1", "fetch-2"]
@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("lxml")
+
+from src.transform.cleaner import canonical_url
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.ft.com/content/abc-123",
+    "https://www.ft.com/content/abc-123?segmentId=x",
+    "https://www.ft.com/content/abc-123#frag",
+    "https://www.ft.com/content/abc-123?segmentId=x#frag",
+    "https://www.ft.com/content/abc-123/?segmentId=x",
+    "https://www.ft.com/content/abc-123:",
+    "https://www.ft.com/content/abc-123:?segmentId=x",
+    "https://www.ft.com/https://www.ft.com/content/abc-123",
+    "http://WWW.FT.COM/content/abc-123/",
+])
+def test_canonical_url_drops_query_and_fragment(url):
+    assert canonical_url(url) == "https://www.ft.com/content/abc-123"
@@ -0,0 +1,49 @@
+import asyncio
+
+from src.scheduler import daily_job
+from src.scheduler.task_queue import TaskQueue
+
+RUN = "run-1"
+
+
+def make_queue(tmp_path):
+    queue = TaskQueue(path=str(tmp_path / "queue.db"), max_attempts=3, retry_base=0.01)
+    queue.start_run(RUN)
+    return queue
+
+
+def test_drain_queue_async_retries_and_dead_letters(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.put_many(RUN, "article", [(task, {"task": task}) for task in ("ok", "flaky", "broken")])
+    calls = {}
+
+    async def handler(payload):
+        task = payload["task"]
+        calls[task] = calls.get(task, 0) + 1
+        if task == "broken" or (task == "flaky" and calls[task] == 1):
+            raise RuntimeError(f"{task} failed")
+        return True, None
+
+    asyncio.run(daily_job.drain_queue_async(queue, RUN, "article", handler, 2, "Testing"))
+
+    assert calls == {"ok": 1, "flaky": 2, "broken": 3}
+    assert queue.counts(RUN, "article") == {"done": 2, "failed": 1}
+    assert [letter["task_id"] for letter in queue.dead_letters(RUN)] == ["broken"]
+
+
+def test_plan_run_does_not_rewarm_an_empty_known_set(tmp_path, monkeypatch):
+    class EmptyKnown:
+        def __len__(self):
+            return 0
+
+    def rewarm(collection):
+        raise AssertionError("known ids warmed again")
+
+    known = EmptyKnown()
+    used = []
+    monkeypatch.setattr(daily_job, "KnownArticleIds", rewarm)
+    monkeypatch.setattr(daily_job, "list_leaf", lambda url, collection, k, watermark: used.append(k) or ("world", []))
+
+    queue = make_queue(tmp_path)
+    daily_job.plan_run(queue, RUN, None, {"sections": {"World": ["https://www.ft.com/world"]}}, listing_workers=1, known=known)
+    assert used == [known]
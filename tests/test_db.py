@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from src.load.db import BulkArticleWriter, KnownArticleIds, normalize_article
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient()["ft_scraper_test"]["articles"]
+    collection.create_index("article_id", unique=True)
+    return collection
+
+
+def article(article_id, content=("Paragraph one.", "Paragraph two.")):
+    return {"article_id": f"https://www.ft.com/content/{article_id}", "content": list(content), "published_at": "2025-09-18T10:00:00Z"}
+
+
+def test_normalize_article():
+    normalized = normalize_article(article("a"))
+    assert normalized["published_at"] == datetime(2025, 9, 18, 10, tzinfo=timezone.utc)
+    assert normalized["has_content"] is True
+    assert normalized["content_length"] == len("Paragraph one.") + len("Paragraph two.")
+    assert normalize_article({"content": None})["has_content"] is False
+
+
+def test_bulk_writer_reports_inserted_and_duplicate(collection):
+    collection.insert_one(article("stored"))
+    results = []
+    writer = BulkArticleWriter(collection, batch_size=10, on_result=lambda a, status, error: results.append((a["article_id"], status)))
+
+    for article_id in ("new-1", "stored", "new-2"):
+        writer.add(article(article_id))
+    writer.close()
+
+    assert sorted(results) == [
+        ("https://www.ft.com/content/new-1", "inserted"),
+        ("https://www.ft.com/content/new-2", "inserted"),
+        ("https://www.ft.com/content/stored", "duplicate"),
+    ]
+    assert writer.stats() == {"inserted": 2, "duplicate": 1, "skipped": 0, "failed": 0, "batches": 1, "buffered": 0}
+    assert collection.count_documents({}) == 3
+
+
+def test_bulk_writer_flushes_full_batches(collection):
+    writer = BulkArticleWriter(collection, batch_size=2)
+    for article_id in ("a", "b", "c"):
+        writer.add(article(article_id))
+    assert writer.stats()["batches"] == 1
+    assert writer.stats()["buffered"] == 1
+    writer.close()
+    assert writer.stats()["inserted"] == 3
+    with pytest.raises(RuntimeError):
+        writer.add(article("d"))
+
+
+def test_bulk_writer_without_connection_fails_every_document():
+    writer = BulkArticleWriter(None, batch_size=10)
+    writer.add(article("a"))
+    writer.close()
+    assert writer.stats()["failed"] == 1
+    assert writer.failures == [("https://www.ft.com/content/a", "No database connection.")]
+
+
+def test_known_article_ids(collection):
+    collection.insert_many([article("a"), article("b")])
+    known = KnownArticleIds(collection).warm()
+    assert len(known) == 2
+    known.add("https://www.ft.com/content/c")
+    assert known.filter_new([f"https://www.ft.com/content/{x}" for x in "abcd"]) == ["https://www.ft.com/content/d"]
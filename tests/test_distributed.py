@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from src.scheduler.distributed import MongoTaskQueue, wait_for_workers
+
+RUN = "run-1"
+
+
+@pytest.fixture
+def db():
+    return mongomock.MongoClient()["ft_scraper_test"]
+
+
+def make_queue(db, worker_id, lease_seconds=60):
+    return MongoTaskQueue(db["etl_tasks"], db["etl_runs"], worker_id=worker_id, lease_seconds=lease_seconds, retry_base=0.01)
+
+
+def expire_leases(db):
+    db["etl_tasks"].update_many({"state": "leased"}, {"$set": {"lease_until": time.time() - 1}})
+
+
+def test_put_many_skips_existing_tasks(db):
+    queue = make_queue(db, "a")
+    assert queue.put_many(RUN, "article", [("u1", {"n": 1}), ("u2", {"n": 2})]) == 2
+    assert queue.put_many(RUN, "article", [("u2", {"n": 2}), ("u3", {"n": 3})]) == 1
+    assert queue.counts(RUN, "article") == {"pending": 3}
+
+
+def test_lease_is_exclusive(db):
+    a, b = make_queue(db, "a"), make_queue(db, "b")
+    a.put(RUN, "article", "u1", {"n": 1})
+    assert a.lease(RUN, "article") == ("u1", {"n": 1}, 1)
+    assert b.lease(RUN, "article") is None
+
+
+def test_expired_lease_is_reclaimed(db):
+    a, b = make_queue(db, "a"), make_queue(db, "b")
+    a.put(RUN, "article", "u1", {})
+    a.lease(RUN, "article")
+    expire_leases(db)  # worker a died
+    assert b.lease(RUN, "article") == ("u1", {}, 2)
+
+
+def test_heartbeat_renews_leases(db):
+    a, b = make_queue(db, "a", lease_seconds=0.3), make_queue(db, "b")
+    a.put(RUN, "article", "u1", {})
+    a.lease(RUN, "article")
+    a.start_heartbeat(interval=0.05)
+    try:
+        time.sleep(0.6)
+        assert b.lease(RUN, "article") is None
+    finally:
+        a.stop_heartbeat()
+
+
+def test_complete_and_fail_rejected_after_lease_lost(db):
+    a, b = make_queue(db, "a"), make_queue(db, "b")
+    a.put(RUN, "article", "u1", {})
+    a.lease(RUN, "article")
+    expire_leases(db)
+    b.lease(RUN, "article")
+
+    assert a.complete(RUN, "article", "u1") is False
+    assert a.fail(RUN, "article", "u1", error="late") is False
+    assert db["etl_tasks"].find_one({"task_id": "u1"})["worker"] == "b"
+    assert b.complete(RUN, "article", "u1") is True
+    assert b.counts(RUN, "article") == {"done": 1}
+
+
+def test_fail_retries_then_dead_letters(db):
+    queue = make_queue(db, "a")
+    queue.max_attempts = 2
+    queue.put(RUN, "article", "u1", {})
+    queue.lease(RUN, "article")
+    assert queue.fail(RUN, "article", "u1", error="boom") is False
+    time.sleep(0.05)
+    queue.lease(RUN, "article")
+    assert queue.fail(RUN, "article", "u1", error="boom") is True
+    assert queue.dead_letters(RUN) == [{"kind": "article", "task_id": "u1", "attempts": 2, "last_error": "boom"}]
+
+
+def test_wait_for_workers_gives_up_without_live_leases(db):
+    queue = make_queue(db, "coordinator")
+    queue.put(RUN, "article", "u1", {})
+    assert wait_for_workers(queue, RUN, poll=0.01, max_idle=0.05) is False
+
+
+def test_wait_for_workers_returns_when_drained(db):
+    queue = make_queue(db, "a")
+    queue.put(RUN, "article", "u1", {})
+    queue.lease(RUN, "article")
+    queue.complete(RUN, "article", "u1")
+    assert wait_for_workers(queue, RUN, poll=0.01, max_idle=0.05) is True
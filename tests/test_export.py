@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+import pyarrow.dataset as ds
+
+from src.load.export import PARTITIONING, _write_chunk, to_row
+
+
+def test_chunk_spanning_more_than_1024_partitions(tmp_path):
+    start = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    rows = [
+        to_row({
+            "article_id": f"https://www.ft.com/content/{day}",
+            "published_at": start + timedelta(days=day),
+            "section": "World",
+            "content": ["Paragraph"],
+        })
+        for day in range(1030)
+    ]
+
+    _write_chunk(rows, str(tmp_path), chunk_id=0)
+
+    dataset = ds.dataset(str(tmp_path), format="parquet", partitioning=PARTITIONING)
+    assert dataset.count_rows() == 1030
+    assert len(list(tmp_path.glob("published_date=*"))) == 1030
@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from src.extract.interception import BlockingProfile, TYPICAL_BYTES
+
+
+def request(url, resource_type):
+    return SimpleNamespace(url=url, resource_type=resource_type)
+
+
+def response(resource_type, length):
+    headers = {} if length is None else {"content-length": str(length)}
+    return SimpleNamespace(headers=headers, request=request("https://www.ft.com/x", resource_type))
+
+
+def test_should_block_rules():
+    profile = BlockingProfile(allow_domains={"ft.com"})
+    assert profile.should_block("https://www.ft.com/logo.png", "image")
+    assert not profile.should_block("https://www.ft.com/app.js", "script")
+    assert profile.should_block("https://stats.g.doubleclick.net/t.js", "script")
+    assert not profile.should_block("https://cdn.example.com/app.js", "script")
+
+
+def test_blocked_bytes_use_typical_sizes_then_observed_means():
+    profile = BlockingProfile()
+    profile._record(request("https://www.ft.com/a.png", "image"), blocked=True)
+    assert profile.stats()["bytes_blocked_estimate"] == TYPICAL_BYTES["image"]
+
+    profile._on_response(response("script", 1000))
+    profile._on_response(response("script", 3000))
+    profile._on_response(response("script", None))  # no content-length: not counted
+    profile._record(request("https://www.googletagmanager.com/gtm.js", "script"), blocked=True)
+
+    stats = profile.stats()
+    assert stats["bytes_received"] == 4000
+    assert stats["bytes_blocked_estimate"] == TYPICAL_BYTES["image"] + 2000
+    assert stats["requests_blocked"] == 2
@@ -0,0 +1,46 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from src.load.migrations import repair_article_ids, repaired_article_id
+
+UUID = "0a1b2c3d-1111-2222-3333-444455556666"
+OTHER = "9f8e7d6c-aaaa-bbbb-cccc-ddddeeeeffff"
+CANONICAL = f"https://www.ft.com/content/{UUID}"
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient()["ft_scraper_test"]["articles"]
+
+
+@pytest.mark.parametrize("stored", [
+    f"https://www.ft.com/content/{UUID}utm_sourcerssutm_mediumfeed",
+    f"http://www.FT.com/content/{UUID}/",
+    CANONICAL,
+])
+def test_repaired_article_id(stored):
+    assert repaired_article_id(stored) == CANONICAL
+
+
+def test_section_urls_are_left_alone():
+    assert repaired_article_id("https://www.ft.com/world/uk") == "https://www.ft.com/world/uk"
+
+
+def test_repair_rewrites_legacy_ids_and_marks_collisions(collection):
+    collection.insert_many([
+        {"article_id": f"https://www.ft.com/content/{UUID}shareTypenongift"},
+        {"article_id": f"https://www.ft.com/content/{OTHER}ftcampnew", "duplicate_of": None},
+        {"article_id": f"https://www.ft.com/content/{OTHER}"},
+        {"article_id": "https://www.ft.com/content/x", "duplicate_of": f"https://www.ft.com/content/{OTHER}ftcampnew"},
+    ])
+
+    assert repair_article_ids(collection) == (1, 1)
+    ids = sorted(doc["article_id"] for doc in collection.find())
+    assert CANONICAL in ids
+    legacy = collection.find_one({"article_id": f"https://www.ft.com/content/{OTHER}ftcampnew"})
+    assert legacy["duplicate_of"] == f"https://www.ft.com/content/{OTHER}"
+    assert collection.find_one({"article_id": "https://www.ft.com/content/x"})["duplicate_of"] == f"https://www.ft.com/content/{OTHER}"
+
+    # idempotent
+    assert repair_article_ids(collection) == (0, 0)
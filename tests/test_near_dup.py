@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from src.transform.cleaner import get_article_content_lxml
+from src.transform.near_dup import NearDupIndex, bands, group_near_duplicates, hamming, simhash
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "corpus")
+ARGS = dict(scraped_at=None, paywall=False, section="World", category="world")
+
+
+def article(name):
+    with open(os.path.join(CORPUS_DIR, name), "r", encoding="utf-8") as f:
+        return get_article_content_lxml(raw_html=f.read(), article_id=name, **ARGS)
+
+
+def groups(articles, **kwargs):
+    return {a["article_id"]: sorted(d["article_id"] for d in a["duplicates"]) for a in group_near_duplicates(articles, **kwargs)}
+
+
+def test_updated_article_is_grouped_with_the_original():
+    original, updated = article("ft_article_long.html"), article("ft_article_long_updated.html")
+    # a new lead paragraph, a few reworded phrases and a dropped paragraph
+    assert hamming(simhash(original["content"]), simhash(updated["content"])) > 3
+
+    # the longer original represents the group
+    assert groups([original, updated]) == {"ft_article_long.html": ["ft_article_long_updated.html"]}
+
+
+def test_unrelated_articles_are_not_grouped():
+    articles = [article(name) for name in ("ft_article_long.html", "ft_article_short.html", "bypass_article_figures.html")]
+    assert all(not duplicates for duplicates in groups(articles).values())
+
+
+def test_threshold_and_bands_are_configurable():
+    original, updated = article("ft_article_long.html"), article("ft_article_long_updated.html")
+    assert all(not duplicates for duplicates in groups([original, updated], max_distance=3).values())
+    assert len(groups([original, updated], max_distance=8, bands=16)) == 1
+
+
+def test_index_finds_every_pair_within_max_distance():
+    base = 0x0123456789ABCDEF
+    # 6 bits apart, touching all four 16-bit bands
+    near = base ^ sum(1 << bit for bit in (0, 8, 16, 32, 40, 48))
+
+    index = NearDupIndex(max_distance=6)
+    index.add("a", base)
+    assert index.add("b", near) == "a"
+    assert index.add("c", base ^ ((1 << 7) - 1)) == "c"
+
+    four_bands = NearDupIndex(max_distance=6, bands=4)
+    four_bands.add("a", base)
+    assert four_bands.add("b", near) == "b"
+
+
+def test_band_count_is_checked():
+    with pytest.raises(ValueError):
+        bands(0, 0)
+    assert len(bands(0xFFFF, 64)) == 64
@@ -0,0 +1,79 @@
+import glob
+import os
+
+import pytest
+
+pytest.importorskip("bs4")
+pytest.importorskip("lxml")
+
+from bs4 import BeautifulSoup
+
+from src.transform.cleaner import get_article_content, get_article_content_lxml, paragraphs_well_formed
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "corpus")
+ARGS = dict(article_id="https://www.ft.com/content/example", scraped_at=None, paywall=False, section="World", category="world")
+
+# div.article-content documents (bypass pages use the same format)
+CORPUS = sorted(
+    glob.glob(os.path.join(CORPUS_DIR, "ft_*.html")) + glob.glob(os.path.join(CORPUS_DIR, "bypass_*.html"))
+)
+
+PAGE = """<!DOCTYPE html>
+<html><body><div class="article-content">
+<div class="topper__primary-theme"><span><a href="/stream/1">Topic</a></span></div>
+<h1 class="o-topper__headline"><span>Headline</span></h1>
+<div class="o-topper__standfirst">Standfirst</div>
+<p class="article-info__byline"><a href="/stream/a">Author</a> in London</p>
+<time class="article-info__timestamp" datetime="2025-09-18T14:05:12.000Z">September 18 2025</time>
+<article id="article-body">{body}</article>
+</div></body></html>"""
+
+MALFORMED = {
+    "div_in_p": "<p>Before <div>inside</div> after</p><p>Next</p>",
+    "unclosed_p": "<p>One<p>Two <strong>bold</strong><p>Three",
+    "unclosed_p_before_figure": (
+        "<p>One<figure><img src='https://images.example.com/1.jpg'>"
+        "<figcaption>Caption © Agency</figcaption></figure><p>Two"
+    ),
+    "stray_end_p": "<p>One</p></p><p>Two</p>",
+}
+
+
+def assert_same_fields(raw_html):
+    expected = get_article_content(soup=BeautifulSoup(raw_html, "html.parser"), **ARGS)
+    actual = get_article_content_lxml(raw_html=raw_html, **ARGS)
+    assert actual.keys() == expected.keys()
+    for field in expected:
+        assert actual[field] == expected[field], field
+
+
+def test_corpus_is_not_empty():
+    assert CORPUS
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+def test_lxml_matches_bs4_on_corpus(path):
+    with open(path, "r", encoding="utf-8") as f:
+        raw_html = f.read()
+    assert paragraphs_well_formed(raw_html)
+    assert_same_fields(raw_html)
+
+
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+def test_lxml_accepts_bytes(path):
+    with open(path, "rb") as f:
+        raw_html = f.read()
+    assert get_article_content_lxml(raw_html=raw_html, **ARGS) == get_article_content_lxml(
+        raw_html=raw_html.decode("utf-8"), **ARGS
+    )
+
+
+@pytest.mark.parametrize("body", MALFORMED.values(), ids=MALFORMED.keys())
+def test_lxml_matches_bs4_on_malformed_html(body):
+    raw_html = PAGE.format(body=body)
+    assert not paragraphs_well_formed(raw_html)
+    assert_same_fields(raw_html)
+
+
+def test_well_formed_paragraphs():
+    assert paragraphs_well_formed(PAGE.format(body="<p>One</p><pre>x</pre><P>Two</P><div><p>Three</p></div>"))
@@ -0,0 +1,38 @@
+import os
+import uuid
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from pymongo.errors import PyMongoError
+
+from src.load.db import get_db_connection
+from src.load.migrations import ensure_indexes, is_index_scan, query_plans
+
+# A scratch collection on the server of TEST_DB_URL (or DB_URL)
+DB_URL = os.getenv("TEST_DB_URL") or os.getenv("DB_URL")
+
+pytestmark = pytest.mark.skipif(not DB_URL, reason="needs a MongoDB server (TEST_DB_URL or DB_URL)")
+
+
+@pytest.fixture
+def collection():
+    try:
+        collection = get_db_connection(
+            DB_URL, db_name="ft_scraper_test", collection_name=f"articles_{uuid.uuid4().hex[:8]}"
+        )
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB server not reachable: {e}")
+    if collection is None:
+        pytest.skip("MongoDB server not reachable")
+    collection.insert_one({"article_id": "https://www.ft.com/content/example", "category": "global-economy"})
+    ensure_indexes(collection)
+    yield collection
+    collection.drop()
+
+
+@pytest.mark.parametrize("name", ["recent_articles", "category_watermark", "known_ids"])
+def test_query_uses_an_index(collection, name):
+    stages = query_plans(collection)[name]
+    assert is_index_scan(stages), stages
@@ -0,0 +1,51 @@
+from src.transform.revisions import diff_article, paragraph_hashes
+
+CONTENT = ["First paragraph.", "Second paragraph.", "Third paragraph."]
+
+
+def stored(content=CONTENT, **fields):
+    article = {"topper__headline": "Headline", "updated_at": "2025-09-18T10:00:00Z", "content": content}
+    article.update(fields)
+    article["paragraph_hashes"] = paragraph_hashes(content)
+    return article
+
+
+def fresh(content=CONTENT, **fields):
+    article = {"topper__headline": "Headline", "updated_at": "2025-09-18T10:00:00Z", "content": list(content)}
+    article.update(fields)
+    return article
+
+
+def test_unchanged_article():
+    assert diff_article(stored(), fresh()) == (None, None)
+
+
+def test_changed_field():
+    changes, revision = diff_article(stored(), fresh(topper__headline="New headline", updated_at="2025-09-18T11:00:00Z"))
+    assert changes == {"topper__headline": "New headline", "updated_at": "2025-09-18T11:00:00Z"}
+    assert revision["fields"] == ["topper__headline", "updated_at"]
+    assert revision["paragraphs"] == []
+
+
+def test_edited_paragraph_is_set_in_place():
+    content = ["First paragraph.", "Second paragraph, corrected.", "Third paragraph."]
+    changes, revision = diff_article(stored(), fresh(content))
+    assert changes == {"content.1": content[1], "paragraph_hashes.1": paragraph_hashes(content)[1]}
+    assert revision["fields"] == ["content"]
+    assert revision["paragraphs"] == [["replace", 1, 2, 1, 2]]
+    assert revision["paragraph_count"] == 3
+
+
+def test_added_paragraph_replaces_the_content():
+    content = CONTENT + ["Update: a fourth paragraph."]
+    changes, revision = diff_article(stored(), fresh(content))
+    assert changes == {"content": content, "paragraph_hashes": paragraph_hashes(content)}
+    assert revision["paragraphs"] == [["insert", 3, 3, 3, 4]]
+
+
+def test_legacy_article_backfills_hashes_without_a_revision():
+    legacy = stored()
+    del legacy["paragraph_hashes"]
+    changes, revision = diff_article(legacy, fresh())
+    assert changes == {"paragraph_hashes": paragraph_hashes(CONTENT)}
+    assert revision is None
@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta, timezone
+
+from src.extract.search import teasers_after
+
+WATERMARK = datetime(2025, 9, 18, 12, tzinfo=timezone.utc)
+
+
+def teaser(name, hours=None):
+    return (f"https://www.ft.com/content/{name}", None if hours is None else WATERMARK + timedelta(hours=hours))
+
+
+def links(teasers):
+    return [href for href, _ in teasers]
+
+
+def test_no_watermark_keeps_every_teaser():
+    teasers = [teaser("a", 2), teaser("b", -2), teaser("c")]
+    assert teasers_after(teasers, None) == links(teasers)
+
+
+def test_cut_at_first_teaser_not_newer_than_the_watermark():
+    teasers = [teaser("a", 2), teaser("b", 1), teaser("c", 0), teaser("d", 3)]
+    assert teasers_after(teasers, WATERMARK) == links(teasers[:2])
+
+
+def test_undated_teasers_are_kept():
+    teasers = [teaser("a", 2), teaser("pinned"), teaser("b", 1), teaser("c", -1)]
+    assert teasers_after(teasers, WATERMARK) == links(teasers[:3])
+
+
+def test_nothing_newer_returns_empty():
+    assert teasers_after([teaser("pinned"), teaser("a", 0), teaser("b", -5)], WATERMARK) == []
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from src.scheduler.task_queue import TaskQueue
+
+RUN = "run-1"
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = TaskQueue(path=str(tmp_path / "tasks.sqlite3"), lease_seconds=60, max_attempts=3, retry_base=0.01)
+    queue.start_run(RUN)
+    yield queue
+    queue.close()
+
+
+def wait_until_runnable(queue, kind):
+    time.sleep(max(0.0, queue.next_retry_at(RUN, kind) - time.time()))
+
+
+def test_put_many_skips_existing_tasks(queue):
+    assert queue.put_many(RUN, "article", [("u1", {"n": 1}), ("u2", {"n": 2})]) == 2
+    assert queue.put_many(RUN, "article", [("u2", {"n": 2}), ("u3", {"n": 3})]) == 1
+    assert not queue.put(RUN, "article", "u1", {"n": 1})
+    assert queue.counts(RUN, "article") == {"pending": 3}
+
+
+def test_lease_hands_out_each_task_once(queue):
+    queue.put_many(RUN, "article", [("u1", {"n": 1}), ("u2", {"n": 2})])
+    first, second = queue.lease(RUN, "article"), queue.lease(RUN, "article")
+    assert {first[0], second[0]} == {"u1", "u2"}
+    assert first[2] == second[2] == 1
+    assert queue.lease(RUN, "article") is None
+    assert queue.counts(RUN, "article") == {"leased": 2}
+
+
+def test_expired_lease_is_handed_out_again(tmp_path):
+    queue = TaskQueue(path=str(tmp_path / "tasks.sqlite3"), lease_seconds=0)
+    queue.put(RUN, "article", "u1", {})
+    assert queue.lease(RUN, "article")[2] == 1
+    time.sleep(0.01)
+    assert queue.lease(RUN, "article") == ("u1", {}, 2)
+
+
+def test_complete_stores_the_result(queue):
+    queue.put(RUN, "listing", "leaf", {"leaf_url": "leaf"})
+    queue.lease(RUN, "listing")
+    queue.complete(RUN, "listing", "leaf", {"articles": ["a"]})
+    assert queue.results(RUN, "listing") == [("leaf", {"leaf_url": "leaf"}, {"articles": ["a"]})]
+    assert queue.next_retry_at(RUN, "listing") is None
+
+
+def test_failed_task_backs_off_then_is_retried(queue):
+    queue.put(RUN, "article", "u1", {})
+    queue.lease(RUN, "article")
+    assert queue.fail(RUN, "article", "u1", error="timeout") is False
+
+    # not runnable before its retry_after
+    assert queue.counts(RUN, "article") == {"pending": 1}
+    assert queue.next_retry_at(RUN, "article") > time.time() - 1
+
+    wait_until_runnable(queue, "article")
+    assert queue.lease(RUN, "article") == ("u1", {}, 2)
+
+
+def test_task_is_dead_lettered_after_max_attempts(queue):
+    queue.put(RUN, "article", "u1", {"n": 1})
+    for attempt in range(1, 4):
+        wait_until_runnable(queue, "article")
+        assert queue.lease(RUN, "article")[2] == attempt
+        dead = queue.fail(RUN, "article", "u1", error=f"error {attempt}")
+    assert dead is True
+    assert queue.counts(RUN, "article") == {"failed": 1}
+    assert queue.lease(RUN, "article") is None
+    assert queue.dead_letters(RUN) == [{"kind": "article", "task_id": "u1", "attempts": 3, "last_error": "error 3"}]
+
+
+def test_release_leases_and_unfinished_run(queue):
+    queue.put(RUN, "article", "u1", {})
+    queue.lease(RUN, "article")
+    assert queue.unfinished_run() == RUN
+    assert queue.release_leases(RUN) == 1
+    assert queue.counts(RUN, "article") == {"pending": 1}
+
+    queue.finish_run(RUN)
+    assert queue.unfinished_run() is None